@@ -3,10 +3,26 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends
 from typing import Dict, Any, List, Optional
 import os
+import asyncio
+import zipfile
 from ...services.service_handlers.document_handler import DocumentHandler
 from ...services.chat_service import ChatService
+from ...services.ingestion_jobs import IngestionQueueFull, get_ingestion_queue
+from ...services.batch_ingestion import BatchIngestor
+from core.document_processor.model_registry import model_registry
+from core.document_processor.executor import (
+    ExtractionQueueFull,
+    ExtractionTimeout,
+    ExtractionMemoryExceeded,
+    get_extraction_executor
+)
+from core.document_processor.extraction_cache import get_extraction_cache
+from core.document_processor.instrumentation import get_stage_metrics
+from core.document_processor.memory_budget import sweep_spill_dir
+from ...utils.upload_utils import save_upload, extract_archive, UploadTooLarge
+from config.settings import settings
 import logging
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 import io
 from pydantic import BaseModel
 from datetime import datetime
@@ -20,6 +36,49 @@ router = APIRouter(prefix="/documents")
 # Initialize services
 document_handler = DocumentHandler()
 chat_service = ChatService()
+ingestion_queue = get_ingestion_queue(document_handler)
+batch_ingestor = BatchIngestor(document_handler, ingestion_queue)
+
+@router.on_event("startup")
+async def create_storage_indexes():
+    """Index the document fields the upload path looks up"""
+    try:
+        await document_handler.storage.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Error creating storage indexes: {e}")
+
+@router.on_event("startup")
+async def start_ingestion_queue():
+    """Start the ingestion workers and resume jobs interrupted by a restart"""
+    try:
+        await ingestion_queue.recover()
+    except Exception as e:
+        logger.error(f"Error recovering ingestion jobs: {e}")
+
+@router.on_event("shutdown")
+async def stop_ingestion_queue():
+    await ingestion_queue.stop()
+
+_spill_sweeper: Optional[asyncio.Task] = None
+
+async def _sweep_spill_files():
+    while True:
+        try:
+            await asyncio.to_thread(sweep_spill_dir)
+        except Exception as e:
+            logger.error(f"Error sweeping spill files: {e}")
+        await asyncio.sleep(max(settings.SPILL_TTL_SECONDS // 4, 60))
+
+@router.on_event("startup")
+async def start_spill_sweeper():
+    """Remove spill files left by crashed or abandoned extractions once they expire"""
+    global _spill_sweeper
+    _spill_sweeper = asyncio.create_task(_sweep_spill_files(), name="spill-sweeper")
+
+@router.on_event("shutdown")
+async def stop_spill_sweeper():
+    if _spill_sweeper is not None:
+        _spill_sweeper.cancel()
 
 # Data models
 class DocumentStats(BaseModel):
@@ -51,50 +110,160 @@ class ChatRequest(BaseModel):
     chat_history: List[Dict[str, str]] = []
 
 @router.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(file: UploadFile = File(...), wait: bool = False):
     """
-    Upload and process a document
+    Upload a document and queue it for processing.
+
+    Returns 202 with a job id to poll; with wait=true the document is
+    processed before responding.
     """
     logger.info(f"Received file upload request: {file.filename}")
     try:
-        # Create directories if they don't exist
-        os.makedirs("data/raw", exist_ok=True)
-        os.makedirs("data/processed", exist_ok=True)
-        logger.info("Created necessary directories")
+        # Stream to a unique file in chunks, hashing as we go
+        try:
+            upload = await save_upload(file)
+        except UploadTooLarge as e:
+            logger.warning(f"Rejecting upload {file.filename}: {e}")
+            raise HTTPException(status_code=413, detail=str(e))
+        file_path = upload["path"]
+        logger.info(f"Saved {upload['size']} bytes to {file_path}")
 
-        # Save uploaded file
-        file_path = f"data/raw/{file.filename}"
+        queued = False
         try:
-            logger.info(f"Saving file to {file_path}")
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            logger.info("File saved successfully")
-
-            # Get file type
-            file_type = file.filename.split('.')[-1].lower()
-            
-            # Process document
-            result = await document_handler.process_document(file_path, file_type)
+            # Identical content is deduplicated by hash
+            duplicate = await document_handler.find_duplicate(upload["sha256"])
+            if duplicate:
+                return JSONResponse(content=duplicate, status_code=200)
+
+            if not wait:
+                job = await ingestion_queue.submit(
+                    file_path, upload["file_type"], upload["filename"], content_hash=upload["sha256"]
+                )
+                queued = True
+                return JSONResponse(
+                    content={
+                        "job_id": job["_id"],
+                        "id": job["document_id"],
+                        "document_id": job["document_id"],
+                        "status": job["status"],
+                        "status_url": f"{router.prefix}/jobs/{job['_id']}"
+                    },
+                    status_code=202
+                )
+
+            result = await document_handler.process_document(
+                file_path, upload["file_type"], content_hash=upload["sha256"]
+            )
             
             return JSONResponse(
                 content=result,
                 status_code=200
             )
 
+        except (ExtractionQueueFull, IngestionQueueFull) as e:
+            logger.warning(f"Rejecting upload, queue full: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
+        except ExtractionTimeout as e:
+            logger.error(f"Document extraction timed out: {e}")
+            raise HTTPException(status_code=504, detail=str(e))
+        except ExtractionMemoryExceeded as e:
+            logger.error(f"Document extraction ran out of memory: {e}")
+            raise HTTPException(status_code=413, detail=str(e))
         except Exception as e:
             logger.error(f"Error processing document: {e}")
             raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
         finally:
-            # Clean up temporary file
-            if os.path.exists(file_path):
+            # Clean up the temporary file unless a job now owns it
+            if not queued and os.path.exists(file_path):
                 os.remove(file_path)
                 logger.info("Temporary file cleaned up")
                 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in upload process: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch")
+async def upload_batch(files: List[UploadFile] = File(...)):
+    """
+    Upload many documents at once; zip archives are expanded.
+
+    Returns 202 with a manifest covering every file: each new file is
+    queued as an ingestion job whose id and status URL are in its entry.
+    """
+    logger.info(f"Received batch upload of {len(files)} files")
+    saved = []
+    queued = False
+    try:
+        for file in files:
+            upload = await save_upload(file)
+            if upload["file_type"] == "zip":
+                try:
+                    remaining = settings.BATCH_MAX_FILES - len(saved)
+                    if remaining <= 0:
+                        raise UploadTooLarge(f"Batch holds more than {settings.BATCH_MAX_FILES} files")
+                    saved.extend(await asyncio.to_thread(
+                        extract_archive, upload["path"], settings.UPLOAD_DIR, max_files=remaining
+                    ))
+                finally:
+                    os.remove(upload["path"])
+            else:
+                saved.append(upload)
+            if len(saved) > settings.BATCH_MAX_FILES:
+                raise UploadTooLarge(f"Batch holds more than {settings.BATCH_MAX_FILES} files")
+
+        # From here the ingestor removes files it doesn't queue; queued ones belong to their jobs
+        queued = True
+        batch = await batch_ingestor.ingest(saved)
+        for entry in batch["files"]:
+            entry["status_url"] = f"{router.prefix}/jobs/{entry['job_id']}" if entry["job_id"] else None
+        return JSONResponse(content=batch, status_code=202)
+
+    except UploadTooLarge as e:
+        logger.warning(f"Rejecting batch upload: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {e}")
+    except Exception as e:
+        logger.error(f"Error in batch upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Clean up the saved files unless they were handed to the ingestor
+        if not queued:
+            for upload in saved:
+                if os.path.exists(upload["path"]):
+                    os.remove(upload["path"])
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """
+    Get the status and per-stage progress of an ingestion job
+    """
+    try:
+        job = await ingestion_queue.jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return {
+            "job_id": job["_id"],
+            "document_id": job["document_id"],
+            "filename": job.get("filename"),
+            "status": job["status"],
+            "stage": job.get("stage"),
+            "stages": job.get("stages", {}),
+            "attempts": job.get("attempts", 0),
+            "duplicate": job.get("duplicate", False),
+            "error": job.get("error"),
+            "partial": job.get("partial"),
+            "created_at": job["created_at"].isoformat(),
+            "updated_at": job["updated_at"].isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting ingestion job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/list")
 async def list_documents(
     page: int = Query(1, ge=1),
@@ -142,6 +311,41 @@ async def get_document_stats():
         logger.error(f"Error getting document stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/models/status")
+async def get_model_status():
+    """
+    Get warm/cold state of the shared OCR and NLP models, in this process
+    and in each extraction pool worker
+    """
+    return {
+        "models": model_registry.status(),
+        "workers": get_extraction_executor().model_status()
+    }
+
+@router.get("/executor/metrics")
+async def get_executor_metrics():
+    """
+    Get extraction process pool metrics
+    """
+    return get_extraction_executor().get_metrics()
+
+@router.get("/cache/metrics")
+async def get_cache_metrics():
+    """
+    Get extraction cache hit/miss and size metrics
+    """
+    return get_extraction_cache().get_metrics()
+
+@router.get("/metrics/stages")
+async def get_stage_metrics_histograms(format: str = Query("json", regex="^(json|prometheus)$")):
+    """
+    Get per-file-type histograms of extraction stage wall/CPU time
+    """
+    metrics = get_stage_metrics()
+    if format == "prometheus":
+        return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+    return metrics.snapshot()
+
 @router.delete("/{document_id}")
 async def delete_document(document_id: str):
     """
@@ -168,6 +372,29 @@ async def get_document(document_id: str):
         logger.error(f"Error getting document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{document_id}/percentiles")
+async def get_column_percentiles(
+    document_id: str,
+    column: str,
+    q: List[float] = Query([25, 50, 75, 95]),
+    sheet: Optional[str] = None
+):
+    """
+    Get percentiles of a numeric column from the stored statistics
+    """
+    try:
+        result = await document_handler.get_column_percentiles(document_id, column, q, sheet)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting column percentiles: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/{document_id}/analyze")
 async def analyze_document(document_id: str):
     """
@@ -187,22 +414,13 @@ async def analyze_document(document_id: str):
 async def document_chat(chat_request: ChatRequest):
     """Chat with a document"""
     try:
-        # Get document content
-        document = await document_handler.get_document(chat_request.document_id)
-        if not document:
+        # Get document content, including any text spilled past the memory budget
+        result = await document_handler.get_document_content(chat_request.document_id)
+        if result is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        # Extract text content, handling different possible structures
-        content = document.get('content', {})
-        text_content = None
-        
-        if isinstance(content, dict):
-            text_content = content.get('text')
-        elif isinstance(content, str):
-            text_content = content
-
-        if not text_content:
-            logger.error(f"No text content found in document: {document}")
+        if not result.text:
+            logger.error(f"No text content found in document: {chat_request.document_id}")
             raise HTTPException(
                 status_code=400,
                 detail="No text content available for this document"
@@ -211,9 +429,10 @@ async def document_chat(chat_request: ChatRequest):
         # Process chat
         response = await chat_service.process_chat(
             query=chat_request.query,
-            document_content=text_content,
+            document_content=result.text,
             chat_history=chat_request.chat_history,
-            mode="document_chat"
+            mode="document_chat",
+            document_id=chat_request.document_id
         )
 
         return {
@@ -0,0 +1,93 @@
+# backend/api/services/batch_ingestion.py
+import logging
+import os
+import uuid
+from typing import Any, Dict, List
+
+from .ingestion_jobs import IngestionQueue, work_group
+
+logger = logging.getLogger(__name__)
+
+class BatchIngestor:
+    """Hands many saved uploads to the ingestion queue and returns a per-file manifest.
+
+    Nothing is extracted while the request waits: every new file becomes an
+    ingestion job (extract -> chunk -> embed -> store, under the queue's
+    per-group limits) and its manifest entry carries the job id to poll.
+    Repeated content, within the batch or already stored, is not queued twice.
+    Files that don't become jobs are removed here; queued files belong to their job.
+    """
+
+    def __init__(self, handler, queue: IngestionQueue):
+        self.handler = handler
+        self.queue = queue
+
+    async def ingest(self, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Queue saved uploads (dicts from save_upload/extract_archive)"""
+        batch_id = str(uuid.uuid4())
+        first_by_hash: Dict[str, Dict[str, Any]] = {}
+        manifest = []
+
+        for file in files:
+            entry = {
+                "filename": file.get("filename"),
+                "file_type": file.get("file_type"),
+                "size": file.get("size"),
+                "group": work_group(file.get("file_type") or ""),
+                "job_id": None,
+                "document_id": None,
+                "status": "queued",
+                "error": None
+            }
+            manifest.append(entry)
+            try:
+                if not self.handler.doc_processor.supports(entry["file_type"] or ""):
+                    entry.update(status="skipped", error=f"Unsupported file type: {entry['file_type']}")
+                    continue
+
+                content_hash = file.get("sha256")
+                original = first_by_hash.get(content_hash) if content_hash else None
+                if original is None and content_hash:
+                    existing = await self.handler.find_duplicate(content_hash)
+                    if existing:
+                        original = {"job_id": None, "document_id": existing["id"]}
+                if original is not None:
+                    # Same bytes earlier in this batch, or already stored
+                    entry.update(status="duplicate", job_id=original["job_id"], document_id=original["document_id"])
+                    continue
+
+                job = await self.queue.defer(
+                    file["path"],
+                    file["file_type"],
+                    file.get("filename"),
+                    content_hash=content_hash,
+                    metadata={"batch_id": batch_id, "source": "batch"}
+                )
+                entry.update(job_id=job["_id"], document_id=job["document_id"])
+                if content_hash:
+                    first_by_hash[content_hash] = entry
+            except Exception as e:
+                logger.error(f"Batch file {file.get('filename')} could not be queued: {e}")
+                entry.update(status="failed", error=str(e))
+            finally:
+                if entry["status"] != "queued":
+                    _remove_file(file["path"])
+
+        counts: Dict[str, int] = {}
+        for entry in manifest:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        logger.info(f"Batch {batch_id}: {len(manifest)} files {counts}")
+        return {
+            "batch_id": batch_id,
+            "total": len(manifest),
+            "counts": counts,
+            "files": manifest
+        }
+
+def _remove_file(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not remove uploaded file {file_path}: {e}")
@@ -20,7 +20,8 @@ class ChatService:
         query: str,
         document_content: str = "",
         chat_history: List[Dict[str, str]] = None,
-        mode: str = "general"
+        mode: str = "general",
+        document_id: str = None
     ) -> Dict[str, Any]:
         """
         Process a chat message with RAG and LLM
@@ -31,11 +32,13 @@ class ChatService:
 
             if mode == "document_chat" and document_content:
                 # First, store document in vector store if not already done
-                document_id = "temp_id"  # You might want to pass this as a parameter
-                await self.retriever.process_document(document_id, document_content)
+                # (documents ingested with embeddings are already there)
+                if not document_id or not self.retriever.has_document(document_id):
+                    document_id = document_id or "temp_id"
+                    await self.retriever.process_document(document_id, document_content)
                 
-                # Get relevant chunks for the query
-                relevant_chunks = await self.retriever.get_relevant_chunks(query)
+                # Get relevant chunks for the query, from this document only
+                relevant_chunks = await self.retriever.get_relevant_chunks(query, document_id=document_id)
                 
                 # Create context-aware prompt
                 context = "\n\n".join([chunk["content"] for chunk in relevant_chunks])
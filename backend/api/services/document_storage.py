@@ -1,5 +1,5 @@
 # backend/api/services/document_storage.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import motor.motor_asyncio
 import logging
 from datetime import datetime
@@ -12,38 +12,99 @@ class DocumentStorage:
         self.client = motor.motor_asyncio.AsyncIOMotorClient('mongodb://localhost:27017')
         self.db = self.client.documents_db
         self.collection = self.db.documents
+        # Chunks of text spilled past the extraction memory budget, one record each
+        self.chunks = self.db.document_chunks
 
-    async def save_document(
-        self,
-        content: Dict[str, Any],
-        file_path: str,
-        file_type: str,
-        metadata: Dict[str, Any]
-    ) -> None:
-        """Save document content and metadata to storage"""
+    async def ensure_indexes(self) -> None:
+        """Create the indexes the upload path queries by; a no-op when they exist"""
+        try:
+            # Duplicate detection looks up by content hash and status on every upload
+            await self.collection.create_index(
+                [("metadata.content_hash", 1), ("metadata.status", 1)],
+                name="content_hash_status"
+            )
+            await self.chunks.create_index([("document_id", 1), ("index", 1)], name="document_index")
+        except Exception as e:
+            logger.error(f"Error creating document indexes: {e}")
+            raise
+
+    async def save_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Insert documents built with build_document in one round trip; returns the saved IDs"""
+        if not documents:
+            return []
+        try:
+            # Unordered, so one bad record doesn't stop the rest of the batch
+            result = await self.collection.insert_many(documents, ordered=False)
+            logger.info(f"Saved {len(result.inserted_ids)} documents")
+            return list(result.inserted_ids)
+        except Exception as e:
+            logger.error(f"Error saving documents: {e}")
+            raise
+
+    async def replace_document(self, document: Dict[str, Any]) -> None:
+        """Overwrite a stored document with one built by build_document"""
+        try:
+            await self.collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+        except Exception as e:
+            logger.error(f"Error replacing document: {e}")
+            raise
+
+    async def save_chunks(self, document_id: str, chunks: List[str], offset: int = 0) -> None:
+        """Store spilled-text chunks of a document, numbered from offset"""
+        if not chunks:
+            return
         try:
-            # Ensure content has text field
-            if isinstance(content, str):
-                content = {"text": content}
-            elif isinstance(content, dict) and "text" not in content:
-                content["text"] = ""
+            await self.chunks.insert_many([
+                {"_id": f"{document_id}:{offset + index}", "document_id": document_id, "index": offset + index, "text": chunk}
+                for index, chunk in enumerate(chunks)
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Error saving document chunks: {e}")
+            raise
 
-            document = {
-                "_id": metadata.get('id'),
-                "content": content,
-                "file_path": file_path,
-                "file_type": file_type,
-                "metadata": metadata,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
+    async def get_chunks(self, document_id: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """Spilled-text chunks of a document in order, at most limit of them from offset"""
+        try:
+            cursor = self.chunks.find({"document_id": document_id}).sort("index", 1).skip(offset)
+            return [chunk["text"] for chunk in await cursor.to_list(length=limit)]
+        except Exception as e:
+            logger.error(f"Error retrieving document chunks: {e}")
+            raise
 
-            await self.collection.insert_one(document)
-            logger.info(f"Document saved successfully: {metadata.get('id')}")
+    async def delete_document(self, document_id: str) -> bool:
+        """Delete a document and its chunks; False if it didn't exist"""
+        try:
+            result = await self.collection.delete_one({"_id": document_id})
+            await self.chunks.delete_many({"document_id": document_id})
+            return result.deleted_count > 0
         except Exception as e:
-            logger.error(f"Error saving document: {e}")
+            logger.error(f"Error deleting document: {e}")
             raise
 
+    @staticmethod
+    def build_document(
+        content: Dict[str, Any],
+        file_path: str,
+        file_type: str,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Stored form of a document"""
+        # Ensure content has text field
+        if isinstance(content, str):
+            content = {"text": content}
+        elif isinstance(content, dict) and "text" not in content:
+            content["text"] = ""
+
+        return {
+            "_id": metadata.get('id'),
+            "content": content,
+            "file_path": file_path,
+            "file_type": file_type,
+            "metadata": metadata,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+
     async def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve document by ID"""
         try:
@@ -67,4 +128,19 @@ class DocumentStorage:
             )
         except Exception as e:
             logger.error(f"Error updating document analysis: {e}")
+            raise
+
+    async def find_by_content_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Find a stored document with identical file content.
+
+        Partial documents count too: the same bytes under the same budget
+        would spill the same content again, so reprocessing gains nothing.
+        """
+        try:
+            return await self.collection.find_one({
+                "metadata.content_hash": content_hash,
+                "metadata.status": {"$in": ["processed", "partial"]}
+            })
+        except Exception as e:
+            logger.error(f"Error finding document by content hash: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,603 @@
+# backend/api/services/ingestion_jobs.py
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+
+from config.settings import settings
+from core.document_processor.chunking import chunk_text
+from core.document_processor.executor import ExtractionQueueFull
+from core.document_processor.language import LanguageDetector
+from core.document_processor.memory_budget import remove_spill
+from core.document_processor.result import ExtractionResult
+from .document_storage import DocumentStorage
+from .spilled_text import store_spilled_text
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "chunk", "embed", "store")
+
+# Work groups, each with its own concurrency limit, so a batch of scans
+# can't hold every worker while spreadsheets and text files wait
+_GROUPS = {
+    "pdf": "ocr",
+    "jpg": "ocr",
+    "jpeg": "ocr",
+    "png": "ocr",
+    "csv": "tabular",
+    "xlsx": "tabular",
+    "xls": "tabular"
+}
+
+def work_group(file_type: str) -> str:
+    return _GROUPS.get(file_type.lower(), "text")
+
+class IngestionQueueFull(Exception):
+    """Raised when the ingestion queue already holds the maximum number of jobs"""
+
+class JobStore:
+    """Ingestion job state in Mongo, so status survives restarts.
+
+    Every queued or running job is leased by the process holding it: owner
+    names the process and lease_until is pushed forward by its heartbeat
+    (renew()). Only jobs whose lease ran out are recoverable, and a job is
+    claimed with one find_one_and_update, so two processes never run it both.
+    """
+
+    def __init__(self, storage: DocumentStorage = None, lease_seconds: int = None):
+        self.storage = storage or DocumentStorage()
+        self.collection = self.storage.db.ingestion_jobs
+        self.lease_seconds = lease_seconds or settings.INGESTION_LEASE_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def _lease(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def create(
+        self,
+        file_path: str,
+        file_type: str,
+        filename: str,
+        content_hash: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        job = {
+            "_id": str(uuid.uuid4()),
+            "document_id": str(uuid.uuid4()),
+            "file_path": file_path,
+            "file_type": file_type,
+            "filename": filename,
+            "content_hash": content_hash,
+            "metadata": metadata or {},
+            "status": "queued",
+            "stage": None,
+            "stages": {name: {"status": "pending", "progress": 0.0} for name in STAGES},
+            "attempts": 0,
+            "error": None,
+            "owner": self.owner,
+            "lease_until": self._lease(),
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.collection.insert_one(job)
+        return job
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": job_id})
+
+    async def claim(self, job_id: str, fields: Dict[str, Any] = None, attempt: bool = False) -> Optional[Dict[str, Any]]:
+        """Take a queued or running job that is ours or whose lease ran out.
+
+        Returns the job as updated, or None if another process holds it or
+        it has finished. With attempt, its attempt count goes up by one.
+        """
+        update = {"$set": {
+            **(fields or {}),
+            "owner": self.owner,
+            "lease_until": self._lease(),
+            "updated_at": datetime.utcnow()
+        }}
+        if attempt:
+            update["$inc"] = {"attempts": 1}
+        return await self.collection.find_one_and_update(
+            {
+                "_id": job_id,
+                "status": {"$in": ["queued", "running"]},
+                "$or": [
+                    {"owner": self.owner},
+                    {"lease_until": None},
+                    {"lease_until": {"$lt": datetime.utcnow()}}
+                ]
+            },
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def renew(self) -> None:
+        """Heartbeat: extend the lease of every unfinished job this process holds"""
+        await self.collection.update_many(
+            {"owner": self.owner, "status": {"$in": ["queued", "running"]}},
+            {"$set": {"lease_until": self._lease()}}
+        )
+
+    async def release(self) -> None:
+        """Give up this process's leases (on shutdown), so a restart recovers its jobs at once"""
+        await self.collection.update_many(
+            {"owner": self.owner, "status": {"$in": ["queued", "running"]}},
+            {"$set": {"lease_until": None}}
+        )
+
+    async def find_recoverable(self) -> List[Dict[str, Any]]:
+        """Queued or running jobs whose holder stopped renewing their lease"""
+        cursor = self.collection.find({
+            "status": {"$in": ["queued", "running"]},
+            "$or": [{"lease_until": None}, {"lease_until": {"$lt": datetime.utcnow()}}]
+        }).sort("created_at", 1)
+        return await cursor.to_list(length=None)
+
+class DocumentInserter:
+    """Gathers documents from concurrent store stages into insert_many calls.
+
+    A batch is written once it holds size documents, or max_wait seconds
+    after its first one arrived; each caller waits for its own document.
+    insert_many is unordered, so only the documents it names as failed fail.
+    """
+
+    def __init__(self, storage, size: int = None, max_wait: float = None):
+        self.storage = storage
+        self.size = size or settings.BATCH_INSERT_SIZE
+        self.max_wait = settings.BATCH_INSERT_MAX_WAIT if max_wait is None else max_wait
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def save(self, document: Dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._insert(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _insert(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        saved, error, failed = False, None, None
+        try:
+            await self.storage.save_documents([document for document, _ in batch])
+            saved = True
+        except Exception as e:
+            error, failed = e, _failed_ids(e)
+        finally:
+            # Every caller is answered, even when this task is cancelled mid-insert
+            for document, future in batch:
+                if future.done():
+                    continue
+                if error is not None and (failed is None or document["_id"] in failed):
+                    future.set_exception(Exception(f"Error saving document: {error}"))
+                elif saved or error is not None:
+                    future.set_result(None)
+                else:
+                    future.cancel()
+
+def _failed_ids(error: Exception) -> Optional[set]:
+    """IDs rejected by an unordered insert_many, or None if the whole batch failed"""
+    details = getattr(error, "details", None) or {}
+    write_errors = details.get("writeErrors")
+    if not write_errors:
+        return None
+    return {item.get("op", {}).get("_id") for item in write_errors}
+
+class IngestionQueue:
+    """Bounded worker pool running extract -> chunk -> embed -> store for uploads.
+
+    Jobs are persisted before they are queued, each stage records its status,
+    timing and progress on the job, and jobs left queued or running by a
+    process that stopped renewing their leases (see JobStore) are picked up
+    again by recover().
+
+    Jobs wait in one queue per work group (ocr / tabular / text) and a free
+    worker takes the next job from the groups below their limit in turn, so
+    a group at its limit never holds a worker and a CSV behind 200 PDFs
+    still runs next. At most max_queue submitted jobs wait at a time: a slot
+    is taken before the job is persisted and freed when a worker picks it
+    up. Batch (defer()) and recovered jobs take no slot; only their ids wait.
+    Batch documents are stored with shared insert_many calls, and the worker
+    moves on while one waits for its batch.
+    """
+
+    def __init__(self, handler, workers: int = None, max_queue: int = None, group_limits: Dict[str, int] = None):
+        self.handler = handler
+        self.jobs = JobStore(handler.storage)
+        self.workers = workers or settings.INGESTION_WORKERS
+        self.max_queue = max_queue or settings.INGESTION_MAX_QUEUE
+        self.group_limits = group_limits or {
+            "ocr": settings.INGESTION_OCR_CONCURRENCY,
+            "tabular": settings.INGESTION_TABULAR_CONCURRENCY,
+            "text": self.workers
+        }
+        self.inserts = DocumentInserter(handler.storage)
+        self._pending: Dict[str, Deque[Tuple[str, bool]]] = {}
+        self._active: Dict[str, int] = {}
+        self._turn = 0
+        self._ready: Optional[asyncio.Condition] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._storing: Optional[asyncio.Semaphore] = None
+        self._stores: Set[asyncio.Task] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        groups = list(dict.fromkeys([*self.group_limits, "ocr", "tabular", "text"]))
+        self._pending = {group: deque() for group in groups}
+        self._active = {group: 0 for group in groups}
+        self._ready = asyncio.Condition()
+        self._slots = asyncio.Semaphore(self.max_queue)
+        # Batch documents waiting for their insert_many, each still holding its result
+        self._storing = asyncio.Semaphore(self.inserts.size)
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"ingestion-worker-{index}")
+            for index in range(self.workers)
+        ]
+        self._heartbeat = asyncio.create_task(self._renew_leases(), name="ingestion-heartbeat")
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *self._stores, *([self._heartbeat] if self._heartbeat else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat = None
+        try:
+            await self.jobs.release()
+        except Exception as e:
+            logger.warning(f"Could not release ingestion job leases: {e}")
+        logger.info("Stopped ingestion workers")
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.jobs.lease_seconds / 3)
+            try:
+                await self.jobs.renew()
+            except Exception as e:
+                logger.warning(f"Could not renew ingestion job leases: {e}")
+
+    async def submit(
+        self,
+        file_path: str,
+        file_type: str,
+        filename: str,
+        content_hash: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Persist a job for an uploaded file and queue it"""
+        if not self.running:
+            await self.start()
+        # Check and take the slot with no await in between, so concurrent
+        # submits can't all pass the check
+        if self._slots.locked():
+            raise IngestionQueueFull(f"Ingestion queue is full ({self.max_queue} jobs)")
+        await self._slots.acquire()
+
+        try:
+            job = await self.jobs.create(file_path, file_type, filename, content_hash, metadata)
+        except Exception:
+            self._slots.release()
+            raise
+        await self._enqueue(job["_id"], file_type, slot=True)
+        logger.info(f"Queued ingestion job {job['_id']} for {filename}")
+        return job
+
+    async def defer(
+        self,
+        file_path: str,
+        file_type: str,
+        filename: str,
+        content_hash: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Persist a job and queue it without taking a slot.
+
+        Never raises IngestionQueueFull, so a batch larger than max_queue is
+        accepted whole. The job is persisted first, so one still waiting at
+        shutdown is picked up by recover().
+        """
+        if not self.running:
+            await self.start()
+        job = await self.jobs.create(file_path, file_type, filename, content_hash, metadata)
+        await self._enqueue(job["_id"], file_type)
+        return job
+
+    async def recover(self) -> int:
+        """Re-queue jobs interrupted by a restart; returns how many will run"""
+        if not self.running:
+            await self.start()
+
+        jobs = []
+        for job in await self.jobs.find_recoverable():
+            # Another process may be recovering the same job; only one claim succeeds
+            job = await self.jobs.claim(job["_id"], {"status": "queued"})
+            if job is None:
+                continue
+            if not os.path.exists(job["file_path"]):
+                await self.jobs.update(job["_id"], {"status": "failed", "error": "Uploaded file is missing"})
+                continue
+            if job.get("attempts", 0) >= settings.INGESTION_MAX_ATTEMPTS:
+                await self.jobs.update(job["_id"], {"status": "failed", "error": "Too many attempts"})
+                self._remove_file(job["file_path"])
+                continue
+            jobs.append(job)
+
+        if jobs:
+            logger.info(f"Recovering {len(jobs)} ingestion jobs")
+            for job in jobs:
+                await self._enqueue(job["_id"], job["file_type"])
+        return len(jobs)
+
+    async def _enqueue(self, job_id: str, file_type: str, slot: bool = False) -> None:
+        async with self._ready:
+            self._pending[work_group(file_type)].append((job_id, slot))
+            self._ready.notify()
+
+    def _next_group(self) -> Optional[str]:
+        """The next group, in turn, with a job waiting and room under its limit"""
+        groups = list(self._pending)
+        for step in range(len(groups)):
+            group = groups[(self._turn + step) % len(groups)]
+            if self._pending[group] and self._active[group] < self.group_limits.get(group, self.workers):
+                return group
+        return None
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self._next_group() is not None)
+                group = self._next_group()
+                groups = list(self._pending)
+                self._turn = (groups.index(group) + 1) % len(groups)
+                job_id, slot = self._pending[group].popleft()
+                self._active[group] += 1
+            if slot:
+                self._slots.release()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Ingestion worker {index} failed on job {job_id}: {e}")
+            finally:
+                async with self._ready:
+                    self._active[group] -= 1
+                    self._ready.notify_all()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.jobs.claim(job_id, {"status": "running", "started_at": datetime.utcnow()}, attempt=True)
+        if not job:
+            logger.warning(f"Ingestion job {job_id} not found, finished or held by another process")
+            return
+
+        result = None
+        try:
+            duplicate = await self.handler.find_duplicate(job["content_hash"]) if job.get("content_hash") else None
+            if duplicate:
+                await self.jobs.update(job_id, {
+                    "status": "completed",
+                    "document_id": duplicate["id"],
+                    "duplicate": True,
+                    "finished_at": datetime.utcnow()
+                })
+                self._remove_file(job["file_path"])
+                return
+
+            result = await self._stage(job_id, "extract", self._extract(job))
+            chunks = await self._stage(job_id, "chunk", self._chunk(result))
+            embeddings = await self._stage(job_id, "embed", self._embed(job_id, job, result, chunks))
+        except asyncio.CancelledError:
+            # Shutdown: the job stays "running"; stop() releases its lease for recovery
+            if result is not None:
+                remove_spill(result.metadata.get("partial"))
+            raise
+        except Exception as e:
+            await self._fail(job, result, e)
+            return
+
+        if job.get("metadata", {}).get("source") != "batch":
+            await self._finish(job, result, chunks, embeddings)
+            return
+
+        # Batch documents wait for a shared insert_many; the worker moves on meanwhile
+        await self._storing.acquire()
+        task = asyncio.create_task(self._finish(job, result, chunks, embeddings), name=f"ingestion-store-{job_id}")
+        self._stores.add(task)
+        task.add_done_callback(self._stored)
+
+    def _stored(self, task: asyncio.Task) -> None:
+        self._stores.discard(task)
+        self._storing.release()
+
+    async def _finish(self, job: Dict[str, Any], result: ExtractionResult, chunks: List[str], embeddings: Optional[List[Any]]) -> None:
+        """Store stage and final status; the uploaded file and any spill go afterwards"""
+        job_id = job["_id"]
+        try:
+            await self._stage(job_id, "store", self._store(job, result, chunks, embeddings))
+
+            # Partial: stored, but content past the memory budget was spilled to disk
+            fields = {"status": "completed", "finished_at": datetime.utcnow()}
+            if result.metadata.get("partial"):
+                fields.update(status="partial", partial=result.metadata["partial"])
+            await self.jobs.update(job_id, fields)
+            logger.info(f"Ingestion job {job_id} {fields['status']}")
+        except asyncio.CancelledError:
+            remove_spill(result.metadata.get("partial"))
+            raise
+        except Exception as e:
+            await self._fail(job, result, e)
+            return
+        self._remove_file(job["file_path"])
+
+    async def _fail(self, job: Dict[str, Any], result: Optional[ExtractionResult], error: Exception) -> None:
+        logger.error(f"Ingestion job {job['_id']} failed: {error}")
+        try:
+            await self.jobs.update(job["_id"], {"status": "failed", "error": str(error), "finished_at": datetime.utcnow()})
+        finally:
+            # Already gone if the store stage ran; a rerun extracts afresh
+            if result is not None:
+                remove_spill(result.metadata.get("partial"))
+            self._remove_file(job["file_path"])
+
+    async def _stage(self, job_id: str, name: str, work) -> Any:
+        """Run one stage, recording its status, timing and progress on the job"""
+        prefix = f"stages.{name}"
+        start = time.perf_counter()
+        await self.jobs.update(job_id, {
+            "stage": name,
+            f"{prefix}.status": "running",
+            f"{prefix}.started_at": datetime.utcnow()
+        })
+        try:
+            value = await work
+        except Exception:
+            await self.jobs.update(job_id, {
+                f"{prefix}.status": "failed",
+                f"{prefix}.seconds": time.perf_counter() - start
+            })
+            raise
+
+        skipped = name == "embed" and value is None
+        await self.jobs.update(job_id, {
+            f"{prefix}.status": "skipped" if skipped else "completed",
+            f"{prefix}.progress": 1.0,
+            f"{prefix}.seconds": time.perf_counter() - start,
+            f"{prefix}.finished_at": datetime.utcnow()
+        })
+        return value
+
+    async def _extract(self, job: Dict[str, Any], attempts: int = 3) -> ExtractionResult:
+        """process_result, backing off briefly when the extraction pool is saturated"""
+        content_hash = job.get("content_hash")
+        for attempt in range(attempts):
+            try:
+                return await self.handler.doc_processor.process_result(
+                    file_path=job["file_path"],
+                    file_type=job["file_type"],
+                    extraction_type="text",
+                    options={"content_hash": content_hash} if content_hash else None
+                )
+            except ExtractionQueueFull:
+                if attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _chunk(self, result: ExtractionResult) -> List[str]:
+        # Structured formats (XML, YAML) already come with record-aligned chunks
+        if not result.blocks_of("chunk"):
+            result.blocks.extend(await asyncio.to_thread(
+                chunk_text, result.text, result.blocks, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
+            ))
+        return [result.block_text(block) for block in result.blocks_of("chunk")]
+
+    async def _embed(self, job_id: str, job: Dict[str, Any], result: ExtractionResult, chunks: List[str]) -> Optional[List[Any]]:
+        if not settings.INGESTION_EMBED_ENABLED or not chunks:
+            return None
+
+        embeddings_model = self.handler.chat_service.retriever.embeddings
+        embeddings = []
+        batch_size = settings.INGESTION_EMBED_BATCH_SIZE
+        for offset in range(0, len(chunks), batch_size):
+            embeddings.extend(await embeddings_model.embed_documents(chunks[offset:offset + batch_size]))
+            await self.jobs.update(job_id, {"stages.embed.progress": len(embeddings) / len(chunks)})
+        return embeddings
+
+    async def _store(self, job: Dict[str, Any], result: ExtractionResult, chunks: List[str], embeddings: Optional[List[Any]]) -> Dict[str, Any]:
+        document, summary = self.handler.build_document(
+            job["document_id"],
+            job["file_path"],
+            job["file_type"],
+            result,
+            content_hash=job.get("content_hash"),
+            extra_metadata={
+                **job.get("metadata", {}),
+                "filename": job.get("filename"),
+                "job_id": job["_id"],
+                "chunk_count": len(chunks)
+            }
+        )
+        if job.get("metadata", {}).get("source") == "batch":
+            await self.inserts.save(document)
+        else:
+            await self.handler.storage.save_documents([document])
+        if embeddings is not None:
+            await self._store_embeddings(job, chunks, embeddings)
+
+        async def embed_spilled(offset: int, spilled: List[str]) -> None:
+            embeddings_model = self.handler.chat_service.retriever.embeddings
+            await self._store_embeddings(job, spilled, await embeddings_model.embed_documents(spilled), len(chunks) + offset)
+
+        # Text spilled past the memory budget is chunked (and embedded) straight from disk
+        await store_spilled_text(
+            self.handler.storage,
+            job["document_id"],
+            result.metadata.get("partial"),
+            on_chunks=embed_spilled if embeddings is not None else None,
+            batch_size=settings.INGESTION_EMBED_BATCH_SIZE
+        )
+        return summary
+
+    async def _store_embeddings(self, job: Dict[str, Any], chunks: List[str], embeddings: List[Any], first_id: int = 0) -> None:
+        texts_with_metadata = [
+            {"content": chunk, "document_id": job["document_id"], "chunk_id": first_id + index}
+            for index, chunk in enumerate(chunks)
+        ]
+        # Same per-chunk language tags as Retriever.process_document
+        if settings.LANGDETECT_PER_CHUNK:
+            languages = await asyncio.to_thread(LanguageDetector().detect_chunks, chunks)
+            for item, language in zip(texts_with_metadata, languages):
+                item["language"] = language
+        self.handler.chat_service.retriever.store_embeddings(texts_with_metadata, embeddings)
+
+    @staticmethod
+    def _remove_file(file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not remove uploaded file {file_path}: {e}")
+
+_queue: Optional[IngestionQueue] = None
+
+def get_ingestion_queue(handler) -> IngestionQueue:
+    """Process-wide ingestion queue, created on first use"""
+    global _queue
+    if _queue is None:
+        _queue = IngestionQueue(handler)
+    return _queue
@@ -1,10 +1,17 @@
 # backend/api/services/service_handlers/document_handler.py
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from ..base_service import BaseService
 from core.document_processor.processor import DocumentProcessor
+from core.document_processor.executor import ExtractionQueueFull, ExtractionTimeout, ExtractionMemoryExceeded
+from core.document_processor.sketches import quantile_from_stats
+from core.document_processor.table_cache import ParquetTableCache, get_table_cache
+from core.document_processor.result import Block, ExtractionResult, build_result
+from core.document_processor.memory_budget import remove_spill
 from ..chat_service import ChatService
 from ..document_storage import DocumentStorage
+from ..spilled_text import read_spilled_text, store_spilled_text
 import logging
+import os
 from datetime import datetime
 import uuid
 
@@ -34,30 +41,36 @@ class DocumentHandler(BaseService):
                 raise ValueError("Document ID is required")
 
             # First process the document if it's a new upload
+            file_type = context.get('file_type', 'txt')
+            document = None
             if context.get('file_path'):
-                # Process new document
-                document_content = await self.doc_processor.process_document(
-                    file_path=context.get('file_path'),
-                    file_type=context.get('file_type', 'txt'),
+                result = await self.doc_processor.process_result(
+                    file_path=context['file_path'],
+                    file_type=file_type,
                     extraction_type='text'
                 )
-                
+
                 # Save to storage if it's a new document
-                await self.storage.save_document(
-                    content=document_content,
-                    file_path=context.get('file_path'),
-                    file_type=context.get('file_type', 'txt'),
-                    metadata={
-                        "processed_at": datetime.utcnow(),
-                        "source": context.get('source', 'upload'),
-                        "service_type": context.get('service_type', 'general')
-                    }
-                )
+                document = await self.storage.get_document(document_id)
+                if not document:
+                    await self.store_result(
+                        document_id,
+                        context['file_path'],
+                        file_type,
+                        result,
+                        extra_metadata={
+                            "source": context.get('source', 'upload'),
+                            "service_type": context.get('service_type', 'general')
+                        }
+                    )
+                    if await store_spilled_text(self.storage, document_id, result.metadata.get("partial")):
+                        await self._append_spilled_chunks(document_id, result)
             else:
                 # Get existing document content
-                document_content = await self._get_document_content(document_id)
-                if not document_content:
+                document = await self.storage.get_document(document_id)
+                if not document:
                     raise ValueError(f"Document not found: {document_id}")
+                result = await self._document_result(document)
 
             # Process with chat service for analysis
             chat_response = await self.chat_service.process_chat(
@@ -68,37 +81,40 @@ class DocumentHandler(BaseService):
             )
 
             # Combine document insights with chat response
+            analysis = (document or {}).get("analysis") or {}
+            processed_at = (document or {}).get("metadata", {}).get("processed_at") or datetime.utcnow()
             response = {
                 "answer": chat_response.get("answer", ""),
-                "content": document_content.get("content", ""),
-                "metadata": document_content.get("metadata", {}),
+                "content": result.text,
+                "metadata": result.metadata,
                 "insights": {
-                    "summary": document_content.get("analysis", {}).get("summary", ""),
-                    "key_points": document_content.get("analysis", {}).get("key_points", []),
-                    "entities": document_content.get("analysis", {}).get("entities", []),
+                    "summary": analysis.get("summary", ""),
+                    "key_points": analysis.get("key_points", []),
+                    "entities": result.entities,
                     "chat_insights": chat_response.get("insights", {})
                 },
-                "relevant_sections": await self._extract_relevant_sections(
-                    document_content.get("content", ""),
-                    message
-                ),
+                "relevant_sections": await self._extract_relevant_sections(result.text, message),
                 "source_metadata": {
                     "document_id": document_id,
-                    "file_type": context.get('file_type'),
-                    "processed_at": document_content.get("metadata", {}).get("processed_at")
+                    "file_type": file_type,
+                    "processed_at": processed_at.isoformat() if isinstance(processed_at, datetime) else processed_at
                 }
             }
 
             # Add format-specific data
-            if context.get('file_type') in ['csv', 'xlsx']:
+            view = result.to_dict()
+            if file_type in ['csv', 'xlsx']:
                 response["data_analysis"] = {
-                    "statistics": document_content.get("statistics", {}),
-                    "preview": document_content.get("preview", {})
+                    "statistics": {table.name: table.statistics for table in result.tables},
+                    "preview": {
+                        table.name: {"columns": table.columns, "rows": table.rows}
+                        for table in result.tables
+                    }
                 }
-            elif context.get('file_type') in ['docx', 'pdf']:
+            elif file_type in ['docx', 'pdf']:
                 response["document_structure"] = {
-                    "sections": document_content.get("structure", {}),
-                    "tables": document_content.get("tables", [])
+                    "sections": [block for block in view["blocks"] if block["kind"] in ("section", "page")],
+                    "tables": view["tables"]
                 }
 
             # Store the chat interaction
@@ -116,70 +132,91 @@ class DocumentHandler(BaseService):
         file_type: str,
         metadata: Dict[str, Any] = None
     ) -> str:
-        """Upload and process a new document"""
+        """Upload and process a new document; returns its ID"""
         try:
-            # Process document
-            document_content = await self.doc_processor.process_document(
+            document_id = str(uuid.uuid4())
+            result = await self.doc_processor.process_result(
                 file_path=file_path,
                 file_type=file_type,
                 extraction_type='text'
             )
 
             # Save to storage
-            document_id = await self.storage.save_document(
-                content=document_content,
-                file_path=file_path,
-                file_type=file_type,
-                metadata={
-                    "processed_at": datetime.utcnow(),
-                    **(metadata or {})
-                }
-            )
-
+            await self.store_result(document_id, file_path, file_type, result, extra_metadata=metadata)
+            await store_spilled_text(self.storage, document_id, result.metadata.get("partial"))
             return document_id
 
         except Exception as e:
             logger.error(f"Error uploading document: {e}")
             raise
 
-    async def _get_document_content(self, document_id: str) -> Dict[str, Any]:
+    async def get_document_content(self, document_id: str) -> Optional[ExtractionResult]:
         """
         Retrieve processed document content from storage
         """
         try:
             document = await self.storage.get_document(document_id)
             if not document:
-                return {}
-                
-            # If the document exists but content needs to be reprocessed
-            if not document.get("content") and document.get("file_path"):
-                document_content = await self.doc_processor.process_document(
-                    file_path=document["file_path"],
-                    file_type=document["file_type"],
-                    extraction_type='text'
-                )
-                
-                # Update storage with processed content
-                await self.storage.update_document(
-                    document_id=document_id,
-                    updates={
-                        "content": document_content.get("content"),
-                        "analysis": document_content.get("analysis"),
-                        "metadata": {
-                            **document.get("metadata", {}),
-                            "reprocessed_at": datetime.utcnow()
-                        }
-                    }
-                )
-                
-                return document_content
-                
-            return document
+                return None
+            return await self._document_result(document)
 
         except Exception as e:
             logger.error(f"Error retrieving document content: {e}")
             raise
 
+    async def _document_result(self, document: Dict[str, Any]) -> ExtractionResult:
+        """ExtractionResult of a stored document, reprocessing its file when it has no content.
+
+        Text a partial document spilled past its memory budget is read back
+        from its chunks and appended, so readers see the whole document.
+        """
+        result = self._load_extraction(document)
+        if result is not None:
+            if document.get("metadata", {}).get("partial"):
+                await self._append_spilled_chunks(document["_id"], result)
+            return result
+
+        content = document.get("content") or {}
+        if not content and document.get("file_path"):
+            result = await self.doc_processor.process_result(
+                file_path=document["file_path"],
+                file_type=document["file_type"],
+                extraction_type='text'
+            )
+
+            # Update storage with processed content, keeping the document's own metadata
+            kept = {
+                key: value for key, value in document.get("metadata", {}).items()
+                if key not in ("status", "partial", "tables")
+            }
+            stored, _ = self.build_document(
+                document["_id"],
+                document["file_path"],
+                document["file_type"],
+                result,
+                extra_metadata={**kept, "reprocessed_at": datetime.utcnow()}
+            )
+            await self.storage.replace_document(stored)
+            if await store_spilled_text(self.storage, document["_id"], result.metadata.get("partial")):
+                await self._append_spilled_chunks(document["_id"], result)
+            return result
+
+        # Documents stored before ExtractionResult kept the raw processor dict
+        if isinstance(content.get("text"), dict):
+            content = content["text"]
+        return build_result(document.get("file_type") or "txt", content)
+
+    async def _append_spilled_chunks(self, document_id: str, result: ExtractionResult) -> None:
+        """Append the start of a document's spilled text as a "chunk" block,
+        up to SPILLED_TEXT_MAX_CHARS (see read_spilled_text)"""
+        pieces, truncated = await read_spilled_text(self.storage, document_id)
+        if not pieces:
+            return
+        start = len(result.text) + 2
+        result.text = result.text + "\n\n" + "".join(pieces)
+        result.blocks.append(Block("chunk", start, len(result.text), label="spilled"))
+        result.metadata["spilled_text_truncated"] = truncated
+
     async def _extract_relevant_sections(
         self,
         content: str,
@@ -247,74 +284,173 @@ class DocumentHandler(BaseService):
     async def delete_document(self, document_id: str) -> bool:
         """Delete a document and its associated data"""
         try:
-            return await self.storage.delete_document(document_id)
+            document = await self.storage.get_document(document_id)
+            if document:
+                # Spill files not yet chunked, e.g. from an interrupted ingestion
+                remove_spill(document.get("metadata", {}).get("partial"))
+            deleted = await self.storage.delete_document(document_id)
+
+            # Parquet copies are shared by content hash; drop them with its last document
+            metadata = (document or {}).get("metadata", {})
+            content_hash = metadata.get("content_hash")
+            if metadata.get("tables") and content_hash and not await self.storage.find_by_content_hash(content_hash):
+                get_table_cache().remove(content_hash)
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting document: {e}")
             raise
 
-    async def process_document(self, file_path: str, file_type: str) -> Dict[str, Any]:
+    async def process_document(
+        self,
+        file_path: str,
+        file_type: str,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Process a document and return its analysis"""
         try:
             logger.info(f"Processing document: {file_path}")
-            
+
+            # The same bytes were already processed: return that document
+            if content_hash:
+                existing = await self.find_duplicate(content_hash)
+                if existing:
+                    return existing
+
             # Generate a unique document ID
             document_id = str(uuid.uuid4())
             
-            # Extract text content from the PDF
-            if file_type.lower() == 'pdf':
-                import PyPDF2
-                
-                text_content = ""
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text_content += page.extract_text()
-            else:
-                # Handle other file types or use your existing document processor
-                text_content = await self.doc_processor.process_document(
-                    file_path=file_path,
-                    file_type=file_type,
-                    extraction_type='text'
-                )
-
-            # Prepare content for storage
-            document_content = {
-                "text": text_content,
-                "file_type": file_type,
-                "processed_at": datetime.utcnow().isoformat()
-            }
-
-            # Save to storage
-            metadata = {
-                "id": document_id,
-                "processed_at": datetime.utcnow(),
-                "source": "upload",
-                "status": "processed",
-                "file_type": file_type
-            }
-
-            await self.storage.save_document(
-                content=document_content,
+            # One typed result for every file type; the text is stored once
+            result = await self.doc_processor.process_result(
                 file_path=file_path,
                 file_type=file_type,
-                metadata=metadata
+                extraction_type='text',
+                options={"content_hash": content_hash} if content_hash else None
             )
 
-            return {
-                "id": document_id,
-                "summary": "",  # Will be filled in during analysis
-                "key_metrics": [],
-                "metadata": {
-                    "file_type": file_type,
-                    "processed_at": datetime.utcnow().isoformat(),
-                    "status": "processed"
-                }
-            }
+            summary = await self.store_result(document_id, file_path, file_type, result, content_hash)
+            await store_spilled_text(self.storage, document_id, result.metadata.get("partial"))
+            return summary
 
+        except (ExtractionQueueFull, ExtractionTimeout, ExtractionMemoryExceeded):
+            # Let the route map these to 503/504/413
+            raise
         except Exception as e:
             logger.error(f"Error processing document: {e}")
             raise Exception(f"Error processing document: {str(e)}")
 
+    async def find_duplicate(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Summary of an already stored document with the same content, if any"""
+        existing = await self.storage.find_by_content_hash(content_hash)
+        if not existing:
+            return None
+
+        logger.info(f"Duplicate upload of document {existing['_id']}")
+        metadata = existing.get("metadata", {})
+        summary = {
+            "id": existing["_id"],
+            "summary": "",
+            "key_metrics": [],
+            "metadata": {
+                "file_type": existing.get("file_type"),
+                "processed_at": metadata.get("processed_at", datetime.utcnow()).isoformat(),
+                "status": metadata.get("status", "processed"),
+                "duplicate": True
+            }
+        }
+        if "partial" in metadata:
+            summary["metadata"]["partial"] = metadata["partial"]
+        return summary
+
+    async def store_result(
+        self,
+        document_id: str,
+        file_path: str,
+        file_type: str,
+        result: ExtractionResult,
+        content_hash: Optional[str] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Save an extraction result as a document and return its summary"""
+        document, summary = self.build_document(
+            document_id, file_path, file_type, result, content_hash, extra_metadata
+        )
+        await self.storage.save_documents([document])
+        return summary
+
+    def build_document(
+        self,
+        document_id: str,
+        file_path: str,
+        file_type: str,
+        result: ExtractionResult,
+        content_hash: Optional[str] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Storage record and response summary for an extraction result"""
+        # Prepare content for storage
+        document_content = {
+            "text": result.text,
+            "file_type": file_type,
+            "processed_at": datetime.utcnow().isoformat(),
+            # Blocks, tables, stats and entities in compact binary form; the
+            # text is only stored above and put back by _load_extraction
+            "extraction": result.to_bytes(include_text=False)
+        }
+
+        # Content past the memory budget was spilled to disk rather than extracted
+        status = "partial" if result.metadata.get("partial") else "processed"
+        metadata = {
+            "id": document_id,
+            "processed_at": datetime.utcnow(),
+            "source": "upload",
+            "status": status,
+            "file_type": file_type,
+            "content_hash": content_hash or result.metadata.get("content_hash")
+        }
+        if status == "partial":
+            metadata["partial"] = result.metadata["partial"]
+        if extra_metadata:
+            metadata.update(extra_metadata)
+
+        # Link columnar copies of tabular files to this document
+        tables = [table.source for table in result.tables if table.source]
+        if tables:
+            metadata["tables"] = tables
+
+        document = self.storage.build_document(document_content, file_path, file_type, metadata)
+        summary = {
+            "id": document_id,
+            "summary": "",  # Will be filled in during analysis
+            "key_metrics": [],
+            "metadata": {
+                "file_type": file_type,
+                "processed_at": datetime.utcnow().isoformat(),
+                "status": status
+            }
+        }
+        return document, summary
+
+    async def get_processing_status(self, document_id: str) -> Dict[str, Any]:
+        """Processing status of a document: its ingestion job, or the stored document"""
+        try:
+            job = await self.storage.db.ingestion_jobs.find_one({"document_id": document_id})
+            if job:
+                return {
+                    "status": job.get("status"),
+                    "job_id": job["_id"],
+                    "stage": job.get("stage"),
+                    "stages": job.get("stages", {}),
+                    "error": job.get("error")
+                }
+
+            document = await self.storage.get_document(document_id)
+            if document:
+                return {"status": document.get("metadata", {}).get("status", "processed")}
+            return {"status": "not_found"}
+        except Exception as e:
+            logger.error(f"Error getting processing status: {e}")
+            raise
+
     async def analyze_document(self, document_id: str) -> Dict[str, Any]:
         """Analyze a document and extract insights"""
         try:
@@ -323,7 +459,7 @@ class DocumentHandler(BaseService):
             if not document:
                 raise ValueError(f"Document not found: {document_id}")
 
-            content = document.get('content', {}).get('text', '')
+            content = (await self._document_result(document)).text
             
             # Generate summary
             summary = await self._generate_summary(content)
@@ -398,6 +534,108 @@ class DocumentHandler(BaseService):
             logger.error(f"Error detecting document type: {e}")
             return "Unknown"
 
+    async def get_column_percentiles(
+        self,
+        document_id: str,
+        column: str,
+        percentiles: List[float],
+        sheet: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer percentile questions for a numeric column from the stored
+        streaming statistics, without reloading the file
+        """
+        try:
+            document = await self.storage.get_document(document_id)
+            if not document:
+                return None
+
+            column_stats = self._find_column_statistics(document, column, sheet)
+            if column_stats is None:
+                raise ValueError(f"No numeric statistics stored for column: {column}")
+
+            return {
+                "document_id": document_id,
+                "column": column,
+                "count": column_stats.get("count"),
+                "percentiles": {
+                    f"p{p:g}": quantile_from_stats(column_stats, p / 100)
+                    for p in percentiles
+                },
+                "histogram": column_stats.get("histogram")
+            }
+
+        except Exception as e:
+            logger.error(f"Error computing column percentiles: {e}")
+            raise
+
+    def _find_column_statistics(
+        self,
+        document: Dict[str, Any],
+        column: str,
+        sheet: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Locate stored numeric column statistics for CSV (top level) or XLSX (per sheet)"""
+        result = self._load_extraction(document)
+        if result is not None:
+            candidates = [table.statistics for table in result.tables if sheet is None or table.name == sheet]
+        else:
+            # Documents stored before ExtractionResult kept the raw processor dict
+            extraction = document.get("content", {})
+            if isinstance(extraction.get("text"), dict):
+                extraction = extraction["text"]
+
+            candidates = [extraction.get("statistics", {})]
+            for sheet_name, sheet_data in extraction.get("sheets", {}).items():
+                if sheet is None or sheet_name == sheet:
+                    candidates.append(sheet_data.get("statistics", {}))
+
+        for statistics in candidates:
+            column_stats = statistics.get("numeric_columns", {}).get(column)
+            if column_stats:
+                return column_stats
+        return None
+
+    async def load_table(
+        self,
+        document_id: str,
+        table: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ):
+        """
+        Memory-map the cached Parquet copy of a document's table (the first
+        table, or the named sheet), reading only the requested columns
+        """
+        try:
+            document = await self.storage.get_document(document_id)
+            if not document:
+                return None
+
+            tables = document.get("metadata", {}).get("tables", [])
+            entry = next(
+                (item for item in tables if table is None or item.get("name") == table),
+                None
+            )
+            if entry is None:
+                raise ValueError(f"No cached table for document {document_id}: {table or 'default'}")
+            if not os.path.exists(entry["path"]):
+                raise ValueError(f"Cached table for document {document_id} was evicted: {entry['name']}")
+
+            return ParquetTableCache.read_table(entry["path"], columns=columns)
+
+        except Exception as e:
+            logger.error(f"Error loading cached table: {e}")
+            raise
+
+    @staticmethod
+    def _load_extraction(document: Dict[str, Any]) -> Optional[ExtractionResult]:
+        """Decode the stored binary ExtractionResult, if the document has one"""
+        content = document.get("content", {})
+        payload = content.get("extraction")
+        if not payload:
+            return None
+        return ExtractionResult.from_bytes(bytes(payload), text=content.get("text"))
+
     async def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a document by its ID
@@ -411,9 +649,14 @@ class DocumentHandler(BaseService):
                 return None
 
             # Return the document with its content and metadata
+            content = dict(document.get("content", {}))
+            result = self._load_extraction(document)
+            if result is not None:
+                content["extraction"] = result.to_dict()
+
             return {
                 "id": document.get("_id"),
-                "content": document.get("content", {}),
+                "content": content,
                 "metadata": document.get("metadata", {}),
                 "analysis": document.get("analysis", {}),
                 "file_type": document.get("file_type"),
@@ -0,0 +1,89 @@
+# backend/api/services/spilled_text.py
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from core.document_processor.chunking import chunk_spilled
+from core.document_processor.memory_budget import remove_spill
+
+logger = logging.getLogger(__name__)
+
+async def store_spilled_text(
+    storage,
+    document_id: str,
+    partial: Optional[Dict[str, Any]],
+    on_chunks: Optional[Callable[[int, List[str]], Awaitable[None]]] = None,
+    batch_size: int = None
+) -> int:
+    """Chunk the text a partial extraction spilled to disk into the document's chunks.
+
+    Spill files are read and stored a batch at a time, so spilled text never
+    has to fit in memory at once; on_chunks(offset, chunks) is awaited for
+    each batch (e.g. to embed it). The spill files are deleted afterwards,
+    whether or not storing succeeded. Returns the number of chunks stored.
+    """
+    if not partial:
+        return 0
+
+    batch_size = batch_size or settings.BATCH_INSERT_SIZE
+    chunks = chunk_spilled(partial, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+    count = 0
+    try:
+        while True:
+            batch = await asyncio.to_thread(list, itertools.islice(chunks, batch_size))
+            if not batch:
+                break
+            await storage.save_chunks(document_id, batch, count)
+            if on_chunks is not None:
+                await on_chunks(count, batch)
+            count += len(batch)
+
+        await storage.collection.update_one(
+            {"_id": document_id},
+            {"$set": {"metadata.partial.spilled_chunks": count}}
+        )
+        logger.info(f"Stored {count} spilled chunks of document {document_id}")
+        return count
+    except Exception as e:
+        logger.error(f"Error storing spilled text of document {document_id}: {e}")
+        raise
+    finally:
+        remove_spill(partial)
+
+async def read_spilled_text(storage, document_id: str, max_chars: int = None) -> Tuple[List[str], bool]:
+    """The start of a document's spilled text, read back from its chunks.
+
+    Chunk overlaps are trimmed, so the pieces join into the original text.
+    Reading stops at max_chars, so a document too big for the memory budget
+    isn't rebuilt here; the rest stays reachable through retrieval over the
+    stored chunks. Returns (pieces, whether text was left out).
+    """
+    max_chars = max_chars or settings.SPILLED_TEXT_MAX_CHARS
+    page = max(max_chars // max(settings.CHUNK_SIZE - settings.CHUNK_OVERLAP, 1), 1) + 1
+
+    pieces = []
+    total = 0
+    previous = ""
+    offset = 0
+    while True:
+        chunks = await storage.get_chunks(document_id, offset=offset, limit=page)
+        for chunk in chunks:
+            piece = chunk[_overlap(previous, chunk, settings.CHUNK_OVERLAP):]
+            previous = chunk
+            if total + len(piece) > max_chars:
+                pieces.append(piece[:max_chars - total])
+                return pieces, True
+            pieces.append(piece)
+            total += len(piece)
+        if len(chunks) < page:
+            return pieces, False
+        offset += page
+
+def _overlap(previous: str, chunk: str, max_overlap: int) -> int:
+    """Length of the longest end of previous that chunk starts with"""
+    for size in range(min(max_overlap, len(previous), len(chunk)), 0, -1):
+        if previous.endswith(chunk[:size]):
+            return size
+    return 0
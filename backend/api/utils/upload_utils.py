@@ -0,0 +1,131 @@
+# backend/api/utils/upload_utils.py
+from typing import Any, Dict, List
+from fastapi import UploadFile
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+import zipfile
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class UploadTooLarge(Exception):
+    """Upload exceeds settings.MAX_UPLOAD_SIZE"""
+
+async def save_upload(
+    file: UploadFile,
+    directory: str = None,
+    max_bytes: int = None,
+    chunk_size: int = None
+) -> Dict[str, Any]:
+    """
+    Stream an upload to a uniquely named file in fixed-size chunks, enforcing
+    the size limit and computing SHA-256 as the bytes go by. Memory use is one
+    chunk regardless of file size. The partial file is removed on failure.
+    """
+    directory = directory or settings.UPLOAD_DIR
+    max_bytes = max_bytes or settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    # Reject early when the client declared the size
+    declared = getattr(file, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLarge(f"File exceeds the {max_bytes} byte upload limit")
+
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.basename(file.filename or "upload")
+    extension = os.path.splitext(filename)[1].lower()
+    # Unique per upload, so concurrent uploads with the same name can't collide
+    file_path = os.path.join(directory, f"{uuid.uuid4().hex}{extension}")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(file_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {max_bytes} byte upload limit")
+                digest.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+    return {
+        "path": file_path,
+        "filename": filename,
+        "file_type": extension.lstrip("."),
+        "size": size,
+        "sha256": digest.hexdigest()
+    }
+
+def extract_archive(
+    archive_path: str,
+    directory: str,
+    max_bytes: int = None,
+    max_files: int = None,
+    chunk_size: int = None
+) -> List[Dict[str, Any]]:
+    """
+    Unpack a zip archive into uniquely named files, hashing each member as it
+    is copied. Directories and hidden/system entries are skipped. Member
+    names are never used as paths, so entries like "../x" can't escape the
+    directory, and sizes are checked on the bytes actually read, so a
+    misreported header can't inflate the archive past the limits.
+    """
+    max_bytes = settings.MAX_UPLOAD_SIZE if max_bytes is None else max_bytes
+    # 0 is a real limit (no room left in the batch), not "use the default"
+    max_files = settings.BATCH_MAX_FILES if max_files is None else max_files
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                filename = os.path.basename(member.filename)
+                if member.is_dir() or not filename or filename.startswith(".") or "__MACOSX" in member.filename:
+                    continue
+                if len(files) >= max_files:
+                    raise UploadTooLarge(f"Archive holds more than {max_files} files")
+                if member.file_size > max_bytes:
+                    raise UploadTooLarge(f"{filename} exceeds the {max_bytes} byte upload limit")
+
+                extension = os.path.splitext(filename)[1].lower()
+                file_path = os.path.join(directory, f"{uuid.uuid4().hex}{extension}")
+                digest = hashlib.sha256()
+                size = 0
+                with archive.open(member) as source, open(file_path, "wb") as buffer:
+                    files.append({"path": file_path})
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise UploadTooLarge(f"{filename} exceeds the {max_bytes} byte upload limit")
+                        digest.update(chunk)
+                        buffer.write(chunk)
+
+                files[-1] = {
+                    "path": file_path,
+                    "filename": filename,
+                    "file_type": extension.lstrip("."),
+                    "size": size,
+                    "sha256": digest.hexdigest()
+                }
+    except BaseException:
+        for file in files:
+            if os.path.exists(file["path"]):
+                os.remove(file["path"])
+        raise
+
+    return files
@@ -0,0 +1,225 @@
+# backend/benchmarks/corpus.py
+"""Synthetic, seeded document corpus for the ingestion benchmarks.
+
+Every generator writes one file of roughly the requested scale and returns
+its path. The same (type, size, seed) always produces the same bytes, so runs
+on different machines or commits are comparable.
+"""
+import csv
+import json
+import os
+import random
+import zipfile
+from typing import Callable, Dict, List
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "invoice payment revenue customer supplier order quarter budget forecast margin "
+    "inventory shipment contract account balance report growth expense profit market "
+    "service product region sales tax total review policy team project schedule"
+).split()
+
+# Scale per size tier; "xl" is opt-in (multi-GB CSV) and not part of the default run
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"pages": 5, "paragraphs": 50, "rows": 2000, "sheets": 2, "csv_bytes": 1 << 20, "records": 1000, "depth": 4},
+    "medium": {"pages": 50, "paragraphs": 1000, "rows": 50000, "sheets": 4, "csv_bytes": 64 << 20, "records": 20000, "depth": 8},
+    "large": {"pages": 300, "paragraphs": 10000, "rows": 250000, "sheets": 6, "csv_bytes": 512 << 20, "records": 200000, "depth": 16},
+    "xl": {"pages": 1000, "paragraphs": 50000, "rows": 1000000, "sheets": 8, "csv_bytes": 4 << 30, "records": 1000000, "depth": 32},
+}
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(sentences))
+
+def generate_pdf(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """Text PDF with a heading and a few paragraphs per page"""
+    import fitz
+
+    doc = fitz.open()
+    for number in range(scale["pages"]):
+        page = doc.new_page()
+        text = f"Section {number + 1}\n\n" + "\n\n".join(_paragraph(rng) for _ in range(4))
+        page.insert_textbox(fitz.Rect(50, 50, 545, 790), text, fontsize=10)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+def generate_image(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """A "scanned" page: dark text on an off-white, noisy, slightly rotated 300 DPI image"""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = 2480, 3508  # A4 at 300 DPI
+    image = Image.new("L", (width, height), 245)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=36)
+    except TypeError:  # Pillow < 10.1 has a single fixed-size default font
+        font = ImageFont.load_default()
+    y = 150
+    while y < height - 150:
+        draw.text((150, y), _sentence(rng, 10), fill=20, font=font)
+        y += 60
+
+    noise = np.random.default_rng(rng.randint(0, 2 ** 31)).normal(0, 12, (height, width))
+    pixels = np.clip(np.asarray(image, dtype=np.float32) + noise, 0, 255).astype(np.uint8)
+    scanned = Image.fromarray(pixels).rotate(rng.uniform(-1.5, 1.5), fillcolor=245)
+    scanned.save(path, dpi=(300, 300))
+    return path
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+def generate_docx(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """DOCX written straight as package XML: headings every 10 paragraphs and a table every 50"""
+    parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{_W}"><w:body>']
+    for index in range(scale["paragraphs"]):
+        if index % 10 == 0:
+            parts.append(
+                '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+                f'<w:r><w:t>Heading {index // 10 + 1}</w:t></w:r></w:p>'
+            )
+        parts.append(f'<w:p><w:r><w:t xml:space="preserve">{escape(_paragraph(rng))}</w:t></w:r></w:p>')
+        if index % 50 == 49:
+            rows = "".join(
+                "<w:tr>" + "".join(
+                    f"<w:tc><w:p><w:r><w:t>{rng.choice(WORDS) if col else row}</w:t></w:r></w:p></w:tc>"
+                    for col in range(4)
+                ) + "</w:tr>"
+                for row in range(10)
+            )
+            parts.append(f"<w:tbl>{rows}</w:tbl>")
+    parts.append("</w:body></w:document>")
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", _DOCX_RELS)
+        package.writestr("word/document.xml", "".join(parts))
+    return path
+
+def _table_row(rng: random.Random, index: int) -> List:
+    return [
+        index,
+        f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        rng.choice(WORDS),
+        rng.choice(("north", "south", "east", "west")),
+        round(rng.uniform(1, 10000), 2),
+        rng.randint(1, 500),
+        None if rng.random() < 0.05 else round(rng.gauss(100, 25), 3)
+    ]
+
+_TABLE_HEADER = ["id", "date", "product", "region", "amount", "quantity", "score"]
+
+def generate_xlsx(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """Workbook with several sheets of mixed numeric/categorical columns"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    rows_per_sheet = max(scale["rows"] // scale["sheets"], 1)
+    for sheet_index in range(scale["sheets"]):
+        sheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+        sheet.append(_TABLE_HEADER)
+        for index in range(rows_per_sheet):
+            sheet.append(_table_row(rng, index))
+    workbook.save(path)
+    return path
+
+def generate_csv(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """CSV of the table rows, written until it reaches csv_bytes"""
+    target = scale["csv_bytes"]
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(_TABLE_HEADER)
+        index = 0
+        while True:
+            # Check the size every batch rather than every row
+            for _ in range(10000):
+                writer.writerow(_table_row(rng, index))
+                index += 1
+            if file.tell() >= target:
+                break
+    return path
+
+def _nested(rng: random.Random, depth: int) -> Dict:
+    node = {"name": rng.choice(WORDS), "value": rng.randint(0, 1000)}
+    if depth > 1:
+        node["child"] = _nested(rng, depth - 1)
+    return node
+
+def generate_json(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """Top-level records array; each record has optional fields, a tag list and a deep nested object"""
+    with open(path, "w") as file:
+        file.write('{"meta": {"source": "benchmark"}, "records": [')
+        for index in range(scale["records"]):
+            record = {
+                "id": index,
+                "customer": {"name": rng.choice(WORDS), "region": rng.choice(("north", "south"))},
+                "amount": round(rng.uniform(1, 1000), 2),
+                "tags": rng.sample(WORDS, 3),
+                "detail": _nested(rng, scale["depth"])
+            }
+            if rng.random() < 0.3:
+                record["note"] = _sentence(rng)
+            file.write(("," if index else "") + json.dumps(record))
+        file.write("]}")
+    return path
+
+def _xml_nested(rng: random.Random, depth: int) -> str:
+    inner = _xml_nested(rng, depth - 1) if depth > 1 else escape(rng.choice(WORDS))
+    return f'<level n="{depth}">{inner}</level>'
+
+def generate_xml(path: str, scale: Dict[str, int], rng: random.Random) -> str:
+    """Repeated <order> records with attributes, line items and a deep nested element"""
+    with open(path, "w") as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n<orders xmlns:b="urn:benchmark">')
+        for index in range(scale["records"]):
+            lines = "".join(
+                f'<line sku="{rng.randint(1000, 9999)}"><qty>{rng.randint(1, 20)}</qty></line>'
+                for _ in range(rng.randint(1, 4))
+            )
+            file.write(
+                f'<order id="{index}"><customer>{escape(rng.choice(WORDS))}</customer>'
+                f'<b:note>{escape(_sentence(rng))}</b:note>{lines}{_xml_nested(rng, scale["depth"])}</order>'
+            )
+        file.write("</orders>")
+    return path
+
+GENERATORS: Dict[str, Callable[[str, Dict[str, int], random.Random], str]] = {
+    "pdf": generate_pdf,
+    "png": generate_image,
+    "docx": generate_docx,
+    "xlsx": generate_xlsx,
+    "csv": generate_csv,
+    "json": generate_json,
+    "xml": generate_xml,
+}
+
+def generate(file_type: str, size: str, directory: str, seed: int = 0) -> str:
+    """Path of the (file_type, size) corpus file in directory, generating it if missing"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{size}-seed{seed}.{file_type}")
+    if not os.path.exists(path):
+        # Seed from the case too, so each file is independent of generation order
+        rng = random.Random(f"{seed}:{file_type}:{size}")
+        tmp_path = f"{path}.tmp.{file_type}"
+        GENERATORS[file_type](tmp_path, SIZES[size], rng)
+        os.replace(tmp_path, path)
+    return path
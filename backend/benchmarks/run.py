@@ -0,0 +1,264 @@
+# backend/benchmarks/run.py
+"""Offline ingestion benchmarks for DocumentProcessor.
+
+Generates the synthetic corpus (cached between runs), runs every _process_*
+path on it and writes a JSON report with throughput, latency percentiles,
+per-stage medians and peak RSS. Each case runs in its own spawned process so
+peak RSS belongs to that case alone. With --baseline the report is compared
+against an earlier one and regressions are listed (exit status 1 with
+--fail-on-regression).
+
+    cd backend
+    python -m benchmarks.run --sizes small medium --output bench.json
+    python -m benchmarks.run --baseline bench.json --fail-on-regression
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import GENERATORS, SIZES, generate
+
+REPORT_VERSION = 1
+PERCENTILES = (50, 90, 95, 99)
+
+def _run_case(file_type: str, path: str, repeats: int, warmup: int, extraction_type: str, work_dir: str) -> Dict[str, Any]:
+    """Child-process entry point: extract one file repeatedly and measure it"""
+    from config.settings import settings
+    from core.document_processor import table_cache
+    from core.document_processor.instrumentation import peak_rss_bytes
+    from core.document_processor.processor import DocumentProcessor
+
+    logging.disable(logging.INFO)
+    processor = DocumentProcessor()
+    latencies, timings = [], []
+
+    async def run_once() -> Dict[str, Any]:
+        # A fresh table cache each run, so the Parquet write is measured every time
+        settings.TABLE_CACHE_DIR = tempfile.mkdtemp(dir=work_dir)
+        table_cache._cache = None
+        try:
+            return await processor.process_document(path, file_type, extraction_type)
+        finally:
+            shutil.rmtree(settings.TABLE_CACHE_DIR, ignore_errors=True)
+
+    async def run_all() -> None:
+        for index in range(warmup + repeats):
+            start = time.perf_counter()
+            result = await run_once()
+            elapsed = time.perf_counter() - start
+            if index >= warmup:
+                latencies.append(elapsed)
+                timings.append(result.get("metadata", {}).get("timings") or {})
+
+    asyncio.run(run_all())
+    return {
+        "latencies": latencies,
+        "timings": timings,
+        "peak_rss_bytes": peak_rss_bytes()
+    }
+
+def _child(queue, *args) -> None:
+    try:
+        queue.put(("ok", _run_case(*args)))
+    except BaseException as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+def summarize(file_type: str, size: str, path: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn one case's raw measurements into report numbers"""
+    latencies = np.array(raw["latencies"])
+    file_bytes = os.path.getsize(path)
+    median = float(np.median(latencies))
+
+    # Median of each stage's wall/CPU time and the counts it handled
+    stages: Dict[str, Dict[str, float]] = {}
+    for name in {name for timing in raw["timings"] for name in timing.get("stages", {})}:
+        values = [timing["stages"][name] for timing in raw["timings"] if name in timing.get("stages", {})]
+        stages[name] = {
+            metric: float(np.median([value.get(metric, 0) for value in values]))
+            for metric in ("wall_seconds", "cpu_seconds", "bytes_read", "pages", "rows")
+        }
+    rows = max((stage["rows"] for stage in stages.values()), default=0)
+    pages = max((stage["pages"] for stage in stages.values()), default=0)
+
+    return {
+        "file_type": file_type,
+        "size": size,
+        "file_bytes": file_bytes,
+        "repeats": len(latencies),
+        "latency_seconds": {
+            "min": float(latencies.min()),
+            "mean": float(latencies.mean()),
+            "max": float(latencies.max()),
+            **{f"p{q}": float(np.percentile(latencies, q)) for q in PERCENTILES}
+        },
+        "throughput": {
+            "mb_per_second": file_bytes / (1 << 20) / median if median else 0.0,
+            "rows_per_second": rows / median if median and rows else None,
+            "pages_per_second": pages / median if median and pages else None
+        },
+        "peak_rss_bytes": raw["peak_rss_bytes"],
+        "stages": stages
+    }
+
+def run_case(file_type: str, size: str, path: str, args: argparse.Namespace, work_dir: str) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_child,
+        args=(queue, file_type, path, args.repeats, args.warmup, args.extraction_type, work_dir)
+    )
+    process.start()
+    deadline = time.monotonic() + args.timeout
+    while True:
+        try:
+            status, payload = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if not process.is_alive():
+                # Killed without reporting, e.g. by the OOM killer
+                status, payload = "error", f"Worker exited with code {process.exitcode}"
+                break
+            if time.monotonic() > deadline:
+                process.kill()
+                status, payload = "error", f"Timed out after {args.timeout}s"
+                break
+    process.join()
+
+    if status != "ok":
+        return {"file_type": file_type, "size": size, "error": payload}
+    return summarize(file_type, size, path, payload)
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Per-case ratios against a baseline report; a ratio above 1 + threshold is a regression"""
+    cases, regressions = {}, []
+    for key, case in report["cases"].items():
+        base = baseline.get("cases", {}).get(key)
+        if not base or "error" in case or "error" in base:
+            continue
+        ratios = {
+            "p50_latency": case["latency_seconds"]["p50"] / base["latency_seconds"]["p50"],
+            "p95_latency": case["latency_seconds"]["p95"] / base["latency_seconds"]["p95"],
+            "peak_rss": case["peak_rss_bytes"] / base["peak_rss_bytes"]
+        }
+        cases[key] = ratios
+        regressions.extend(
+            {"case": key, "metric": metric, "ratio": ratio}
+            for metric, ratio in ratios.items() if ratio > 1 + threshold
+        )
+    return {
+        "baseline_created_at": baseline.get("created_at"),
+        "baseline_commit": baseline.get("environment", {}).get("commit"),
+        "threshold": threshold,
+        "cases": cases,
+        "regressions": regressions
+    }
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--types", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=list(SIZES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs first (model loading, caches)")
+    parser.add_argument("--extraction-type", default="text")
+    parser.add_argument("--corpus-dir", default=os.path.join("data", "benchmarks", "corpus"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds allowed per case")
+    parser.add_argument("--pool", action="store_true", help="Extract through the process pool, as the server does")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown/growth ratio")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Read by the spawned children when they import the settings
+    os.environ["EXTRACTION_USE_PROCESS_POOL"] = str(args.pool)
+    os.environ["EXTRACTION_CACHE_ENABLED"] = "False"
+    os.environ["PRELOAD_MODELS"] = "False"
+
+    report = {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("types", "sizes", "repeats", "warmup", "extraction_type", "seed", "pool")
+        },
+        "cases": {}
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="benchmarks-")
+    try:
+        for size in args.sizes:
+            for file_type in args.types:
+                key = f"{file_type}/{size}"
+                print(f"Generating {key}...", file=sys.stderr)
+                path = generate(file_type, size, args.corpus_dir, args.seed)
+                print(f"Running {key} ({os.path.getsize(path) / (1 << 20):.1f} MB)...", file=sys.stderr)
+                case = run_case(file_type, size, path, args, work_dir)
+                report["cases"][key] = case
+                if "error" in case:
+                    print(f"  failed: {case['error']}", file=sys.stderr)
+                else:
+                    print(
+                        f"  p50 {case['latency_seconds']['p50']:.3f}s, "
+                        f"{case['throughput']['mb_per_second']:.1f} MB/s, "
+                        f"peak RSS {case['peak_rss_bytes'] / (1 << 20):.0f} MB",
+                        file=sys.stderr
+                    )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["comparison"] = compare(report, json.load(file), args.threshold)
+        for regression in report["comparison"]["regressions"]:
+            print(
+                f"Regression: {regression['case']} {regression['metric']} x{regression['ratio']:.2f}",
+                file=sys.stderr
+            )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
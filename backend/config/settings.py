@@ -21,6 +21,105 @@ class Settings:
     
     # Document settings
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
-    MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # 10MB
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1MB
+
+    # Ingestion job settings
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 2))
+    INGESTION_MAX_QUEUE = int(os.getenv("INGESTION_MAX_QUEUE", 100))
+    INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", 3))
+    INGESTION_LEASE_SECONDS = int(os.getenv("INGESTION_LEASE_SECONDS", 120))
+    INGESTION_EMBED_ENABLED = os.getenv("INGESTION_EMBED_ENABLED", "False").lower() == "true"
+    INGESTION_EMBED_BATCH_SIZE = int(os.getenv("INGESTION_EMBED_BATCH_SIZE", 32))
+    INGESTION_OCR_CONCURRENCY = int(os.getenv("INGESTION_OCR_CONCURRENCY", 2))
+    INGESTION_TABULAR_CONCURRENCY = int(os.getenv("INGESTION_TABULAR_CONCURRENCY", 2))
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 1000))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 200))
+    SPILLED_TEXT_MAX_CHARS = int(os.getenv("SPILLED_TEXT_MAX_CHARS", 200_000))
+
+    # Batch ingestion settings
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 1000))
+    BATCH_INSERT_SIZE = int(os.getenv("BATCH_INSERT_SIZE", 50))
+    BATCH_INSERT_MAX_WAIT = float(os.getenv("BATCH_INSERT_MAX_WAIT", 0.5))
+
+    # Model settings
+    PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "False").lower() == "true"
+
+    # Extraction pool settings
+    EXTRACTION_USE_PROCESS_POOL = os.getenv("EXTRACTION_USE_PROCESS_POOL", "True").lower() == "true"
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", max((os.cpu_count() or 2) - 1, 1)))
+    EXTRACTION_MAX_QUEUE = int(os.getenv("EXTRACTION_MAX_QUEUE", 32))
+    EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", 300))
+    EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", 50))
+    EXTRACTION_MEMORY_BUDGET = int(os.getenv("EXTRACTION_MEMORY_BUDGET", 512 * 1024 * 1024))  # 512MB, 0 = unlimited
+    SPILL_DIR = os.getenv("SPILL_DIR", "data/spill")
+    SPILL_TTL_SECONDS = int(os.getenv("SPILL_TTL_SECONDS", 24 * 60 * 60))  # Leftover spill dirs older than this are removed
+
+    # PDF settings
+    PDF_PAGES_PER_RANGE = int(os.getenv("PDF_PAGES_PER_RANGE", 25))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 50))
+    PDF_OCR_ENABLED = os.getenv("PDF_OCR_ENABLED", "True").lower() == "true"
+    PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", 300))
+    PDF_OCR_MIN_CHARS = int(os.getenv("PDF_OCR_MIN_CHARS", 20))
+    PDF_OCR_BATCH_SIZE = int(os.getenv("PDF_OCR_BATCH_SIZE", 4))
+
+    # OCR settings
+    OCR_MODE = os.getenv("OCR_MODE", "cascade")  # cascade | both | tesseract | easyocr
+    OCR_CONFIDENCE_THRESHOLD = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", 60))
+    OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", 50))
+    OCR_MERGE_IOU = float(os.getenv("OCR_MERGE_IOU", 0.3))
+    OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", 8))
+    OCR_BATCH_MAX_WAIT = float(os.getenv("OCR_BATCH_MAX_WAIT", 0.05))
+
+    # OCR pre-processing settings
+    OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", 300))
+    OCR_MAX_IMAGE_SIDE = int(os.getenv("OCR_MAX_IMAGE_SIDE", 2500))
+    OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "True").lower() == "true"
+    OCR_BINARIZE = os.getenv("OCR_BINARIZE", "False").lower() == "true"
+    OCR_DESKEW = os.getenv("OCR_DESKEW", "True").lower() == "true"
+    OCR_TILE_SIZE = int(os.getenv("OCR_TILE_SIZE", 2000))
+    OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", 100))
+
+    # NLP settings
+    NLP_CHUNK_SIZE = int(os.getenv("NLP_CHUNK_SIZE", 100000))
+    NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", 4))
+    LANGDETECT_SAMPLES = int(os.getenv("LANGDETECT_SAMPLES", 8))
+    LANGDETECT_SAMPLE_CHARS = int(os.getenv("LANGDETECT_SAMPLE_CHARS", 1000))
+    LANGDETECT_SEED = int(os.getenv("LANGDETECT_SEED", 0))
+    LANGDETECT_PER_CHUNK = os.getenv("LANGDETECT_PER_CHUNK", "False").lower() == "true"
+
+    # Tabular settings
+    CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", 10000))
+    TABLE_CACHE_ENABLED = os.getenv("TABLE_CACHE_ENABLED", "True").lower() == "true"
+    TABLE_CACHE_DIR = os.getenv("TABLE_CACHE_DIR", "data/tables")
+    TABLE_CACHE_COMPRESSION = os.getenv("TABLE_CACHE_COMPRESSION", "zstd")
+    TABLE_CACHE_MAX_BYTES = int(os.getenv("TABLE_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))  # 2GB
+
+    # JSON settings
+    JSON_SAMPLE_SIZE = int(os.getenv("JSON_SAMPLE_SIZE", 1000))
+    JSON_PREVIEW_RECORDS = int(os.getenv("JSON_PREVIEW_RECORDS", 10))
+    JSON_PREVIEW_MAX_CHARS = int(os.getenv("JSON_PREVIEW_MAX_CHARS", 64 * 1024))
+    JSON_MAX_RECORDS = int(os.getenv("JSON_MAX_RECORDS", 100000))
+    JSON_MAX_BYTES = int(os.getenv("JSON_MAX_BYTES", 256 * 1024 * 1024))  # 256MB
+    JSON_COUNT_MODE = os.getenv("JSON_COUNT_MODE", "estimate")  # "estimate" or "scan"
+    JSON_SAMPLE_SEED = int(os.getenv("JSON_SAMPLE_SEED", 42))
+
+    # XML settings
+    XML_SAMPLE_SIZE = int(os.getenv("XML_SAMPLE_SIZE", 5))
+    XML_MAX_RECORD_PATHS = int(os.getenv("XML_MAX_RECORD_PATHS", 10))
+    XML_MAX_PATHS = int(os.getenv("XML_MAX_PATHS", 2000))
+    XML_CHUNK_SIZE = int(os.getenv("XML_CHUNK_SIZE", 2000))
+    XML_MAX_TEXT_CHARS = int(os.getenv("XML_MAX_TEXT_CHARS", 5000000))
+    XML_SAMPLE_SEED = int(os.getenv("XML_SAMPLE_SEED", 42))
+
+    # YAML settings
+    YAML_CHUNK_SIZE = int(os.getenv("YAML_CHUNK_SIZE", 2000))
+
+    # Cache settings
+    EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "True").lower() == "true"
+    EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "data/cache/extractions")
+    EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", 1024 * 1024 * 1024))  # 1GB
+    OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "data/cache/ocr_pages")
+    OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", 50000))
 
 settings = Settings()
\ No newline at end of file
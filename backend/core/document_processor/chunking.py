@@ -0,0 +1,88 @@
+# backend/core/document_processor/chunking.py
+import bisect
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.document_processor.memory_budget import read_spill
+from core.document_processor.result import Block
+
+# Block kinds whose edges are preferred chunk boundaries
+_STRUCTURAL_KINDS = ("section", "heading", "page", "paragraph", "table", "chunk", "record")
+
+def chunk_text(text: str, blocks: List[Block], chunk_size: int = 1000, overlap: int = 200) -> List[Block]:
+    """Split text into retrieval chunks of at most chunk_size characters.
+
+    Chunks end right before a heading, or else on another structural boundary
+    (section/page/paragraph edge), when one falls in the back half of the
+    window; otherwise on a newline, else on a space. Consecutive chunks
+    overlap by up to `overlap` characters, except that a chunk ending right
+    before a heading is not overlapped into the next one.
+    """
+    if not text:
+        return []
+
+    boundaries = sorted({
+        edge
+        for block in blocks if block.kind in _STRUCTURAL_KINDS
+        for edge in (block.char_start, block.char_end)
+        if 0 < edge < len(text)
+    })
+    heading_starts = sorted({
+        block.char_start for block in blocks
+        if block.kind in ("heading", "section") and 0 < block.char_start < len(text)
+    })
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        limit = min(start + chunk_size, len(text))
+        end = limit
+        if limit < len(text):
+            # Prefer cutting right before a heading, then at any structural edge
+            end = _boundary_before(heading_starts, start + chunk_size // 2, limit)
+            if end is None:
+                end = _boundary_before(boundaries, start + chunk_size // 2, limit)
+            if end is None:
+                newline = text.rfind("\n", start + chunk_size // 2, limit)
+                space = text.rfind(" ", start + chunk_size // 2, limit)
+                end = newline + 1 if newline != -1 else space + 1 if space != -1 else limit
+
+        if text[start:end].strip():
+            chunks.append(Block("chunk", start, end))
+        if end >= len(text):
+            break
+
+        next_start = end
+        if overlap and not _contains(heading_starts, end):
+            next_start = max(end - overlap, start + 1)
+            space = text.find(" ", next_start, end)
+            if space != -1:
+                next_start = space + 1
+        start = next_start
+    return chunks
+
+def chunk_spilled(partial: Optional[Dict[str, Any]], chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """Retrieval chunks of the text a result spilled past its memory budget.
+
+    Read from disk a window at a time; the last chunk of each window is
+    carried into the next, so chunks match those chunk_text would produce.
+    """
+    carry = ""
+    for window in read_spill(partial):
+        text = carry + window
+        chunks = chunk_text(text, [], chunk_size, overlap)
+        for block in chunks[:-1]:
+            yield text[block.char_start:block.char_end]
+        carry = text[chunks[-1].char_start:] if chunks else ""
+    for block in chunk_text(carry, [], chunk_size, overlap):
+        yield carry[block.char_start:block.char_end]
+
+def _contains(values: List[int], value: int) -> bool:
+    index = bisect.bisect_left(values, value)
+    return index < len(values) and values[index] == value
+
+def _boundary_before(boundaries: List[int], low: int, high: int):
+    """Largest boundary in (low, high], or None"""
+    index = bisect.bisect_right(boundaries, high)
+    if index and boundaries[index - 1] > low:
+        return boundaries[index - 1]
+    return None
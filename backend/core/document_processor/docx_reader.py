@@ -0,0 +1,290 @@
+# backend/core/document_processor/docx_reader.py
+import json
+import logging
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.document_processor.memory_budget import MemoryBudget, size_of
+
+logger = logging.getLogger(__name__)
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# docProps/core.xml element -> python-docx core_properties name
+_CORE_PROPERTIES = {
+    "title": "title",
+    "subject": "subject",
+    "creator": "author",
+    "keywords": "keywords",
+    "description": "comments",
+    "lastModifiedBy": "last_modified_by",
+    "revision": "revision",
+    "created": "created",
+    "modified": "modified",
+    "lastPrinted": "last_printed",
+    "category": "category",
+    "contentStatus": "content_status",
+    "identifier": "identifier",
+    "language": "language",
+    "version": "version"
+}
+
+_HEADING_STYLE = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _on(element: Optional[ET.Element]) -> Optional[bool]:
+    """Toggle property (w:b, w:i): None when not set on the run"""
+    if element is None:
+        return None
+    return element.get(f"{W}val", "true").lower() not in ("0", "false", "off")
+
+def _outline_level(element: Optional[ET.Element]) -> Optional[int]:
+    """Heading level 1-9 from w:outlineLvl 0-8; 0 for 9 ("body text"), None when unset"""
+    if element is None:
+        return None
+    try:
+        value = int(element.get(f"{W}val", 0))
+    except ValueError:
+        return None
+    return value + 1 if 0 <= value <= 8 else 0
+
+class DocxReader:
+    """DOCX extraction straight from the package XML.
+
+    Paragraph text, headings and tables come from a single iterparse pass over
+    word/document.xml; styles.xml is only read to name styles and find heading
+    levels. Run-level formatting is built only when include_runs is set.
+    """
+
+    def __init__(self, include_runs: bool = False, include_tables: bool = True, budget: MemoryBudget = None):
+        self.include_runs = include_runs
+        self.include_tables = include_tables
+        # Paragraphs and tables past the budget are spilled to text/JSON lines files
+        self.budget = budget or MemoryBudget(limit_bytes=0)
+
+    def read(self, file_path: str) -> Dict[str, Any]:
+        with zipfile.ZipFile(file_path) as package:
+            names = set(package.namelist())
+            styles = self._read_styles(package) if "word/styles.xml" in names else {}
+            properties = self._read_core_properties(package) if "docProps/core.xml" in names else {}
+            with package.open("word/document.xml") as document:
+                paragraphs, tables = self._read_body(document, styles)
+
+        text, sections = self._sections(paragraphs)
+        return {
+            "paragraphs": paragraphs,
+            "tables": tables,
+            "text": text,
+            "sections": sections,
+            "headings": [
+                {key: p[key] for key in ("text", "level", "index", "char_start")}
+                for p in paragraphs if p.get("level")
+            ],
+            "core_properties": properties
+        }
+
+    def _read_body(self, document, styles: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[List[List[str]]]]:
+        default_style = styles.get(None, {}).get("name", "Normal")
+        paragraphs = []
+        tables = []
+        depth = 0
+        body = None
+        text_spill = None
+        table_spill = None
+        index = 0
+
+        for event, elem in ET.iterparse(document, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    body = elem
+                continue
+            depth -= 1
+            # Body-level blocks: w:document > w:body > (w:p | w:tbl)
+            if depth != 2:
+                continue
+
+            if elem.tag == f"{W}p":
+                paragraph = self._paragraph(elem, styles, default_style)
+                paragraph["index"] = index
+                index += 1
+                if text_spill is None and self.budget.reserve(size_of(paragraph)):
+                    paragraphs.append(paragraph)
+                else:
+                    if text_spill is None:
+                        text_spill = self.budget.spill("docx_text.txt", f"DOCX paragraphs from {paragraph['index']} spilled")
+                    text_spill.write(paragraph["text"] + "\n")
+            elif elem.tag == f"{W}tbl" and self.include_tables:
+                table = self._table(elem)
+                if table_spill is None and self.budget.reserve(size_of(table)):
+                    tables.append(table)
+                else:
+                    if table_spill is None:
+                        table_spill = self.budget.spill("docx_tables.jsonl", f"DOCX tables from {len(tables)} spilled")
+                    table_spill.write(json.dumps(table) + "\n")
+            # Blocks are fully read once they end; drop them from the tree
+            del body[:]
+
+        return paragraphs, tables
+
+    def _paragraph(self, elem: ET.Element, styles: Dict[str, Dict[str, Any]], default_style: str) -> Dict[str, Any]:
+        style_id = None
+        level = None
+        properties = elem.find(f"{W}pPr")
+        if properties is not None:
+            style = properties.find(f"{W}pStyle")
+            if style is not None:
+                style_id = style.get(f"{W}val")
+            # Direct formatting wins over the style, including "body text" (0)
+            level = _outline_level(properties.find(f"{W}outlineLvl"))
+
+        style_info = styles.get(style_id, {})
+        if level is None:
+            level = style_info.get("level")
+        paragraph = {
+            "text": _text(elem),
+            "style": style_info.get("name", style_id or default_style)
+        }
+        if level:
+            paragraph["level"] = level
+        if self.include_runs:
+            paragraph["runs"] = [self._run(run) for run in elem.iter(f"{W}r")]
+        return paragraph
+
+    @staticmethod
+    def _run(run: ET.Element) -> Dict[str, Any]:
+        properties = run.find(f"{W}rPr")
+        bold = italic = underline = font = None
+        if properties is not None:
+            bold = _on(properties.find(f"{W}b"))
+            italic = _on(properties.find(f"{W}i"))
+            underline_elem = properties.find(f"{W}u")
+            if underline_elem is not None:
+                underline = underline_elem.get(f"{W}val", "single") != "none"
+            fonts = properties.find(f"{W}rFonts")
+            if fonts is not None:
+                font = fonts.get(f"{W}ascii") or fonts.get(f"{W}hAnsi")
+        return {
+            "text": _text(run),
+            "bold": bold,
+            "italic": italic,
+            "underline": underline,
+            "font": font
+        }
+
+    @staticmethod
+    def _table(elem: ET.Element) -> List[List[str]]:
+        rows = []
+        for row in elem.findall(f"{W}tr"):
+            cells = []
+            for cell in row.findall(f"{W}tc"):
+                cell_text = "\n".join(_text(p) for p in cell.findall(f"{W}p"))
+                span = cell.find(f"{W}tcPr/{W}gridSpan")
+                # python-docx repeats a horizontally merged cell once per grid column
+                cells.extend([cell_text] * (int(span.get(f"{W}val", 1)) if span is not None else 1))
+            rows.append(cells)
+        return rows
+
+    @staticmethod
+    def _sections(paragraphs: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Join paragraph text and split it at headings, recording offsets"""
+        parts = []
+        sections = []
+        offset = 0
+        current = None
+
+        for paragraph in paragraphs:
+            paragraph["char_start"] = offset
+            if paragraph.get("level") or current is None:
+                if current is not None:
+                    current["char_end"] = offset - 1
+                    sections.append(current)
+                current = {
+                    "title": paragraph["text"] if paragraph.get("level") else None,
+                    "level": paragraph.get("level"),
+                    "paragraph_start": paragraph["index"],
+                    "char_start": offset
+                }
+            current["paragraph_end"] = paragraph["index"]
+            parts.append(paragraph["text"])
+            offset += len(paragraph["text"]) + 1
+
+        if current is not None:
+            current["char_end"] = max(offset - 1, current["char_start"])
+            sections.append(current)
+        return "\n".join(parts), sections
+
+    @staticmethod
+    def _read_styles(package: zipfile.ZipFile) -> Dict[Optional[str], Dict[str, Any]]:
+        """styleId -> {"name", "level"}; the default paragraph style is also under None"""
+        styles: Dict[Optional[str], Dict[str, Any]] = {}
+        root = ET.fromstring(package.read("word/styles.xml"))
+        for style in root.findall(f"{W}style"):
+            if style.get(f"{W}type") != "paragraph":
+                continue
+            style_id = style.get(f"{W}styleId")
+            name_elem = style.find(f"{W}name")
+            name = name_elem.get(f"{W}val") if name_elem is not None else style_id
+
+            level = None
+            outline_level = _outline_level(style.find(f"{W}pPr/{W}outlineLvl"))
+            match = _HEADING_STYLE.match(name or "")
+            if outline_level is not None:
+                level = outline_level or None  # Outline level 9 marks a body text style
+            elif match:
+                level = int(match.group(1))
+            elif (name or "").lower() == "title":
+                level = 1
+
+            info = {"name": _display_name(name), "level": level}
+            styles[style_id] = info
+            if style.get(f"{W}default") in ("1", "true"):
+                styles[None] = info
+        return styles
+
+    @staticmethod
+    def _read_core_properties(package: zipfile.ZipFile) -> Dict[str, Any]:
+        properties = {}
+        root = ET.fromstring(package.read("docProps/core.xml"))
+        for elem in root:
+            name = _CORE_PROPERTIES.get(_local_name(elem.tag))
+            if name is None:
+                continue
+            value = (elem.text or "").strip()
+            if name in ("created", "modified", "last_printed"):
+                value = _parse_datetime(value)
+            elif name == "revision":
+                value = int(value) if value.isdigit() else None
+            properties[name] = value
+        return properties
+
+def _text(elem: ET.Element) -> str:
+    """Visible text of a paragraph or run: w:t, tabs and breaks (deleted text is w:delText)"""
+    parts = []
+    for node in elem.iter():
+        if node.tag == f"{W}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{W}tab":
+            parts.append("\t")
+        elif node.tag in (f"{W}br", f"{W}cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+def _display_name(name: Optional[str]) -> Optional[str]:
+    # styles.xml stores built-in names in lower case ("heading 1"); Word shows "Heading 1"
+    if name and name.islower():
+        return name[0].upper() + name[1:]
+    return name
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
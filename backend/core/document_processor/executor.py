@@ -0,0 +1,348 @@
+# backend/core/document_processor/executor.py
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class ExtractionError(Exception):
+    """Raised when an extraction job cannot be completed by the pool"""
+
+class ExtractionQueueFull(ExtractionError):
+    """Raised when the pool already holds the maximum number of queued jobs"""
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when an extraction job exceeds its time limit"""
+
+class ExtractionMemoryExceeded(ExtractionError):
+    """Raised when an extraction runs out of memory despite its budget"""
+
+# Set in pool workers so nested code (e.g. page-parallel PDF extraction)
+# runs inline instead of spawning pools of its own.
+_in_worker = False
+_worker_processor = None
+
+def _init_worker() -> None:
+    global _in_worker
+    _in_worker = True
+
+def in_worker_process() -> bool:
+    return _in_worker
+
+def _run_extraction(
+    file_path: str,
+    file_type: str,
+    extraction_type: str,
+    options: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Worker entry point. Runs one extraction inline and returns a picklable result."""
+    global _worker_processor
+    from core.document_processor.processor import DocumentProcessor
+
+    # One processor per worker; the model registry keeps models warm between jobs
+    if _worker_processor is None:
+        _worker_processor = DocumentProcessor(use_process_pool=False)
+    return asyncio.run(
+        _worker_processor.extract(file_path, file_type, extraction_type, options)
+    )
+
+class _Worker:
+    """One spawned worker process and the pipe its jobs are sent over"""
+
+    def __init__(self, context, preload_models: bool = False):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, preload_models), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        # Last model registry status the worker reported
+        self.models: Dict[str, Any] = {}
+
+    def _recv(self) -> tuple:
+        """Next job outcome, recording any model status reports sent before it"""
+        while True:
+            message = self.conn.recv()
+            if message[0] != "models":
+                return message
+            self.models = message[1]
+
+    def call(self, fn: Callable[..., Any], args: tuple) -> tuple:
+        """Send one job and block until the worker answers; EOFError if it died"""
+        self.conn.send((fn, args))
+        return self._recv()
+
+    def poll_models(self) -> Dict[str, Any]:
+        """Pick up status reports already sent by an idle worker without blocking"""
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == "models":
+                    self.models = message[1]
+        except (EOFError, OSError):
+            pass
+        return self.models
+
+    def stop(self) -> None:
+        """Let the worker exit once it is idle"""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+def _report_models(conn) -> None:
+    from core.document_processor.model_registry import model_registry
+    try:
+        conn.send(("models", model_registry.status()))
+    except OSError:
+        # The pool already let go of this worker; the next recv sees EOF
+        pass
+
+def _worker_main(conn, preload_models: bool = False) -> None:
+    """Worker process loop: run jobs from the pipe until told to stop"""
+    _init_worker()
+    if preload_models:
+        # Jobs run here, not in the serving process, so this is where models must be warm
+        from core.document_processor.model_registry import model_registry
+        model_registry.preload()
+    _report_models(conn)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            outcome = ("ok", fn(*args))
+        except Exception as e:
+            outcome = ("error", e)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            # Result or exception that can't be pickled back
+            conn.send(("error", ExtractionError(f"Unpicklable extraction outcome: {e}")))
+        # Jobs load models lazily; keep the serving process's view of them current
+        _report_models(conn)
+
+class ExtractionExecutor:
+    """Bounded process pool that runs CPU-bound document extraction off the event loop.
+
+    Each worker runs one job at a time over its own pipe, so a job that
+    overruns its timeout (or crashes its worker) costs only that worker:
+    it is killed and a fresh one is spawned for the next job, while jobs
+    on the other workers carry on.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_queue: int = None,
+        timeout: float = None,
+        max_tasks_per_child: int = None,
+        preload_models: bool = None
+    ):
+        self.max_workers = max_workers or settings.EXTRACTION_WORKERS
+        self.max_queue = max_queue if max_queue is not None else settings.EXTRACTION_MAX_QUEUE
+        self.timeout = timeout or settings.EXTRACTION_TIMEOUT
+        self.max_tasks_per_child = max_tasks_per_child or settings.EXTRACTION_MAX_TASKS_PER_CHILD
+        self.preload_models = settings.PRELOAD_MODELS if preload_models is None else preload_models
+        # spawn avoids forking a parent that already holds torch/OpenMP threads
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._busy: Set[_Worker] = set()
+        self._slots = asyncio.Semaphore(self.max_workers)
+        # Threads that wait on worker pipes, one per busy worker
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extraction-wait")
+        self._pending = 0
+        self._closed = False
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "worker_restarts": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0
+        }
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.preload_models)
+
+    def start(self) -> None:
+        """Spawn every worker up front so their model preload runs before the first job"""
+        while not self._closed and len(self._idle) + len(self._busy) < self.max_workers:
+            self._idle.append(self._spawn())
+
+    def _checkout(self) -> _Worker:
+        worker = self._idle.pop() if self._idle else self._spawn()
+        self._busy.add(worker)
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        self._busy.discard(worker)
+        worker.tasks += 1
+        if self._closed or worker.tasks >= self.max_tasks_per_child:
+            # Recycled so leaks in native extractors don't accumulate
+            worker.stop()
+            if not self._closed and self.preload_models:
+                # Warm the replacement now rather than on its first job
+                self._idle.append(self._spawn())
+        else:
+            self._idle.append(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        self._busy.discard(worker)
+        worker.kill()
+        self.metrics["worker_restarts"] += 1
+
+    async def submit(
+        self,
+        file_path: str,
+        file_type: str,
+        extraction_type: str = "text",
+        options: Dict[str, Any] = None,
+        timeout: float = None
+    ) -> Dict[str, Any]:
+        """Run a whole-document extraction in the pool and wait for its result"""
+        return await self.run(
+            _run_extraction, file_path, file_type, extraction_type, options,
+            timeout=timeout
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: float = None) -> Any:
+        """Run a picklable module-level function in the pool and wait for its result.
+
+        The timeout covers time spent queued as well as running.
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self.metrics["rejected"] += 1
+            raise ExtractionQueueFull(
+                f"Extraction queue is full ({self._pending} jobs pending)"
+            )
+
+        self._pending += 1
+        self.metrics["submitted"] += 1
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        deadline = loop.time() + timeout
+        acquired = False
+        worker = None
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+            acquired = True
+            worker = self._checkout()
+            try:
+                status, value = await asyncio.wait_for(
+                    loop.run_in_executor(self._threads, worker.call, fn, args),
+                    timeout=max(deadline - loop.time(), 0)
+                )
+            except (EOFError, ConnectionError) as e:
+                # The worker died mid-job (e.g. killed by the OOM killer)
+                self._discard(worker)
+                exitcode, worker = worker.process.exitcode, None
+                raise ExtractionError(f"Extraction worker crashed (exit code {exitcode}): {e}")
+            self._checkin(worker)
+            worker = None
+            if status == "error":
+                raise value
+            self.metrics["completed"] += 1
+            return value
+
+        except asyncio.TimeoutError:
+            self.metrics["timed_out"] += 1
+            if worker is not None:
+                logger.warning(f"Extraction job {fn.__name__} timed out while running, replacing its worker")
+                self._discard(worker)
+            raise ExtractionTimeout(
+                f"Extraction job {fn.__name__} exceeded {timeout}s"
+            )
+        except asyncio.CancelledError:
+            self.metrics["cancelled"] += 1
+            # The caller gave up; a running job can't be interrupted, so replace its worker
+            if worker is not None:
+                logger.warning(f"Extraction job {fn.__name__} cancelled while running, replacing its worker")
+                self._discard(worker)
+            raise
+        except Exception:
+            self.metrics["failed"] += 1
+            if worker is not None:
+                # Nothing reached the worker, e.g. arguments that can't be pickled
+                self._checkin(worker)
+            raise
+        finally:
+            if acquired:
+                self._slots.release()
+            self._pending -= 1
+            elapsed = time.perf_counter() - start
+            self.metrics["total_seconds"] += elapsed
+            self.metrics["max_seconds"] = max(self.metrics["max_seconds"], elapsed)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        finished = sum(self.metrics[name] for name in ("completed", "failed", "timed_out", "cancelled"))
+        return {
+            **self.metrics,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.max_workers),
+            "queued": max(self._pending - self.max_workers, 0),
+            "avg_seconds": self.metrics["total_seconds"] / finished if finished else 0.0
+        }
+
+    def model_status(self) -> List[Dict[str, Any]]:
+        """Model registry status last reported by each live worker"""
+        workers = [(worker, "idle") for worker in self._idle]
+        workers += [(worker, "busy") for worker in self._busy]
+        return [
+            {
+                "pid": worker.process.pid,
+                "state": state,
+                "models": worker.poll_models() if state == "idle" else worker.models
+            }
+            for worker, state in workers
+        ]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop idle workers; busy ones finish their job first (wait) or are killed"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+        for worker in list(self._busy):
+            if not wait:
+                self._discard(worker)
+        if wait:
+            for worker in idle:
+                worker.process.join()
+        self._threads.shutdown(wait=wait, cancel_futures=True)
+
+_executor: Optional[ExtractionExecutor] = None
+
+def get_extraction_executor() -> ExtractionExecutor:
+    """Process-wide extraction pool, created on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ExtractionExecutor()
+    return _executor
+
+def shutdown_extraction_executor(wait: bool = True) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
@@ -0,0 +1,193 @@
+# backend/core/document_processor/extraction_cache.py
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+from core.document_processor.result import ExtractionResult, FORMAT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes, so stale cache entries stop matching
+PROCESSOR_VERSION = "1"
+
+class ExtractionCache:
+    """Content-addressed on-disk cache of serialized ExtractionResults.
+
+    Keys are SHA-256 over the file's content hash, processor and result format
+    versions, file type, extraction type and options, so any change produces
+    a different key and nothing is ever invalidated in place. Entries live in
+    {cache_dir}/{content_hash}/{digest}.bin, so every entry of some content
+    can be dropped at once (remove_content); reads bump the mtime, and the
+    oldest entries are evicted once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.EXTRACTION_CACHE_DIR
+        self.max_bytes = max_bytes or settings.EXTRACTION_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "errors": 0,
+            "hit_seconds": 0.0
+        }
+
+    @staticmethod
+    def key(content_hash: str, file_type: str, extraction_type: str, options: Dict[str, Any] = None) -> str:
+        relevant = {k: v for k, v in (options or {}).items() if k != "content_hash"}
+        material = json.dumps(
+            [content_hash, PROCESSOR_VERSION, FORMAT_VERSION, file_type.lower(), extraction_type, relevant],
+            sort_keys=True,
+            default=str
+        )
+        return f"{_safe(content_hash)}-{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def _path(self, key: str) -> str:
+        content, digest = key.rsplit("-", 1)
+        return os.path.join(self.cache_dir, content, f"{digest}.bin")
+
+    def remove_content(self, content_hash: str) -> None:
+        """Drop every entry for a content hash (e.g. once its cached tables are gone)"""
+        directory = os.path.join(self.cache_dir, _safe(content_hash))
+        try:
+            size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".bin"))
+        except FileNotFoundError:
+            return
+        shutil.rmtree(directory, ignore_errors=True)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(self._total_bytes - size, 0)
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        start = time.perf_counter()
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                result = ExtractionResult.from_bytes(file.read())
+            os.utime(path)  # LRU: recently read entries are evicted last
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable extraction cache entry {key}: {e}")
+            self._count("errors")
+            self._count("misses")
+            self._remove(path)
+            return None
+
+        self._count("hits")
+        with self._lock:
+            self.metrics["hit_seconds"] += time.perf_counter() - start
+        return result
+
+    def put(self, key: str, result: ExtractionResult) -> None:
+        path = self._path(key)
+        try:
+            data = result.to_bytes()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+            self._count("errors")
+            return
+
+        self._count("writes")
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - previous
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is at 90% of max_bytes"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self._total_bytes = total
+            self.metrics["evictions"] += evicted
+        logger.info(f"Extraction cache evicted {evicted} entries ({total} bytes remain)")
+
+    def _scan_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".bin"):
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except FileNotFoundError:
+                        continue
+        return total
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.metrics[name] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                **self.metrics,
+                "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0,
+                "avg_hit_seconds": self.metrics["hit_seconds"] / self.metrics["hits"] if self.metrics["hits"] else 0.0,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+def _safe(content_hash: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", content_hash) or "_"
+
+_cache: Optional[ExtractionCache] = None
+
+def get_extraction_cache() -> ExtractionCache:
+    """Process-wide extraction cache, created on first use"""
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache()
+    return _cache
@@ -0,0 +1,10 @@
+# backend/core/document_processor/hashing.py
+import hashlib
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
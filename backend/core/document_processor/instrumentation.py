@@ -0,0 +1,212 @@
+# backend/core/document_processor/instrumentation.py
+import bisect
+import contextvars
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is +Inf
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current: contextvars.ContextVar[Optional["StageRecorder"]] = contextvars.ContextVar("stage_recorder", default=None)
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far.
+
+    On Linux this is VmHWM, which starts fresh in each new program; ru_maxrss
+    there carries the parent's peak over fork/exec, so spawned pool workers
+    would report the server's footprint.
+    """
+    try:
+        with open("/proc/self/status", "rb") as status:
+            for line in status:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+class StageStats:
+    """Counters for one stage; add() is safe to call from worker threads"""
+
+    __slots__ = ("wall_seconds", "cpu_seconds", "calls", "bytes_read", "pages", "rows", "peak_rss_bytes")
+
+    def __init__(self):
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.calls = 0
+        self.bytes_read = 0
+        self.pages = 0
+        self.rows = 0
+        self.peak_rss_bytes = 0
+
+    def add(self, bytes_read: int = 0, pages: int = 0, rows: int = 0) -> None:
+        self.bytes_read += bytes_read
+        self.pages += pages
+        self.rows += rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class StageRecorder:
+    """Per-job stage timings: wall and CPU time, bytes read, pages/rows
+    handled and the process's peak RSS when each stage finished.
+
+    CPU time is process-wide (time.process_time), so it includes other threads
+    of the same process running at the time; work sent to other processes
+    (e.g. PDF page ranges in the extraction pool) shows up as wall time only.
+    Peak RSS is a high-water mark, so a stage's value reflects the largest
+    footprint reached by the end of that stage, not memory it alone used.
+    Stages may nest; an outer stage's time includes its inner stages.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, bytes_read: int = 0, pages: int = 0, rows: int = 0) -> Iterator[StageStats]:
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+        stats.add(bytes_read, pages, rows)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield stats
+        finally:
+            with self._lock:
+                stats.wall_seconds += time.perf_counter() - wall
+                stats.cpu_seconds += time.process_time() - cpu
+                stats.calls += 1
+                stats.peak_rss_bytes = max(stats.peak_rss_bytes, peak_rss_bytes())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+                "total": {
+                    "wall_seconds": time.perf_counter() - self._wall_start,
+                    "cpu_seconds": time.process_time() - self._cpu_start,
+                    "peak_rss_bytes": peak_rss_bytes()
+                }
+            }
+
+@contextmanager
+def recording() -> Iterator[StageRecorder]:
+    """Make a new StageRecorder current for the enclosed extraction.
+
+    The recorder is held in a context variable, so stages opened inside
+    asyncio.to_thread calls made from the same task land in it too.
+    """
+    recorder = StageRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def stage(name: str, bytes_read: int = 0, pages: int = 0, rows: int = 0) -> Iterator[StageStats]:
+    """Time a stage of the current extraction; a no-op outside recording()"""
+    recorder = _current.get()
+    if recorder is None:
+        yield StageStats()
+        return
+    with recorder.stage(name, bytes_read, pages, rows) as stats:
+        yield stats
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus layout (cumulative on export)"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=SECONDS_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+class StageMetrics:
+    """Process-wide histograms of stage wall/CPU time per file type"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._peak_rss: Dict[str, int] = {}
+
+    def observe(self, file_type: str, timings: Optional[Dict[str, Any]]) -> None:
+        """Record the timings a StageRecorder produced for one document"""
+        if not timings:
+            return
+        file_type = file_type.lower()
+        with self._lock:
+            stages = dict(timings.get("stages", {}))
+            stages["total"] = timings.get("total", {})
+            for name, stats in stages.items():
+                for metric in ("wall_seconds", "cpu_seconds"):
+                    if metric in stats:
+                        key = (file_type, name, metric)
+                        self._histograms.setdefault(key, Histogram()).observe(stats[metric])
+            peak = timings.get("total", {}).get("peak_rss_bytes", 0)
+            self._peak_rss[file_type] = max(self._peak_rss.get(file_type, 0), peak)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{file_type: {stage: {metric: histogram}}} plus the peak RSS seen per file type"""
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for (file_type, name, metric), histogram in sorted(self._histograms.items()):
+                result.setdefault(file_type, {"stages": {}, "peak_rss_bytes": self._peak_rss.get(file_type, 0)})
+                result[file_type]["stages"].setdefault(name, {})[metric] = histogram.to_dict()
+            return result
+
+    def prometheus(self) -> str:
+        """Histograms in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            for metric in ("wall_seconds", "cpu_seconds"):
+                name = f"document_extraction_stage_{metric}"
+                lines.append(f"# TYPE {name} histogram")
+                for (file_type, stage_name, key_metric), histogram in sorted(self._histograms.items()):
+                    if key_metric != metric:
+                        continue
+                    labels = f'file_type="{file_type}",stage="{stage_name}"'
+                    for bound, count in histogram.to_dict()["buckets"].items():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            lines.append("# TYPE document_extraction_peak_rss_bytes gauge")
+            for file_type, peak in sorted(self._peak_rss.items()):
+                lines.append(f'document_extraction_peak_rss_bytes{{file_type="{file_type}"}} {peak}')
+        return "\n".join(lines) + "\n"
+
+_metrics: Optional[StageMetrics] = None
+
+def get_stage_metrics() -> StageMetrics:
+    """Process-wide stage histograms, created on first use"""
+    global _metrics
+    if _metrics is None:
+        _metrics = StageMetrics()
+    return _metrics
@@ -0,0 +1,339 @@
+# backend/core/document_processor/json_profile.py
+import json
+import logging
+import os
+import random
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+from core.document_processor.memory_budget import MemoryBudget, size_of
+
+logger = logging.getLogger(__name__)
+
+# Fastest first; "python" is always available
+_IJSON_BACKENDS = ("yajl2_c", "yajl2_cffi", "python")
+
+# Events that start a value at a given prefix (end_* and map_key don't)
+_VALUE_EVENTS = {"start_map", "start_array", "null", "boolean", "integer", "double", "number", "string"}
+
+class _ByteBudgetReached(Exception):
+    """Raised by JSONProfiler._event_records when it stops at the byte budget"""
+
+def load_ijson() -> Tuple[str, Any]:
+    """Fastest available ijson backend, as (name, module)"""
+    import ijson
+    for name in _IJSON_BACKENDS:
+        try:
+            return name, ijson.get_backend(name)
+        except Exception:
+            continue
+    return ijson.backend, ijson
+
+def json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, (float, Decimal)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    return type(value).__name__
+
+class ReservoirSample:
+    """Uniform fixed-size sample of a stream (Algorithm R), reproducible via seed.
+
+    With a budget, each kept item is reserved (and released when replaced);
+    an item the budget refuses is left out and counted in refused.
+    """
+
+    def __init__(self, size: int, seed: int = 42, budget: MemoryBudget = None):
+        self.size = size
+        self.items: List[Any] = []
+        self.seen = 0
+        self.refused = 0
+        self.budget = budget
+        self._sizes: List[int] = []
+        self._random = random.Random(seed)
+
+    def add(self, item: Any) -> None:
+        self.seen += 1
+        if len(self.items) < self.size:
+            index = len(self.items)
+        else:
+            index = self._random.randrange(self.seen)
+            if index >= self.size:
+                return
+
+        nbytes = 0
+        if self.budget is not None:
+            nbytes = size_of(item)
+            if not self.budget.reserve(nbytes):
+                self.refused += 1
+                return
+        if index == len(self.items):
+            self.items.append(item)
+            self._sizes.append(nbytes)
+        else:
+            if self.budget is not None:
+                self.budget.release(self._sizes[index])
+            self.items[index] = item
+            self._sizes[index] = nbytes
+
+class SchemaInference:
+    """Merged schema of sampled records.
+
+    Paths are dotted ("address.city"), array items use "[]" ("tags[]") and the
+    record itself is "$". Each path keeps type frequencies and how many records
+    contain it; a field is optional when it is missing from some of the
+    records that contain its parent.
+    """
+
+    def __init__(self, max_depth: int = 5, max_fields: int = 500, max_array_items: int = 20):
+        self.max_depth = max_depth
+        self.max_fields = max_fields
+        self.max_array_items = max_array_items
+        self.fields: Dict[str, Dict[str, Any]] = {}
+        self.records = 0
+
+    def add(self, record: Any) -> None:
+        self.records += 1
+        self._walk(record, "$", None, 0, set())
+
+    def _walk(self, value: Any, path: str, parent: Optional[str], depth: int, seen: set) -> None:
+        field = self.fields.get(path)
+        if field is None:
+            if len(self.fields) >= self.max_fields:
+                return
+            field = self.fields[path] = {"parent": parent, "types": {}, "present": 0, "example": None}
+
+        kind = json_type(value)
+        field["types"][kind] = field["types"].get(kind, 0) + 1
+        if path not in seen:
+            seen.add(path)
+            field["present"] += 1
+        if field["example"] is None and kind not in ("object", "array", "null"):
+            field["example"] = value[:100] if isinstance(value, str) else value
+
+        if depth >= self.max_depth:
+            return
+        if isinstance(value, dict):
+            for key, child in value.items():
+                child_path = str(key) if path == "$" else f"{path}.{key}"
+                self._walk(child, child_path, path, depth + 1, seen)
+        elif isinstance(value, list):
+            for child in value[:self.max_array_items]:
+                self._walk(child, f"{path}[]", path, depth + 1, seen)
+
+    def to_dict(self) -> Dict[str, Any]:
+        schema = {}
+        for path, field in self.fields.items():
+            parent_present = self.fields[field["parent"]]["present"] if field["parent"] else self.records
+            schema[path] = {
+                "types": field["types"],
+                "type": max(field["types"], key=field["types"].get),
+                "present": field["present"],
+                "frequency": field["present"] / self.records if self.records else 0.0,
+                "optional": field["present"] < parent_present,
+                "example": field["example"]
+            }
+        return schema
+
+class JSONProfiler:
+    """Streaming structure inference for large JSON files.
+
+    Records are streamed with ijson.items() on the fastest backend, from a
+    top-level array or from the first array of objects under a top-level
+    object. Without such an array, a top-level object whose values are
+    objects (keyed by ID, say) has those values as records, and anything
+    else is one record; both are built from raw parse events so the byte
+    budget applies inside a record too. Streaming stops at a record/byte
+    budget; the total is then either extrapolated from the bytes read
+    ("estimate") or counted with an event-only pass that builds no objects
+    ("scan"). The preview is capped at preview_records and preview_chars.
+    Preview and sampled records are reserved against the memory budget;
+    preview records it refuses go to overflow as JSON lines instead, and
+    sampled ones are left out.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = None,
+        preview_records: int = None,
+        max_records: int = None,
+        max_bytes: int = None,
+        count_mode: str = None,
+        seed: int = None,
+        preview_chars: int = None,
+        budget: MemoryBudget = None,
+        overflow=None
+    ):
+        self.sample_size = sample_size or settings.JSON_SAMPLE_SIZE
+        self.preview_records = preview_records or settings.JSON_PREVIEW_RECORDS
+        self.max_records = max_records or settings.JSON_MAX_RECORDS
+        self.max_bytes = max_bytes or settings.JSON_MAX_BYTES
+        self.count_mode = count_mode or settings.JSON_COUNT_MODE
+        self.seed = settings.JSON_SAMPLE_SEED if seed is None else seed
+        self.preview_chars = preview_chars or settings.JSON_PREVIEW_MAX_CHARS
+        # Preview records the budget can't hold go to overflow (e.g. a SpillFile)
+        self.budget = budget or MemoryBudget(limit_bytes=0)
+        self.overflow = overflow
+
+    def profile(self, file_path: str, records_path: Optional[str] = None) -> Dict[str, Any]:
+        backend, ijson = load_ijson()
+        file_size = os.path.getsize(file_path)
+        reservoir = ReservoirSample(self.sample_size, self.seed, self.budget)
+        preview = []
+        preview_chars = 0
+        spilled = 0
+        truncated = False
+        keyed = False
+
+        with open(file_path, 'rb') as file:
+            if records_path is None:
+                records_path, keyed = self._find_records_path(ijson, file)
+                file.seek(0)
+
+            if records_path is None:
+                records = self._event_records(ijson, file, keyed)
+            else:
+                records = ijson.items(file, records_path, use_float=True)
+
+            try:
+                for record in records:
+                    if len(preview) + spilled < self.preview_records and preview_chars < self.preview_chars:
+                        text = str(record)
+                        if preview_chars + len(text) > self.preview_chars:
+                            # Oversized records are previewed as a cut-off string
+                            record_preview = text[:self.preview_chars - preview_chars]
+                        else:
+                            record_preview = record
+                        # Once the budget refuses one, later previews spill too so they stay in order
+                        if spilled or not self.budget.reserve(size_of(record_preview)):
+                            spilled += 1
+                            if self.overflow is not None:
+                                self.overflow.write(json.dumps(record_preview, default=str, ensure_ascii=False) + "\n")
+                        else:
+                            preview.append(record_preview)
+                        preview_chars += min(len(text), self.preview_chars - preview_chars)
+                    reservoir.add(record)
+                    if reservoir.seen >= self.max_records or file.tell() >= self.max_bytes:
+                        truncated = True
+                        break
+            except _ByteBudgetReached:
+                truncated = True
+            bytes_scanned = file.tell() if truncated else file_size
+
+            record_count, exact = reservoir.seen, True
+            if truncated and (records_path is not None or keyed):
+                # ijson reads ahead in buffers, so a file read to the end
+                # gives nothing to extrapolate from; counting it is cheap
+                if self.count_mode == "scan" or bytes_scanned >= file_size:
+                    file.seek(0)
+                    record_count = self._count_records(ijson, file, records_path)
+                elif bytes_scanned:
+                    record_count, exact = int(reservoir.seen * file_size / bytes_scanned), False
+
+        schema = SchemaInference()
+        for record in reservoir.items:
+            schema.add(record)
+
+        return {
+            "backend": backend,
+            "records_path": records_path,
+            "keyed_records": keyed,
+            "record_count": record_count,
+            "record_count_exact": exact,
+            "truncated": truncated,
+            "bytes_scanned": bytes_scanned,
+            "sample_size": len(reservoir.items),
+            "sample_refused": reservoir.refused,
+            "preview": preview,
+            "preview_spilled": spilled,
+            "schema": schema.to_dict()
+        }
+
+    def _event_records(self, ijson, file, keyed: bool, check_every: int = 1000) -> Iterator[Any]:
+        """Records built from parse events: the values of the top-level object
+        when keyed, otherwise the whole document.
+
+        Unlike ijson.items() this checks the byte budget while a record is
+        being built. At the budget a lone document is yielded as far as it
+        was built (a keyed record in progress is dropped), then
+        _ByteBudgetReached is raised.
+        """
+        from ijson.common import ObjectBuilder
+
+        record_depth = 1 if keyed else 0
+        depth = 0
+        builder = None
+        for count, (_, event, value) in enumerate(ijson.parse(file, use_float=True), 1):
+            if builder is None and depth == record_depth and event not in ("map_key", "end_map", "end_array"):
+                builder = ObjectBuilder()
+            if builder is not None:
+                builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+
+            if builder is not None and depth == record_depth:
+                yield builder.value
+                builder = None
+            elif count % check_every == 0 and file.tell() >= self.max_bytes:
+                if builder is not None and not keyed:
+                    yield builder.value
+                raise _ByteBudgetReached()
+
+    @staticmethod
+    def _find_records_path(ijson, file, max_events: int = 10000) -> Tuple[Optional[str], bool]:
+        """(ijson prefix of the records, keyed). The prefix is "item" for a
+        top-level array, otherwise the first array of objects directly under
+        the top-level object. Without one, keyed is True when the top-level
+        object's values seen are all objects, at least two of them."""
+        depth = 0
+        object_values = 0
+        other_values = False
+        for index, (prefix, event, _) in enumerate(ijson.parse(file)):
+            if index == 0 and event == "start_array":
+                return "item", False
+            if event == "start_map" and prefix.endswith(".item") and prefix.count(".") == 1:
+                return prefix, False
+            if depth == 1 and event not in ("map_key", "end_map"):
+                if event == "start_map":
+                    object_values += 1
+                else:
+                    other_values = True
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if index >= max_events:
+                break
+        return None, object_values >= 2 and not other_values
+
+    @staticmethod
+    def _count_records(ijson, file, records_path: Optional[str]) -> int:
+        if records_path is not None:
+            return sum(
+                1 for prefix, event, _ in ijson.parse(file)
+                if prefix == records_path and event in _VALUE_EVENTS
+            )
+        # Keyed records: one key per record at the top level
+        depth = 0
+        count = 0
+        for _, event, _ in ijson.parse(file):
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            elif event == "map_key" and depth == 1:
+                count += 1
+        return count
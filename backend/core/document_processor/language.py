@@ -0,0 +1,89 @@
+# backend/core/document_processor/language.py
+import logging
+from typing import Any, Dict, List, Tuple
+
+from config.settings import settings
+from core.document_processor.model_registry import get_language_detector_factory
+
+logger = logging.getLogger(__name__)
+
+class LanguageDetector:
+    """Deterministic, sample-based language detection.
+
+    Instead of running langdetect over the whole text, a bounded number of
+    evenly spaced windows is scored and the per-window probabilities are
+    averaged (weighted by window length) into a language distribution. The
+    detector factory is seeded, so the same text always gives the same answer.
+    """
+
+    def __init__(self, samples: int = None, sample_chars: int = None, seed: int = None):
+        self.samples = samples or settings.LANGDETECT_SAMPLES
+        self.sample_chars = sample_chars or settings.LANGDETECT_SAMPLE_CHARS
+        self.seed = settings.LANGDETECT_SEED if seed is None else seed
+
+    def detect(self, text: str) -> Dict[str, Any]:
+        windows = self._windows(text)
+        distribution: Dict[str, float] = {}
+        total = 0
+        for window in windows:
+            probabilities = self._probabilities(window)
+            if not probabilities:
+                continue
+            total += len(window)
+            for language, probability in probabilities:
+                distribution[language] = distribution.get(language, 0.0) + probability * len(window)
+
+        if not total:
+            return {"language": "unknown", "distribution": {}, "samples": len(windows)}
+
+        distribution = {
+            language: round(weight / total, 4)
+            for language, weight in sorted(distribution.items(), key=lambda item: item[1], reverse=True)
+        }
+        return {
+            "language": next(iter(distribution)),
+            "distribution": distribution,
+            "samples": len(windows)
+        }
+
+    def detect_chunks(self, chunks: List[str]) -> List[str]:
+        """Top language of each chunk (first sample_chars characters of it)"""
+        languages = []
+        for chunk in chunks:
+            probabilities = self._probabilities(chunk[:self.sample_chars])
+            languages.append(probabilities[0][0] if probabilities else "unknown")
+        return languages
+
+    def _windows(self, text: str) -> List[str]:
+        """Evenly spaced windows, snapped forward to a word boundary"""
+        if len(text) <= self.sample_chars * self.samples:
+            if len(text) <= self.sample_chars:
+                return [text]
+            count = -(-len(text) // self.sample_chars)
+        else:
+            count = self.samples
+
+        span = len(text) - self.sample_chars
+        windows = []
+        for index in range(count):
+            start = span * index // max(count - 1, 1)
+            if start > 0:
+                space = text.find(" ", start, start + 50)
+                start = space + 1 if space != -1 else start
+            windows.append(text[start:start + self.sample_chars])
+        return windows
+
+    def _probabilities(self, text: str) -> List[Tuple[str, float]]:
+        if not text.strip():
+            return []
+        factory = get_language_detector_factory(self.seed)
+        if factory is None:
+            return []
+        try:
+            detector = factory.create()
+            detector.append(text)
+            return [(item.lang, item.prob) for item in detector.get_probabilities()]
+        except Exception as e:
+            # langdetect raises when a window has no usable features (digits, symbols)
+            logger.debug(f"Language detection skipped a sample: {e}")
+            return []
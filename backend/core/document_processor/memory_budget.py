@@ -0,0 +1,186 @@
+# backend/core/document_processor/memory_budget.py
+import contextvars
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["MemoryBudget"]] = contextvars.ContextVar("memory_budget", default=None)
+
+def size_of(value: Any) -> int:
+    """In-memory size of a string/bytes value (exact), or a shallow estimate for containers"""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value.values())
+    return sys.getsizeof(value)
+
+class SpillFile:
+    """Append-only text file for content past the budget; created on first write"""
+
+    def __init__(self, path: str, name: str, reason: str):
+        self.path = path
+        self.name = name
+        self.reason = reason
+        self.bytes = 0
+        self._file = None
+
+    def write(self, text: str) -> None:
+        if self._file is None:
+            logger.warning(f"Memory budget reached, spilling to {self.path}: {self.reason}")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(text)
+        self.bytes += len(text.encode("utf-8"))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def used(self) -> bool:
+        return self.bytes > 0
+
+class MemoryBudget:
+    """How much extracted content one job may hold in memory.
+
+    Extractors reserve() what they are about to keep; once a reservation is
+    refused they write the rest to a SpillFile instead, and the job's result
+    is marked "partial" with the spill files listed, rather than the process
+    running out of memory. Sizes are those of the Python objects kept, not
+    process RSS, so one job's budget isn't consumed by its neighbours.
+    A limit of 0 means unlimited.
+    """
+
+    def __init__(self, limit_bytes: int = None, spill_dir: str = None):
+        self.limit_bytes = settings.EXTRACTION_MEMORY_BUDGET if limit_bytes is None else limit_bytes
+        self.spill_dir = spill_dir or os.path.join(settings.SPILL_DIR, uuid.uuid4().hex)
+        self.used_bytes = 0
+        self._spills: List[SpillFile] = []
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if not self.limit_bytes:
+            return None
+        return max(self.limit_bytes - self.used_bytes, 0)
+
+    def reserve(self, nbytes: int) -> bool:
+        """Account for nbytes kept in memory; False (and nothing reserved) if over budget"""
+        with self._lock:
+            if self.limit_bytes and self.used_bytes + nbytes > self.limit_bytes:
+                return False
+            self.used_bytes += nbytes
+            return True
+
+    def release(self, nbytes: int) -> None:
+        """Give back nbytes reserved for something no longer kept"""
+        with self._lock:
+            self.used_bytes = max(self.used_bytes - nbytes, 0)
+
+    def spill(self, name: str, reason: str) -> SpillFile:
+        """Spill file for the named content; the result becomes partial once it is written to"""
+        spill = SpillFile(os.path.join(self.spill_dir, name), name, reason)
+        with self._lock:
+            self._spills.append(spill)
+        return spill
+
+    def close(self) -> None:
+        for spill in self._spills:
+            spill.close()
+
+    def report(self) -> Optional[Dict[str, Any]]:
+        """What was left out of memory, or None when everything fit"""
+        spills = [spill for spill in self._spills if spill.used]
+        if not spills:
+            return None
+        return {
+            "limit_bytes": self.limit_bytes,
+            "used_bytes": self.used_bytes,
+            "reasons": [spill.reason for spill in spills],
+            "spill_dir": self.spill_dir,
+            "spill_files": [
+                {"name": spill.name, "path": spill.path, "bytes": spill.bytes}
+                for spill in spills
+            ]
+        }
+
+@contextmanager
+def budgeting(limit_bytes: int = None) -> Iterator[MemoryBudget]:
+    """Make a new MemoryBudget current for the enclosed extraction"""
+    budget = MemoryBudget(limit_bytes)
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        budget.close()
+        _current.reset(token)
+
+def current_budget() -> MemoryBudget:
+    """Budget of the running extraction; unlimited outside budgeting()"""
+    return _current.get() or MemoryBudget(limit_bytes=0)
+
+def read_spill(partial: Optional[Dict[str, Any]], window_chars: int = 1024 * 1024) -> Iterator[str]:
+    """Text of a result's spill files in order, a window at a time.
+
+    Spilled tables (.jsonl, one table per line) come back as tab-separated
+    rows. Files already removed are skipped.
+    """
+    for spill in (partial or {}).get("spill_files", []):
+        try:
+            with open(spill["path"], "r", encoding="utf-8") as file:
+                if spill["path"].endswith(".jsonl"):
+                    for line in file:
+                        rows = json.loads(line)
+                        yield "".join("\t".join(map(str, row)) + "\n" for row in rows) + "\n"
+                else:
+                    while True:
+                        window = file.read(window_chars)
+                        if not window:
+                            break
+                        yield window
+        except FileNotFoundError:
+            logger.warning(f"Spill file {spill['path']} is gone")
+
+def remove_spill(partial: Optional[Dict[str, Any]]) -> None:
+    """Delete a result's spill files once they are stored (or no longer needed)"""
+    spill_dir = (partial or {}).get("spill_dir")
+    if not spill_dir:
+        return
+    try:
+        shutil.rmtree(spill_dir)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not remove spill dir {spill_dir}: {e}")
+
+def sweep_spill_dir(ttl_seconds: int = None) -> int:
+    """Remove spill dirs older than the TTL, left behind by crashed or abandoned jobs"""
+    ttl_seconds = settings.SPILL_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    cutoff = time.time() - ttl_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(settings.SPILL_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path)
+                removed += 1
+        except Exception as e:
+            logger.warning(f"Could not remove spill dir {entry.path}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} expired spill dirs")
+    return removed
@@ -0,0 +1,161 @@
+# backend/core/document_processor/model_registry.py
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Process-wide registry of heavy models (EasyOCR readers, spaCy pipelines).
+
+    Models are loaded lazily on first use and kept once per process, so every
+    DocumentProcessor instance shares the same copy.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._load_times: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register a loader for a model without loading it"""
+        with self._lock:
+            if name not in self._loaders:
+                self._loaders[name] = loader
+                self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the model, loading it on first use. Returns None if loading failed."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                return None
+
+            start = time.perf_counter()
+            try:
+                logger.info(f"Loading model: {name}")
+                model = self._loaders[name]()
+            except Exception as e:
+                logger.warning(f"Model {name} failed to load: {e}")
+                self._errors[name] = str(e)
+                return None
+
+            self._load_times[name] = time.perf_counter() - start
+            self._models[name] = model
+            logger.info(f"Model {name} loaded in {self._load_times[name]:.2f}s")
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Eagerly load the given models (all registered models by default)"""
+        for name in list(names or self._loaders.keys()):
+            self.get(name)
+        return self.status()
+
+    def unload(self, name: str) -> None:
+        """Drop a loaded model (or a recorded load failure) so the next use reloads it"""
+        with self._locks.get(name, self._lock):
+            self._models.pop(name, None)
+            self._errors.pop(name, None)
+            self._load_times.pop(name, None)
+
+    def status(self) -> Dict[str, Any]:
+        """Report warm/cold state of every registered model"""
+        return {
+            name: {
+                "state": "warm" if name in self._models
+                else "failed" if name in self._errors
+                else "cold",
+                "load_time": self._load_times.get(name),
+                "error": self._errors.get(name)
+            }
+            for name in self._loaders
+        }
+
+model_registry = ModelRegistry()
+
+def _easyocr_loader(languages: Tuple[str, ...]) -> Callable[[], Any]:
+    def load():
+        import easyocr
+        return easyocr.Reader(list(languages))
+    return load
+
+def _spacy_loader(model_name: str) -> Callable[[], Any]:
+    def load():
+        import spacy
+        return spacy.load(model_name)
+    return load
+
+# Components of the stock English pipelines; anything not requested is excluded
+_SPACY_COMPONENTS = (
+    "tok2vec", "tagger", "morphologizer", "parser", "senter",
+    "attribute_ruler", "lemmatizer", "ner"
+)
+
+def _spacy_pipeline_loader(model_name: str, components: Tuple[str, ...]) -> Callable[[], Any]:
+    def load():
+        import spacy
+        nlp = spacy.load(
+            model_name,
+            exclude=[name for name in _SPACY_COMPONENTS if name not in components]
+        )
+        if "sentencizer" in components and "sentencizer" not in nlp.pipe_names:
+            nlp.add_pipe("sentencizer", first=True)
+        return nlp
+    return load
+
+def _langdetect_loader(seed: int) -> Callable[[], Any]:
+    def load():
+        from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+        factory = DetectorFactory()
+        factory.load_profile(PROFILES_DIRECTORY)
+        factory.set_seed(seed)
+        return factory
+    return load
+
+def get_ocr_reader(languages: Tuple[str, ...] = ("en",)) -> Optional[Any]:
+    """Shared EasyOCR reader for the given languages"""
+    name = f"easyocr:{'+'.join(languages)}"
+    model_registry.register(name, _easyocr_loader(languages))
+    return model_registry.get(name)
+
+def get_spacy_model(model_name: str = "en_core_web_sm") -> Optional[Any]:
+    """Shared spaCy pipeline"""
+    name = f"spacy:{model_name}"
+    model_registry.register(name, _spacy_loader(model_name))
+    return model_registry.get(name)
+
+def get_spacy_pipeline(model_name: str, components: Tuple[str, ...]) -> Optional[Any]:
+    """Shared spaCy pipeline containing only the given components"""
+    name = f"spacy:{model_name}[{'+'.join(components)}]"
+    model_registry.register(name, _spacy_pipeline_loader(model_name, components))
+    return model_registry.get(name)
+
+def get_language_detector_factory(seed: int = 0) -> Optional[Any]:
+    """Shared langdetect factory (language profiles loaded once) with a fixed seed"""
+    name = f"langdetect:seed={seed}"
+    model_registry.register(name, _langdetect_loader(seed))
+    return model_registry.get(name)
+
+# Register the default models so they show up (cold) in status() before first use
+model_registry.register("easyocr:en", _easyocr_loader(("en",)))
+model_registry.register(
+    "spacy:en_core_web_sm[sentencizer+tok2vec+ner]",
+    _spacy_pipeline_loader("en_core_web_sm", ("sentencizer", "tok2vec", "ner"))
+)
+model_registry.register("langdetect:seed=0", _langdetect_loader(0))
@@ -0,0 +1,102 @@
+# backend/core/document_processor/nlp.py
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from config.settings import settings
+from core.document_processor.model_registry import get_spacy_pipeline
+
+logger = logging.getLogger(__name__)
+
+# spaCy components each analysis needs. Everything else is excluded at load time.
+ANALYSIS_COMPONENTS = {
+    "sentences": ["sentencizer"],
+    "entities": ["tok2vec", "ner"]
+}
+
+# Which analyses each extraction_type asks for; "text" skips NLP entirely
+EXTRACTION_ANALYSES = {
+    "text": [],
+    "entities": ["entities"]
+}
+DEFAULT_ANALYSES = ["sentences", "entities"]
+
+def analyses_for(extraction_type: str) -> List[str]:
+    return EXTRACTION_ANALYSES.get(extraction_type, DEFAULT_ANALYSES)
+
+def iter_text_chunks(text: str, chunk_size: int) -> Iterator[Tuple[str, int]]:
+    """Yield (chunk, offset) pieces of at most chunk_size characters, split at
+    paragraph breaks or whitespace where possible"""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Prefer the last paragraph break, then the last whitespace, in the window
+            split = text.rfind("\n\n", start, end)
+            if split <= start:
+                match = None
+                for match in re.finditer(r"\s", text[max(end - 1000, start):end]):
+                    pass
+                split = max(end - 1000, start) + match.start() if match else end
+            end = max(split, start + 1)
+        yield text[start:end], start
+        start = end
+
+class TextAnalyzer:
+    """Sentence counts, word counts and entities over arbitrarily long text.
+
+    Text is cut into chunks below spaCy's max_length and streamed through
+    nlp.pipe in batches, using a pipeline pruned to the requested analyses.
+    Entity offsets are relative to the whole document.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        chunk_size: int = None,
+        batch_size: int = None
+    ):
+        self.model_name = model_name
+        self.chunk_size = chunk_size or settings.NLP_CHUNK_SIZE
+        self.batch_size = batch_size or settings.NLP_BATCH_SIZE
+
+    def analyze(self, text: str, analyses: Sequence[str] = DEFAULT_ANALYSES) -> Dict[str, Any]:
+        if not analyses or not text.strip():
+            return {}
+
+        components = []
+        for analysis in analyses:
+            for component in ANALYSIS_COMPONENTS[analysis]:
+                if component not in components:
+                    components.append(component)
+
+        nlp = get_spacy_pipeline(self.model_name, tuple(components))
+        if nlp is None:
+            return {}
+
+        sentences = 0
+        words = 0
+        entities: List[Dict[str, Any]] = []
+        chunks = iter_text_chunks(text, min(self.chunk_size, nlp.max_length))
+        for doc, offset in nlp.pipe(chunks, as_tuples=True, batch_size=self.batch_size):
+            words += sum(1 for token in doc if not token.is_punct and not token.is_space)
+            if "sentences" in analyses:
+                sentences += sum(1 for _ in doc.sents)
+            if "entities" in analyses:
+                entities.extend(
+                    {
+                        "text": ent.text,
+                        "label": ent.label_,
+                        "start": ent.start_char + offset,
+                        "end": ent.end_char + offset
+                    }
+                    for ent in doc.ents
+                )
+
+        result: Dict[str, Any] = {"words": words}
+        if "sentences" in analyses:
+            result["sentences"] = sentences
+        if "entities" in analyses:
+            result["entities"] = entities
+        return result
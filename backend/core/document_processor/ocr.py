@@ -0,0 +1,542 @@
+# backend/core/document_processor/ocr.py
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from config.settings import settings
+from core.document_processor.executor import get_extraction_executor, in_worker_process
+from core.document_processor.model_registry import get_ocr_reader
+
+logger = logging.getLogger(__name__)
+
+def tesseract_blocks(image: Image.Image, min_confidence: float = 50) -> List[Dict[str, Any]]:
+    """Word-level Tesseract results above min_confidence"""
+    try:
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        logger.warning(f"Tesseract OCR failed: {e}")
+        return []
+
+    text_blocks = []
+    for i in range(len(data['text'])):
+        if float(data['conf'][i]) > min_confidence:  # Filter low-confidence results
+            text_blocks.append({
+                'text': data['text'][i],
+                'confidence': float(data['conf'][i]),
+                'bbox': {
+                    'x': data['left'][i],
+                    'y': data['top'][i],
+                    'width': data['width'][i],
+                    'height': data['height'][i]
+                },
+                'source': 'tesseract'
+            })
+    return text_blocks
+
+def _easyocr_to_blocks(easyocr_result, offset: Tuple[float, float] = (0, 0)) -> List[Dict[str, Any]]:
+    dx, dy = offset
+    return [
+        {
+            'text': text,
+            'confidence': float(conf) * 100,
+            'bbox': {
+                'points': [[float(point[0]) + dx, float(point[1]) + dy] for point in bbox],
+            },
+            'source': 'easyocr'
+        }
+        for bbox, text, conf in easyocr_result
+    ]
+
+def _pad(image: Image.Image, width: int, height: int) -> np.ndarray:
+    """Pad to a common size with white so a batch can be stacked without moving boxes"""
+    canvas = Image.new('RGB', (width, height), 'white')
+    canvas.paste(image, (0, 0))
+    return np.array(canvas)
+
+def easyocr_readtext_batch(images: List[Image.Image], reader=None) -> List[List[Dict[str, Any]]]:
+    """Full EasyOCR (detection + recognition) over many images.
+
+    Images are bucketed by size, padded to the bucket size and sent through
+    readtext_batched in fixed-size batches; results come back in input order.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in images]
+    reader = reader or get_ocr_reader()
+    if reader is None or not images:
+        return results
+
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for index, image in enumerate(images):
+        width, height = image.size
+        # Round up to 256px so similar sizes share a bucket with little padding
+        key = (-(-width // 256) * 256, -(-height // 256) * 256)
+        buckets.setdefault(key, []).append(index)
+
+    batch_size = settings.OCR_BATCH_SIZE
+    for (width, height), indices in buckets.items():
+        for start in range(0, len(indices), batch_size):
+            chunk = indices[start:start + batch_size]
+            try:
+                batch_result = reader.readtext_batched(
+                    [_pad(images[index], width, height) for index in chunk],
+                    batch_size=batch_size
+                )
+            except Exception as e:
+                logger.warning(f"EasyOCR failed: {e}")
+                continue
+            for index, image_result in zip(chunk, batch_result):
+                results[index] = _easyocr_to_blocks(image_result)
+    return results
+
+def easyocr_recognize_regions(
+    requests: List[Tuple[Image.Image, List[Dict[str, Any]]]],
+    reader=None,
+    padding: int = 4,
+    gap: int = 8
+) -> List[List[Dict[str, Any]]]:
+    """Recognize text inside known regions of many images, skipping EasyOCR's detector.
+
+    Region crops from all images are stacked onto one tall canvas so a single
+    recognize() call handles them in batches of OCR_BATCH_SIZE; boxes are
+    mapped back to each source image.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in requests]
+    reader = reader or get_ocr_reader()
+    if reader is None:
+        return results
+
+    crops = []  # (request index, crop origin x, crop origin y, canvas y, crop array)
+    for request_index, (image, regions) in enumerate(requests):
+        grey = np.array(image.convert('L'))
+        height, width = grey.shape
+        for region in regions:
+            x0, y0, x1, y1 = _box(region)
+            x0, y0 = max(int(x0) - padding, 0), max(int(y0) - padding, 0)
+            x1, y1 = min(int(x1) + padding, width), min(int(y1) + padding, height)
+            if x1 > x0 and y1 > y0:
+                crops.append([request_index, x0, y0, 0, grey[y0:y1, x0:x1]])
+    if not crops:
+        return results
+
+    canvas_width = max(crop[4].shape[1] for crop in crops)
+    canvas_height = sum(crop[4].shape[0] + gap for crop in crops)
+    canvas = np.full((canvas_height, canvas_width), 255, dtype=np.uint8)
+    horizontal_list = []
+    y = 0
+    for crop in crops:
+        crop_height, crop_width = crop[4].shape
+        canvas[y:y + crop_height, :crop_width] = crop[4]
+        crop[3] = y
+        horizontal_list.append([0, crop_width, y, y + crop_height])
+        y += crop_height + gap
+
+    try:
+        easyocr_result = reader.recognize(
+            canvas,
+            horizontal_list=horizontal_list,
+            free_list=[],
+            batch_size=settings.OCR_BATCH_SIZE
+        )
+    except Exception as e:
+        logger.warning(f"EasyOCR region recognition failed: {e}")
+        return results
+
+    canvas_offsets = [crop[3] for crop in crops]
+    for bbox, text, conf in easyocr_result:
+        # Find the crop this box came from by its vertical centre
+        centre = sum(float(point[1]) for point in bbox) / len(bbox)
+        crop_index = max(bisect.bisect_right(canvas_offsets, centre) - 1, 0)
+        request_index, origin_x, origin_y, canvas_y, _ = crops[crop_index]
+        results[request_index].extend(
+            _easyocr_to_blocks([(bbox, text, conf)], (origin_x, origin_y - canvas_y))
+        )
+    return results
+
+def ocr_image(image: Image.Image, reader=None, mode: str = None) -> List[Dict[str, Any]]:
+    """Run the OCR engines over one image and return text blocks (see ocr_images)"""
+    return ocr_images([image], reader, mode)[0]
+
+def ocr_images(
+    images: List[Image.Image],
+    reader=None,
+    mode: str = None
+) -> List[List[Dict[str, Any]]]:
+    """OCR a batch of images, returning text blocks per image in input order.
+
+    Modes: "cascade" (Tesseract first, EasyOCR only where Tesseract is unsure),
+    "both" (run both engines on the whole image), "tesseract", "easyocr".
+    EasyOCR work for the whole batch is run through its batched APIs.
+    """
+    mode = mode or settings.OCR_MODE
+    images = [image if image.mode == 'RGB' else image.convert('RGB') for image in images]
+
+    if mode == "tesseract":
+        return [tesseract_blocks(image, settings.OCR_MIN_CONFIDENCE) for image in images]
+    if mode == "easyocr":
+        return easyocr_readtext_batch(images, reader)
+    if mode == "both":
+        easy_results = easyocr_readtext_batch(images, reader)
+        return [
+            tesseract_blocks(image, settings.OCR_MIN_CONFIDENCE) + easy_blocks
+            for image, easy_blocks in zip(images, easy_results)
+        ]
+
+    # Cascade: Tesseract on everything, then decide where EasyOCR is needed
+    threshold = settings.OCR_CONFIDENCE_THRESHOLD
+    all_lines = [_tesseract_lines(image) for image in images]
+    whole_images = []
+    region_requests = []
+    for index, lines in enumerate(all_lines):
+        if _mean_confidence(lines) < threshold:
+            # Tesseract mostly failed on this image, let EasyOCR read all of it
+            whole_images.append(index)
+        else:
+            unsure = [line for line in lines if line['confidence'] < threshold]
+            if unsure:
+                region_requests.append((index, unsure))
+
+    easy_results: List[List[Dict[str, Any]]] = [[] for _ in images]
+    whole_results = easyocr_readtext_batch([images[index] for index in whole_images], reader)
+    for index, blocks in zip(whole_images, whole_results):
+        easy_results[index] = blocks
+    region_results = easyocr_recognize_regions(
+        [(images[index], regions) for index, regions in region_requests], reader
+    )
+    for (index, _), blocks in zip(region_requests, region_results):
+        easy_results[index] = blocks
+
+    return [
+        _merge_cascade(lines, easy_blocks)
+        for lines, easy_blocks in zip(all_lines, easy_results)
+    ]
+
+def ocr_prepared(
+    prepared: List[Dict[str, Any]],
+    reader=None,
+    mode: str = None
+) -> List[List[Dict[str, Any]]]:
+    """OCR images produced by ImagePreprocessor.prepare.
+
+    All tiles of all images go through ocr_images as one batch. Boxes are mapped
+    back to the prepared image at original resolution, and a box is kept only by
+    the tile whose core region contains its centre so tile overlaps don't
+    duplicate text.
+    """
+    tiles = [(index, tile) for index, item in enumerate(prepared) for tile in item["tiles"]]
+    tile_results = ocr_images([tile["image"] for _, tile in tiles], reader, mode)
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in prepared]
+    for (index, tile), text_blocks in zip(tiles, tile_results):
+        core_x0, core_y0, core_x1, core_y1 = tile["core"]
+        for block in text_blocks:
+            x0, y0, x1, y1 = _box(block)
+            centre_x, centre_y = (x0 + x1) / 2 + tile["x"], (y0 + y1) / 2 + tile["y"]
+            if not (core_x0 <= centre_x < core_x1 and core_y0 <= centre_y < core_y1):
+                continue
+            results[index].append(_shift_block(block, tile["x"], tile["y"], prepared[index]["scale"]))
+    return results
+
+def _shift_block(block: Dict[str, Any], dx: float, dy: float, scale: float) -> Dict[str, Any]:
+    bbox = block['bbox']
+    if 'points' in bbox:
+        bbox = {'points': [
+            [(float(point[0]) + dx) / scale, (float(point[1]) + dy) / scale]
+            for point in bbox['points']
+        ]}
+    else:
+        bbox = {
+            'x': int(round((bbox['x'] + dx) / scale)),
+            'y': int(round((bbox['y'] + dy) / scale)),
+            'width': int(round(bbox['width'] / scale)),
+            'height': int(round(bbox['height'] / scale))
+        }
+    return {**block, 'bbox': bbox}
+
+def _mean_confidence(lines: List[Dict[str, Any]]) -> float:
+    confidences = [word['confidence'] for line in lines for word in line['words']]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+def _box(block: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    """(x0, y0, x1, y1) for either engine's bbox format"""
+    bbox = block['bbox']
+    if 'points' in bbox:
+        xs = [float(point[0]) for point in bbox['points']]
+        ys = [float(point[1]) for point in bbox['points']]
+        return min(xs), min(ys), max(xs), max(ys)
+    return bbox['x'], bbox['y'], bbox['x'] + bbox['width'], bbox['y'] + bbox['height']
+
+def bbox_iou(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    ax0, ay0, ax1, ay1 = _box(a)
+    bx0, by0, bx1, by1 = _box(b)
+    width = min(ax1, bx1) - max(ax0, bx0)
+    height = min(ay1, by1) - max(ay0, by0)
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = (ax1 - ax0) * (ay1 - ay0) + (bx1 - bx0) * (by1 - by0) - intersection
+    return intersection / union if union > 0 else 0.0
+
+def _tesseract_lines(image: Image.Image) -> List[Dict[str, Any]]:
+    """Tesseract words grouped into lines, with a line bbox and mean confidence"""
+    try:
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        logger.warning(f"Tesseract OCR failed: {e}")
+        return []
+
+    lines: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+    for i in range(len(data['text'])):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not data['text'][i].strip():
+            continue
+        word = {
+            'text': data['text'][i],
+            'confidence': confidence,
+            'bbox': {
+                'x': data['left'][i],
+                'y': data['top'][i],
+                'width': data['width'][i],
+                'height': data['height'][i]
+            },
+            'source': 'tesseract'
+        }
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, {'words': []})['words'].append(word)
+
+    for line in lines.values():
+        boxes = [_box(word) for word in line['words']]
+        x0, y0 = min(box[0] for box in boxes), min(box[1] for box in boxes)
+        x1, y1 = max(box[2] for box in boxes), max(box[3] for box in boxes)
+        line['bbox'] = {'x': x0, 'y': y0, 'width': x1 - x0, 'height': y1 - y0}
+        line['confidence'] = sum(word['confidence'] for word in line['words']) / len(line['words'])
+    return list(lines.values())
+
+def _merge_cascade(
+    lines: List[Dict[str, Any]],
+    easy_blocks: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Merge EasyOCR blocks into Tesseract lines.
+
+    EasyOCR boxes that overlap a Tesseract line (IoU >= OCR_MERGE_IOU) replace
+    that line when they are more confident, so each region's text appears once.
+    """
+    # Assign each EasyOCR block to the Tesseract line it overlaps most
+    replacements: Dict[int, List[Dict[str, Any]]] = {}
+    unmatched = []
+    for block in easy_blocks:
+        best_index, best_iou = None, 0.0
+        for index, line in enumerate(lines):
+            iou = bbox_iou(block, line)
+            if iou > best_iou:
+                best_index, best_iou = index, iou
+        if best_index is not None and best_iou >= settings.OCR_MERGE_IOU:
+            replacements.setdefault(best_index, []).append(block)
+        else:
+            unmatched.append(block)
+
+    # Emit in Tesseract's reading order, taking the more confident engine per line
+    text_blocks = []
+    for index, line in enumerate(lines):
+        candidates = replacements.get(index)
+        if candidates:
+            easy_confidence = sum(block['confidence'] for block in candidates) / len(candidates)
+            if easy_confidence >= line['confidence']:
+                text_blocks.extend(sorted(candidates, key=lambda block: _box(block)[0]))
+                continue
+        text_blocks.extend(
+            word for word in line['words'] if word['confidence'] > settings.OCR_MIN_CONFIDENCE
+        )
+
+    text_blocks.extend(sorted(unmatched, key=lambda block: (_box(block)[1], _box(block)[0])))
+    return text_blocks
+
+class OCRBatchQueue:
+    """Collects prepared images (see ImagePreprocessor) from concurrent callers on
+    one event loop and OCRs them together, so EasyOCR sees full batches instead
+    of one image per call.
+
+    Images from concurrent uploads are gathered in the serving process; with
+    an executor each batch then runs as one job in the extraction pool,
+    otherwise in a thread. Pool workers run one extraction at a time, so
+    nothing else would join a batch there; in a worker max_wait defaults to
+    0 and images go straight to OCR.
+    """
+
+    def __init__(self, batch_size: int = None, max_wait: float = None, executor=None):
+        self.batch_size = batch_size or settings.OCR_BATCH_SIZE
+        if max_wait is None:
+            max_wait = 0.0 if in_worker_process() else settings.OCR_BATCH_MAX_WAIT
+        self.max_wait = max_wait
+        self.executor = executor
+        self._pending: List[Tuple[Dict[str, Any], Optional[str], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def ocr(self, prepared: Dict[str, Any], mode: str = None) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prepared, mode, future))
+
+        if len(self._pending) >= self.batch_size or not self.max_wait:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], Optional[str], asyncio.Future]]) -> None:
+        # Callers may ask for different modes; each mode is one ocr_prepared call
+        by_mode: Dict[Optional[str], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        for prepared, mode, future in batch:
+            by_mode.setdefault(mode, []).append((prepared, future))
+
+        try:
+            for mode, items in by_mode.items():
+                images = [prepared for prepared, _ in items]
+                try:
+                    if self.executor is not None:
+                        results = await self.executor.run(ocr_prepared, images, None, mode)
+                    else:
+                        results = await asyncio.to_thread(ocr_prepared, images, None, mode)
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), text_blocks in zip(items, results):
+                    if not future.done():
+                        future.set_result(text_blocks)
+        finally:
+            # Cancelled (e.g. at loop shutdown): no caller is left waiting forever
+            for _, _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+_batch_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[bool, OCRBatchQueue]]" = weakref.WeakKeyDictionary()
+
+def get_ocr_batch_queue(use_process_pool: bool = False) -> OCRBatchQueue:
+    """OCR batch queue for the running event loop.
+
+    With use_process_pool (ignored inside pool workers) batches run on the
+    extraction pool.
+    """
+    pooled = use_process_pool and not in_worker_process()
+    queues = _batch_queues.setdefault(asyncio.get_running_loop(), {})
+    queue = queues.get(pooled)
+    if queue is None:
+        queue = queues[pooled] = OCRBatchQueue(
+            executor=get_extraction_executor() if pooled else None
+        )
+    return queue
+
+def blocks_to_text(text_blocks: List[Dict[str, Any]]) -> str:
+    return " ".join(
+        block['text'].strip() for block in text_blocks
+        if block['text'] and block['text'].strip()
+    )
+
+class OCRPageCache:
+    """On-disk cache of OCR output keyed by a page content hash.
+
+    Shared by all pool workers through the filesystem, so reprocessing a PDF
+    never re-OCRs pages that already produced text. Use get_ocr_page_cache()
+    so a process keeps one entry count: it is taken from disk on the first
+    write, advanced on each new entry, and re-taken whenever the oldest
+    entries are pruned. Writes by other workers between prunes can take the
+    cache past max_entries until one of them prunes.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None):
+        self.cache_dir = cache_dir or settings.OCR_CACHE_DIR
+        self.max_entries = max_entries or settings.OCR_CACHE_MAX_ENTRIES
+        self._entries: Optional[int] = None
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable OCR cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        existed = os.path.exists(path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(value, file, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write OCR cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        if existed:
+            return
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._prune()
+            else:
+                self._entries += 1
+                if self._entries > self.max_entries:
+                    self._entries = self._prune()
+
+    def _prune(self) -> int:
+        """Drop the oldest entries once the cache holds more than max_entries.
+
+        Prunes down to 90% of max_entries, so the directory isn't rescanned on
+        every write at the limit; returns the number of entries left.
+        """
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return len(entries)
+        keep = int(self.max_entries * 0.9)
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - keep]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        return keep
+
+_page_cache: Optional[OCRPageCache] = None
+
+def get_ocr_page_cache() -> OCRPageCache:
+    """Process-wide OCR page cache, created on first use"""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = OCRPageCache()
+    return _page_cache
+
+def page_hash(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+    return digest.hexdigest()
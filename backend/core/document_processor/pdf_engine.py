@@ -0,0 +1,182 @@
+# backend/core/document_processor/pdf_engine.py
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from config.settings import settings
+from core.document_processor.executor import ExtractionExecutor
+from core.document_processor.ocr import blocks_to_text, get_ocr_page_cache, ocr_prepared, page_hash
+from core.document_processor.preprocess import ImagePreprocessor
+
+logger = logging.getLogger(__name__)
+
+def _extract_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    ocr_dpi: int = 0
+) -> List[Dict[str, Any]]:
+    """Extract pages [start, end) of a PDF. Runs in pool workers, so it must stay
+    a module-level function that returns plain data.
+
+    Pages without a usable text layer are OCR'd when ocr_dpi is set.
+    """
+    pages = []
+    scanned = []
+    with fitz.open(file_path) as doc:
+        for number in range(start, min(end, doc.page_count)):
+            page = doc.load_page(number)
+            text = page.get_text()
+            pages.append({
+                "page_number": number + 1,
+                "text": text,
+                "ocr": False
+            })
+            if ocr_dpi and _needs_ocr(page, text):
+                scanned.append(len(pages) - 1)
+
+        if scanned:
+            _ocr_pages(doc, pages, scanned, ocr_dpi)
+    return pages
+
+def _needs_ocr(page: "fitz.Page", text: str) -> bool:
+    """A page is treated as scanned when it has images but (almost) no text layer"""
+    return len(text.strip()) < settings.PDF_OCR_MIN_CHARS and bool(page.get_images())
+
+def _page_key(doc: "fitz.Document", page: "fitz.Page", dpi: int) -> str:
+    """Hash of what the page draws (content stream plus embedded images), the render
+    DPI and the OCR mode"""
+    parts = [page.read_contents(), f"dpi={dpi};mode={settings.OCR_MODE}".encode()]
+    for image in page.get_images(full=True):
+        parts.append(doc.xref_stream_raw(image[0]) or b"")
+    return page_hash(*parts)
+
+def _render_page(page: "fitz.Page", dpi: int) -> Image.Image:
+    pixmap = page.get_pixmap(dpi=dpi)
+    return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+def _ocr_pages(
+    doc: "fitz.Document",
+    pages: List[Dict[str, Any]],
+    scanned: List[int],
+    dpi: int
+) -> None:
+    """Render scanned pages and OCR them in batches, reusing cached results"""
+    cache = get_ocr_page_cache()
+    preprocessor = ImagePreprocessor()
+    batch_size = settings.PDF_OCR_BATCH_SIZE
+
+    for batch_start in range(0, len(scanned), batch_size):
+        batch = scanned[batch_start:batch_start + batch_size]
+        misses = []
+        for index in batch:
+            page = doc.load_page(pages[index]["page_number"] - 1)
+            key = _page_key(doc, page, dpi)
+            cached = cache.get(key)
+            if cached is not None:
+                pages[index].update(text=cached["text"], ocr=True, ocr_cached=True)
+            else:
+                misses.append((index, key, page))
+
+        if not misses:
+            continue
+
+        prepared = [preprocessor.prepare(_render_page(page, dpi), dpi) for _, _, page in misses]
+        for (index, key, _), text_blocks in zip(misses, ocr_prepared(prepared)):
+            text = blocks_to_text(text_blocks)
+            text = f"{text}\n" if text else pages[index]["text"]
+            pages[index].update(text=text, ocr=True, ocr_cached=False)
+            if text_blocks:
+                cache.set(key, {"text": text, "blocks": text_blocks})
+
+class PDFEngine:
+    """fitz-based PDF text extraction.
+
+    With an executor, large PDFs are split into page ranges that run in parallel
+    on the extraction pool (small ones go to the pool as a single range). Without
+    one, ranges are read in a thread. Scanned pages fall back to OCR.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[ExtractionExecutor] = None,
+        pages_per_range: int = None,
+        parallel_min_pages: int = None,
+        ocr_dpi: int = None
+    ):
+        self.executor = executor
+        self.pages_per_range = pages_per_range or settings.PDF_PAGES_PER_RANGE
+        self.parallel_min_pages = parallel_min_pages or settings.PDF_PARALLEL_MIN_PAGES
+        if ocr_dpi is None:
+            ocr_dpi = settings.PDF_OCR_DPI if settings.PDF_OCR_ENABLED else 0
+        self.ocr_dpi = ocr_dpi
+
+    def page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        if self.executor and page_count < self.parallel_min_pages:
+            # Not worth splitting, but still keep the work off the event loop process
+            return [(0, page_count)] if page_count else []
+        return [
+            (start, min(start + self.pages_per_range, page_count))
+            for start in range(0, page_count, self.pages_per_range)
+        ]
+
+    def get_info(self, file_path: str) -> Dict[str, Any]:
+        """Page count and document metadata without reading page content"""
+        with fitz.open(file_path) as doc:
+            return {"page_count": doc.page_count, "metadata": doc.metadata}
+
+    async def iter_pages(self, file_path: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield pages in order as soon as they are extracted.
+
+        Each item carries the page number, its text and the character offsets the
+        page occupies in the concatenated document text, so callers can start
+        chunking before the last page is parsed.
+        """
+        file_path = os.path.abspath(file_path)
+        info = await asyncio.to_thread(self.get_info, file_path)
+        page_count = info["page_count"]
+        offset = 0
+
+        if self.executor:
+            ranges = self.page_ranges(page_count)
+            window = max(self.executor.max_workers, 1)
+            pending: List[asyncio.Task] = []
+            next_range = 0
+            try:
+                while next_range < len(ranges) or pending:
+                    # Keep up to one range per worker in flight, yield in page order
+                    while next_range < len(ranges) and len(pending) < window:
+                        start, end = ranges[next_range]
+                        pending.append(asyncio.create_task(
+                            self.executor.run(
+                                _extract_page_range, file_path, start, end, self.ocr_dpi
+                            )
+                        ))
+                        next_range += 1
+
+                    for page in await pending.pop(0):
+                        page["char_start"] = offset
+                        offset += len(page["text"])
+                        page["char_end"] = offset
+                        yield page
+            finally:
+                for task in pending:
+                    task.cancel()
+        else:
+            for start, end in self.page_ranges(page_count):
+                pages = await asyncio.to_thread(
+                    _extract_page_range, file_path, start, end, self.ocr_dpi
+                )
+                for page in pages:
+                    page["char_start"] = offset
+                    offset += len(page["text"])
+                    page["char_end"] = offset
+                    yield page
+
+    async def extract_pages(self, file_path: str) -> List[Dict[str, Any]]:
+        """Extract every page (see iter_pages)"""
+        return [page async for page in self.iter_pages(file_path)]
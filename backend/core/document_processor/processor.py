@@ -9,49 +9,71 @@ from typing import Dict, Any, List, Optional
 from pathlib import Path
 import pytesseract
 from PIL import Image
-import easyocr
 from typing import Optional, Dict, Any, List
 import os
 from pathlib import Path
 import fitz  # PyMuPDF
 import json
-import docx
-import xml.etree.ElementTree as ET
 import torch
 import io
+import asyncio
 import csv
 import yaml
-from langdetect import detect
-import spacy
 import logging
+from config.settings import settings
+from core.document_processor.model_registry import get_ocr_reader, get_spacy_model
+from core.document_processor.executor import ExtractionMemoryExceeded, get_extraction_executor, in_worker_process
+from core.document_processor.pdf_engine import PDFEngine
+from core.document_processor.ocr import get_ocr_batch_queue, blocks_to_text
+from core.document_processor.preprocess import ImagePreprocessor
+from core.document_processor.nlp import TextAnalyzer, analyses_for
+from core.document_processor.profiling import TableProfiler
+from core.document_processor.table_cache import TableWriter, get_table_cache
+from core.document_processor.hashing import file_sha256
+from core.document_processor.json_profile import JSONProfiler
+from core.document_processor.xml_profile import XMLProfiler
+from core.document_processor.yaml_profile import YAMLProfiler
+from core.document_processor.docx_reader import DocxReader
+from core.document_processor.language import LanguageDetector
+from core.document_processor.result import ExtractionResult, build_result
+from core.document_processor.extraction_cache import get_extraction_cache
+from core.document_processor.instrumentation import get_stage_metrics, recording, stage
+from core.document_processor.memory_budget import budgeting, current_budget, size_of
 
 logger = logging.getLogger(__name__)
 
+# Types extracted in the serving process even with the pool on; their heavy
+# steps are sent to the pool piecemeal
+IN_PROCESS_TYPES = {"pdf", "jpg", "jpeg", "png"}
+
+def _tables_present(result: ExtractionResult) -> bool:
+    """Whether every Parquet copy a cached result points at still exists"""
+    return all(os.path.exists(table.source["path"]) for table in result.tables if table.source)
+
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, use_process_pool: Optional[bool] = None):
         self.processors = {}
-        self.reader = easyocr.Reader(['en'])
-        self.nlp = spacy.load("en_core_web_sm")
-        try:
-            self.reader = easyocr.Reader(['en'])  # Initialize EasyOCR
-        except Exception as e:
-            logger.warning(f"EasyOCR initialization failed: {e}")
-            self.reader = None
-        
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except Exception as e:
-            logger.warning(f"Spacy model loading failed: {e}")
-            self.nlp = None
-
+        self.use_process_pool = (
+            settings.EXTRACTION_USE_PROCESS_POOL if use_process_pool is None else use_process_pool
+        )
         self.processors = {
             "basic": {
                 "initialized": True,
                 "status": "ready"
             }
         }
+
+    @property
+    def reader(self):
+        """Shared EasyOCR reader, loaded on first use"""
+        return get_ocr_reader()
+
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline, loaded on first use"""
+        return get_spacy_model()
         
-    async def _process_image(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
+    async def _process_image(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process image files with OCR"""
         result = {
             "content": "",
@@ -62,7 +84,9 @@ class DocumentProcessor:
 
         try:
             # Load image
-            image = Image.open(file_path)
+            with stage("load", bytes_read=os.path.getsize(file_path)):
+                image = Image.open(file_path)
+                image.load()
             
             # Get image metadata
             result["metadata"] = {
@@ -74,79 +98,28 @@ class DocumentProcessor:
                 "file_size": os.path.getsize(file_path)
             }
 
-            # Convert image to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-
-            # Perform OCR with Tesseract
-            try:
-                tesseract_text = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-                
-                # Filter and process Tesseract results
-                text_blocks = []
-                for i in range(len(tesseract_text['text'])):
-                    if int(tesseract_text['conf'][i]) > 50:  # Filter low-confidence results
-                        text_blocks.append({
-                            'text': tesseract_text['text'][i],
-                            'confidence': float(tesseract_text['conf'][i]),
-                            'bbox': {
-                                'x': tesseract_text['left'][i],
-                                'y': tesseract_text['top'][i],
-                                'width': tesseract_text['width'][i],
-                                'height': tesseract_text['height'][i]
-                            },
-                            'source': 'tesseract'
-                        })
-            except Exception as e:
-                logger.warning(f"Tesseract OCR failed: {e}")
-                text_blocks = []
-
-            # Perform OCR with EasyOCR as backup/complement
-            try:
-                easyocr_result = self.reader.readtext(np.array(image))
-                
-                for bbox, text, conf in easyocr_result:
-                    text_blocks.append({
-                        'text': text,
-                        'confidence': float(conf) * 100,
-                        'bbox': {
-                            'points': bbox,
-                        },
-                        'source': 'easyocr'
-                    })
-            except Exception as e:
-                logger.warning(f"EasyOCR failed: {e}")
-
-            # Combine all extracted text
-            all_text = []
-            for block in text_blocks:
-                if block['text'] and block['text'].strip():
-                    all_text.append(block['text'].strip())
+            # Downscale/clean up before OCR; step timings go into the metadata
+            dpi = image.info.get('dpi')
+            with stage("preprocess"):
+                prepared = await asyncio.to_thread(
+                    ImagePreprocessor().prepare, image, dpi[0] if dpi else None
+                )
+            result["metadata"]["preprocessing"] = prepared["info"]
+
+            # Perform OCR (Tesseract, with EasyOCR on low-confidence regions by default)
+            # Batched with other images OCR'd concurrently on this event loop;
+            # each batch is one pool job when the pool is in use
+            with stage("ocr", pages=1):
+                text_blocks = await get_ocr_batch_queue(self.use_process_pool).ocr(
+                    prepared, (options or {}).get("ocr_mode")
+                )
 
             # Store results
             result["text_blocks"] = text_blocks
-            result["content"] = " ".join(all_text)
+            result["content"] = blocks_to_text(text_blocks)
 
             # Basic text analysis if content exists
-            if result["content"]:
-                try:
-                    doc = self.nlp(result["content"])
-                    result["analysis"] = {
-                        "sentences": len(list(doc.sents)),
-                        "words": len([token for token in doc if not token.is_punct]),
-                        "entities": [
-                            {
-                                "text": ent.text,
-                                "label": ent.label_,
-                                "start": ent.start_char,
-                                "end": ent.end_char
-                            }
-                            for ent in doc.ents
-                        ]
-                    }
-                except Exception as e:
-                    logger.warning(f"Text analysis failed: {e}")
-                    result["analysis"] = {}
+            result["analysis"] = await self._analyze_text(result["content"], extraction_type)
 
             return result
 
@@ -154,7 +127,7 @@ class DocumentProcessor:
             logger.error(f"Error processing image: {e}")
             raise
         
-    async def _process_text(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
+    async def _process_text(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process plain text files"""
         result = {
             "content": "",
@@ -164,7 +137,9 @@ class DocumentProcessor:
 
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+                with stage("read", bytes_read=os.path.getsize(file_path)) as read:
+                    content = self._read_within_budget(file)
+                    read.add(rows=content.count("\n"))
                 result["content"] = content
                 
                 result["metadata"] = {
@@ -173,32 +148,18 @@ class DocumentProcessor:
                     "encoding": file.encoding
                 }
 
-                # Language detection
+                # Language detection on evenly spaced samples, not the full text
                 try:
-                    result["metadata"]["language"] = detect(content)
+                    with stage("language"):
+                        detection = await asyncio.to_thread(LanguageDetector().detect, content)
+                    result["metadata"]["language"] = detection["language"]
+                    result["metadata"]["language_distribution"] = detection["distribution"]
                 except Exception as e:
                     logger.warning(f"Language detection failed: {e}")
                     result["metadata"]["language"] = "unknown"
 
-                # Text analysis
-                if self.nlp and content.strip():
-                    try:
-                        doc = self.nlp(content)
-                        result["analysis"] = {
-                            "sentences": len(list(doc.sents)),
-                            "words": len([token for token in doc if not token.is_punct]),
-                            "entities": [
-                                {
-                                    "text": ent.text,
-                                    "label": ent.label_,
-                                    "start": ent.start_char,
-                                    "end": ent.end_char
-                                }
-                                for ent in doc.ents
-                            ]
-                        }
-                    except Exception as e:
-                        logger.warning(f"Text analysis failed: {e}")
+            # Text analysis
+            result["analysis"] = await self._analyze_text(content, extraction_type)
 
             return result
 
@@ -206,6 +167,21 @@ class DocumentProcessor:
             logger.error(f"Error processing text file: {e}")
             raise
 
+    async def _analyze_text(self, text: str, extraction_type: str) -> Dict[str, Any]:
+        """Sentence/word/entity analysis; skipped for text-only extraction"""
+        analyses = analyses_for(extraction_type)
+        if not analyses or not text or not text.strip():
+            return {}
+        try:
+            with stage("nlp"):
+                if self.use_process_pool and not in_worker_process():
+                    # Images are extracted in the serving process; keep spaCy off it
+                    return await get_extraction_executor().run(TextAnalyzer().analyze, text, analyses)
+                return await asyncio.to_thread(TextAnalyzer().analyze, text, analyses)
+        except Exception as e:
+            logger.warning(f"Text analysis failed: {e}")
+            return {}
+
     async def process_document(
         self,
         file_path: str,
@@ -217,6 +193,115 @@ class DocumentProcessor:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        # Fail fast on unsupported types before queueing anything
+        self._get_processor(file_type)
+
+        # PDFs are split into page ranges that go to the pool individually, and
+        # images are OCR'd in pool batches gathered across uploads (see OCRBatchQueue)
+        if self.use_process_pool and not in_worker_process() and file_type.lower() not in IN_PROCESS_TYPES:
+            result = await get_extraction_executor().submit(
+                os.path.abspath(file_path), file_type, extraction_type, options
+            )
+        else:
+            result = await self.extract(file_path, file_type, extraction_type, options)
+
+        # Histograms live in the serving process, whichever process extracted
+        if not in_worker_process():
+            get_stage_metrics().observe(file_type, result.get("metadata", {}).get("timings"))
+        return result
+
+    async def process_result(
+        self,
+        file_path: str,
+        file_type: str,
+        extraction_type: str = "text",
+        options: Dict[str, Any] = None
+    ) -> ExtractionResult:
+        """process_document, normalized into a typed ExtractionResult.
+
+        Results are cached by content hash, so repeat uploads of the same bytes
+        with the same options skip extraction (and OCR) entirely.
+        """
+        options = dict(options or {})
+        cache = get_extraction_cache() if settings.EXTRACTION_CACHE_ENABLED else None
+        if cache is not None:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            # Also reused by the Parquet table cache, so the file is hashed once
+            options["content_hash"] = options.get("content_hash") or await asyncio.to_thread(file_sha256, file_path)
+            key = cache.key(options["content_hash"], file_type, extraction_type, options)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None and _tables_present(cached):
+                logger.info(f"Extraction cache hit for {os.path.basename(file_path)}")
+                return cached
+            if cached is not None:
+                logger.info(f"Cached tables of {os.path.basename(file_path)} are gone, extracting again")
+
+        raw = await self.process_document(file_path, file_type, extraction_type, options)
+        result = build_result(file_type, raw)
+        # Partial results depend on the memory budget; a retry with more memory should re-extract
+        if cache is not None and not result.metadata.get("partial"):
+            await asyncio.to_thread(cache.put, key, result)
+        return result
+
+    async def extract(
+        self,
+        file_path: str,
+        file_type: str,
+        extraction_type: str = "text",
+        options: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Run extraction inline in the current process.
+
+        Per-stage wall/CPU time, bytes, pages/rows and peak RSS are added
+        to the result as metadata["timings"]. Content past the job's memory
+        budget (options["memory_budget"], else EXTRACTION_MEMORY_BUDGET) is
+        spilled to disk and the result gets metadata["status"] = "partial".
+        """
+        processor = self._get_processor(file_type)
+        try:
+            with recording() as recorder, budgeting((options or {}).get("memory_budget")) as budget:
+                result = await processor(file_path, extraction_type, options)
+        except MemoryError:
+            # Fail this job with a clear error; the worker keeps serving others
+            raise ExtractionMemoryExceeded(
+                f"Ran out of memory extracting {os.path.basename(file_path)}; "
+                "lower EXTRACTION_MEMORY_BUDGET so more is spilled to disk"
+            ) from None
+        if isinstance(result.get("metadata"), dict):
+            result["metadata"]["timings"] = recorder.to_dict()
+            partial = budget.report()
+            if partial:
+                result["metadata"]["status"] = "partial"
+                result["metadata"]["partial"] = partial
+        return result
+
+    @staticmethod
+    def _read_within_budget(file, chunk_chars: int = 1024 * 1024) -> str:
+        """Read a text file, spilling whatever the memory budget can't hold"""
+        budget = current_budget()
+        parts = []
+        spill = None
+        while True:
+            chunk = file.read(chunk_chars)
+            if not chunk:
+                break
+            if spill is None and budget.reserve(size_of(chunk)):
+                parts.append(chunk)
+            else:
+                if spill is None:
+                    spill = budget.spill("text.txt", f"Text past character {sum(map(len, parts))} spilled")
+                spill.write(chunk)
+        return "".join(parts)
+
+    def supports(self, file_type: str) -> bool:
+        try:
+            self._get_processor(file_type)
+            return True
+        except ValueError:
+            return False
+
+    def _get_processor(self, file_type: str):
         processors = {
             "pdf": self._process_pdf,
             "jpg": self._process_image,
@@ -237,11 +322,10 @@ class DocumentProcessor:
         processor = processors.get(file_type.lower())
         if not processor:
             raise ValueError(f"Unsupported file type: {file_type}")
-            
-        return await processor(file_path, extraction_type)
+        return processor
     
-    async def _process_docx(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
-        """Process Word documents"""
+    async def _process_docx(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process Word documents straight from the package XML (run formatting only for "all")"""
         result = {
             "content": [],
             "metadata": {},
@@ -251,64 +335,33 @@ class DocumentProcessor:
         }
 
         try:
-            doc = docx.Document(file_path)
-            
+            reader = DocxReader(
+                include_runs=extraction_type == "all",
+                include_tables=extraction_type in ["all", "tables"],
+                budget=current_budget()
+            )
+            with stage("parse", bytes_read=os.path.getsize(file_path)) as parse:
+                doc = await asyncio.to_thread(reader.read, file_path)
+                parse.add(rows=len(doc["paragraphs"]))
+
             # Extract document properties
             result["metadata"] = {
-                "core_properties": {
-                    prop: getattr(doc.core_properties, prop)
-                    for prop in dir(doc.core_properties)
-                    if not prop.startswith('_')
-                },
+                "core_properties": doc["core_properties"],
                 "file_size": os.path.getsize(file_path),
                 "filename": os.path.basename(file_path)
             }
 
-            # Process paragraphs
-            for para in doc.paragraphs:
-                result["content"].append({
-                    "text": para.text,
-                    "style": para.style.name,
-                    "runs": [{
-                        "text": run.text,
-                        "bold": run.bold,
-                        "italic": run.italic,
-                        "underline": run.underline,
-                        "font": run.font.name if run.font.name else None
-                    } for run in para.runs]
-                })
-
-            # Process tables
-            if extraction_type in ["all", "tables"]:
-                for table in doc.tables:
-                    table_data = []
-                    for row in table.rows:
-                        row_data = []
-                        for cell in row.cells:
-                            row_data.append(cell.text)
-                        table_data.append(row_data)
-                    result["tables"].append(table_data)
+            result["content"] = doc["paragraphs"]
+            result["text"] = doc["text"]
+            result["tables"] = doc["tables"]
+            # Section offsets index into result["text"], so chunking can split at headings
+            result["structure"] = {
+                "headings": doc["headings"],
+                "sections": doc["sections"]
+            }
 
             # Add text analysis if content exists
-            full_text = " ".join([p["text"] for p in result["content"]])
-            if full_text and self.nlp:
-                try:
-                    doc = self.nlp(full_text)
-                    result["analysis"] = {
-                        "sentences": len(list(doc.sents)),
-                        "words": len([token for token in doc if not token.is_punct]),
-                        "entities": [
-                            {
-                                "text": ent.text,
-                                "label": ent.label_,
-                                "start": ent.start_char,
-                                "end": ent.end_char
-                            }
-                            for ent in doc.ents
-                        ]
-                    }
-                except Exception as e:
-                    logger.warning(f"Text analysis failed: {e}")
+            result["analysis"] = await self._analyze_text(doc["text"], extraction_type)
 
             return result
 
@@ -316,8 +369,8 @@ class DocumentProcessor:
             logger.error(f"Error processing DOCX: {e}")
             raise
 
-    async def _process_csv(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
-        """Process CSV files with enhanced analytics"""
+    async def _process_csv(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process CSV files in a single pass with bounded per-column statistics"""
         result = {
             "content": "",
             "metadata": {},
@@ -327,104 +380,70 @@ class DocumentProcessor:
         }
 
         try:
-            # Read first few rows to get column info and data types
-            df_preview = pd.read_csv(file_path, nrows=5)
-            total_rows = sum(1 for _ in open(file_path)) - 1  # Count total rows minus header
+            profiler = TableProfiler()
+            table_cache = get_table_cache()
+            content_hash = self._content_hash(file_path, options) if table_cache.available() else None
+            cached_table = table_cache.existing_entry(content_hash, "data") if content_hash else None
+            table_writer = table_cache.open_writer(content_hash, "data") if content_hash and not cached_table else None
+
+            # Process in chunks for large files; the first chunk doubles as the dtype sample
+            with stage("parse", bytes_read=os.path.getsize(file_path)):
+                chunks = pd.read_csv(
+                    file_path,
+                    chunksize=settings.CSV_CHUNK_SIZE,
+                    engine="c",
+                    memory_map=True
+                )
+            while True:
+                with stage("parse") as parse:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                parse.add(rows=len(chunk))
+                self._feed_chunk(profiler, table_writer, chunk)
+                logger.debug(f"Processing CSV: {profiler.total_rows} rows")
+            logger.info(f"Processed CSV {os.path.basename(file_path)}: {profiler.total_rows} rows")
+
+            with stage("table_cache"):
+                table_entry = cached_table or (table_writer.close() if table_writer else None)
+
+            total_rows = profiler.total_rows
+            with stage("stats"):
+                statistics = profiler.statistics()
+            columns = list(profiler.columns.keys())
+            preview_data = profiler.preview
 
             # Get column info
             columns_info = {
                 col: {
-                    "dtype": str(df_preview[col].dtype),
-                    "sample_values": df_preview[col].tolist()
-                } for col in df_preview.columns
+                    "dtype": profiler.column_types[col],
+                    "sample_values": [row.get(col) for row in preview_data[:5]]
+                } for col in columns
             }
 
-            # Process in chunks for large files
-            chunk_size = 10000
-            chunks = pd.read_csv(file_path, chunksize=chunk_size)
-            
-            # Initialize statistics
-            numeric_stats = {col: {
-                "min": float('inf'),
-                "max": float('-inf'),
-                "sum": 0,
-                "count": 0,
-                "null_count": 0
-            } for col in df_preview.columns if pd.api.types.is_numeric_dtype(df_preview[col])}
-
-            categorical_stats = {col: {
-                "unique_values": set(),
-                "null_count": 0
-            } for col in df_preview.columns if not pd.api.types.is_numeric_dtype(df_preview[col])}
-
-            # Process each chunk
-            preview_data = []
-            processed_rows = 0
-            for chunk in chunks:
-                processed_rows += len(chunk)
-                logger.info(f"Processing CSV: {processed_rows}/{total_rows} rows")
-
-                # Store first 10 rows for preview
-                if len(preview_data) < 10:
-                    preview_data.extend(chunk.head(10 - len(preview_data)).to_dict('records'))
-
-                # Update numeric statistics
-                for col in numeric_stats.keys():
-                    stats = numeric_stats[col]
-                    col_data = chunk[col]
-                    stats["min"] = min(stats["min"], col_data.min())
-                    stats["max"] = max(stats["max"], col_data.max())
-                    stats["sum"] += col_data.sum()
-                    stats["count"] += col_data.count()
-                    stats["null_count"] += col_data.isnull().sum()
-
-                # Update categorical statistics
-                for col in categorical_stats.keys():
-                    stats = categorical_stats[col]
-                    col_data = chunk[col]
-                    stats["unique_values"].update(col_data.dropna().unique())
-                    stats["null_count"] += col_data.isnull().sum()
-
-            # Finalize numeric statistics
-            for col, stats in numeric_stats.items():
-                if stats["count"] > 0:
-                    stats["mean"] = stats["sum"] / stats["count"]
-                    stats["null_percentage"] = (stats["null_count"] / total_rows) * 100
-                    del stats["sum"]  # Remove sum from final output
-                    stats["unique_values"] = len(set(df_preview[col].dropna()))
-
-            # Finalize categorical statistics
-            for col, stats in categorical_stats.items():
-                stats["unique_count"] = len(stats["unique_values"])
-                stats["null_percentage"] = (stats["null_count"] / total_rows) * 100
-                stats["unique_values"] = list(stats["unique_values"])[:10]  # Limit to 10 examples
-
             result.update({
                 "content": str(preview_data),  # For vector store
                 "metadata": {
                     "filename": os.path.basename(file_path),
                     "file_size": os.path.getsize(file_path),
                     "total_rows": total_rows,
-                    "total_columns": len(df_preview.columns),
-                    "columns": list(df_preview.columns),
-                    "columns_info": columns_info
+                    "total_columns": len(columns),
+                    "columns": columns,
+                    "columns_info": columns_info,
+                    "content_hash": content_hash
                 },
+                "tables": [table_entry] if table_entry else [],
                 "preview": {
                     "first_rows": preview_data,
-                    "column_types": {col: str(dtype) for col, dtype in df_preview.dtypes.items()}
-                },
-                "statistics": {
-                    "numeric_columns": numeric_stats,
-                    "categorical_columns": categorical_stats
+                    "column_types": profiler.column_types
                 },
+                "statistics": statistics,
                 "analysis": {
                     "completeness": {
                         col: {
-                            "filled": total_rows - (numeric_stats.get(col, {}).get("null_count", 0) or 
-                                                  categorical_stats.get(col, {}).get("null_count", 0)),
-                            "null_percentage": (numeric_stats.get(col, {}).get("null_percentage", 0) or 
-                                              categorical_stats.get(col, {}).get("null_percentage", 0))
-                        } for col in df_preview.columns
+                            "filled": total_rows - profile.null_count,
+                            "null_percentage": profile.null_percentage()
+                        } for col, profile in profiler.columns.items()
                     }
                 }
             })
@@ -433,36 +452,62 @@ class DocumentProcessor:
 
         except Exception as e:
             logger.error(f"Error processing CSV: {e}")
+            if 'table_writer' in locals() and table_writer:
+                table_writer.abort()
             raise
     
-    async def _process_pdf(self, file_path: str, extraction_type: str) -> Dict[str, Any]:  # Make sure this is at same indentation level as __init__
+    async def _process_pdf(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process PDF files page by page"""
         result = {
             "content": "",
-            "metadata": {}
+            "metadata": {},
+            "pages": []
         }
 
         try:
-            doc = fitz.open(file_path)
-            result["metadata"] = doc.metadata
-
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            
-            result["content"] = text.strip()
+            engine = self._get_pdf_engine(options)
+            with stage("open", bytes_read=os.path.getsize(file_path)):
+                info = await asyncio.to_thread(engine.get_info, file_path)
+            result["metadata"] = info["metadata"]
+            result["metadata"]["page_count"] = info["page_count"]
+
+            # Text extraction and OCR of page ranges (in the pool for large PDFs)
+            texts = []
+            budget = current_budget()
+            spill = None
+            with stage("pages") as pages:
+                async for page in engine.iter_pages(file_path):
+                    text = page.pop("text")
+                    # Past the budget, page text goes to disk; offsets still count it
+                    if spill is None and budget.reserve(size_of(text)):
+                        texts.append(text)
+                    else:
+                        if spill is None:
+                            spill = budget.spill("pdf_text.txt", f"PDF text from page {page['page_number']} spilled")
+                        spill.write(text)
+                        page["spilled"] = True
+                    result["pages"].append(page)
+                    pages.add(pages=1)
+            result["metadata"]["ocr_pages"] = sum(1 for page in result["pages"] if page["ocr"])
+
+            # Page offsets index into the unstripped concatenation, so only trim the end
+            result["content"] = "".join(texts).rstrip()
             return result
 
         except Exception as e:
             logger.error(f"Error processing PDF: {e}")
             raise
-        finally:
-            if 'doc' in locals():
-                doc.close()
-
 
+    def _get_pdf_engine(self, options: Dict[str, Any] = None) -> PDFEngine:
+        # Fan page ranges out to the pool unless we already are a pool worker
+        executor = None
+        if self.use_process_pool and not in_worker_process():
+            executor = get_extraction_executor()
+        return PDFEngine(executor=executor, ocr_dpi=(options or {}).get("ocr_dpi"))
 
-    async def _process_json(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
-            """Process large JSON files"""
+    async def _process_json(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+            """Process large JSON files with sampled, budgeted structure inference"""
+            options = options or {}
             result = {
                 "content": "",
                 "metadata": {},
@@ -470,40 +515,39 @@ class DocumentProcessor:
             }
 
             try:
-                # Process JSON file in chunks using ijson for large files
-                import ijson
-
-                structure_sample = {}
-                record_count = 0
-                data_sample = []
-                
-                with open(file_path, 'rb') as file:
-                    parser = ijson.parse(file)
-                    
-                    for prefix, event, value in parser:
-                        if record_count < 1000:  # Analyze structure of first 1000 records
-                            if prefix not in structure_sample:
-                                structure_sample[prefix] = {
-                                    "type": type(value).__name__,
-                                    "sample": value if not isinstance(value, (dict, list)) else "complex"
-                                }
-                            
-                            if prefix == "item" or prefix == "":  # Assuming array of objects or single object
-                                if isinstance(value, dict) and record_count < 10:
-                                    data_sample.append(value)
-                                record_count += 1
+                # Preview records the budget can't hold are spilled (the file is created on first write)
+                budget = current_budget()
+                profiler = JSONProfiler(
+                    count_mode=options.get("json_count_mode"),
+                    budget=budget,
+                    overflow=budget.spill("json_preview.txt", "JSON preview records past the memory budget spilled")
+                )
+                with stage("parse") as parse:
+                    profile = await asyncio.to_thread(
+                        profiler.profile, file_path, options.get("json_records_path")
+                    )
+                    parse.add(bytes_read=profile["bytes_scanned"], rows=profile["record_count"])
 
                 # Generate analysis
-                result["content"] = str(data_sample)  # First 10 records as string for vector store
+                result["content"] = str(profile["preview"])  # First records as string for vector store
                 result["metadata"] = {
                     "filename": os.path.basename(file_path),
                     "file_size": os.path.getsize(file_path),
-                    "record_count": record_count,
-                    "structure": structure_sample
+                    "record_count": profile["record_count"],
+                    "record_count_exact": profile["record_count_exact"],
+                    "records_path": profile["records_path"],
+                    "keyed_records": profile["keyed_records"],
+                    "truncated": profile["truncated"],
+                    "bytes_scanned": profile["bytes_scanned"],
+                    "parser_backend": profile["backend"],
+                    "preview_spilled": profile["preview_spilled"],
+                    "sample_refused": profile["sample_refused"],
+                    "structure": profile["schema"]
                 }
                 result["analysis"] = {
-                    "preview_data": data_sample,
-                    "schema": structure_sample
+                    "preview_data": profile["preview"],
+                    "schema": profile["schema"],
+                    "sample_size": profile["sample_size"]
                 }
 
                 return result
@@ -512,7 +556,7 @@ class DocumentProcessor:
                 logger.error(f"Error processing JSON: {e}")
                 raise
 
-    async def _process_xlsx(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
+    async def _process_xlsx(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process Excel files with enhanced analytics"""
         try:
             result = {
@@ -523,70 +567,70 @@ class DocumentProcessor:
             }
 
             # Load workbook
-            workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
+            with stage("load", bytes_read=os.path.getsize(file_path)):
+                workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True)
             
             all_sheets_data = {}
             total_cells = 0
             sheet_summaries = {}
+            tables = []
+
+            table_cache = get_table_cache()
+            content_hash = self._content_hash(file_path, options) if table_cache.available() else None
 
-            for sheet_name in workbook.sheetnames:
+            for sheet_index, sheet_name in enumerate(workbook.sheetnames):
+                table_writer = None
                 try:
-                    # Convert sheet to pandas DataFrame
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    if len(df) == 0:
+                    cached_table = table_cache.existing_entry(content_hash, sheet_name, sheet_index) if content_hash else None
+                    if content_hash and not cached_table:
+                        table_writer = table_cache.open_writer(content_hash, sheet_name, sheet_index)
+
+                    # Stream the read-only worksheet once into the incremental profiler
+                    with stage("sheets") as sheets:
+                        profiler = self._profile_worksheet(workbook[sheet_name], table_writer)
+                        sheets.add(rows=profiler.total_rows)
+                    if profiler.total_rows == 0:
+                        if table_writer:
+                            table_writer.abort()
                         continue  # Skip empty sheets
 
+                    with stage("table_cache"):
+                        table_entry = cached_table or (table_writer.close() if table_writer else None)
+                    if table_entry:
+                        tables.append(table_entry)
+
+                    headers = list(profiler.columns.keys())
+                    with stage("stats"):
+                        statistics = profiler.statistics()
+                    numeric_cols = list(statistics["numeric_columns"].keys())
+                    categorical_cols = list(statistics["categorical_columns"].keys())
+
                     # Process sheet data
                     sheet_data = {
-                        "headers": list(df.columns),
-                        "preview_data": df.head(10).to_dict('records'),
+                        "headers": headers,
+                        "preview_data": profiler.preview,
                         "statistics": {
-                            "numeric_columns": {},
-                            "categorical_columns": {},
-                            "row_count": len(df),
-                            "column_count": len(df.columns)
+                            **statistics,
+                            "row_count": profiler.total_rows,
+                            "column_count": len(headers)
                         }
                     }
 
-                    # Calculate statistics for numeric columns
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    for col in numeric_cols:
-                        non_null_data = df[col].dropna()
-                        stats = {
-                            "min": float(non_null_data.min()) if not non_null_data.empty else None,
-                            "max": float(non_null_data.max()) if not non_null_data.empty else None,
-                            "mean": float(non_null_data.mean()) if not non_null_data.empty else None,
-                            "null_count": int(df[col].isnull().sum()),
-                            "null_percentage": float(df[col].isnull().sum() / len(df) * 100)
-                        }
-                        sheet_data["statistics"]["numeric_columns"][str(col)] = stats
-
-                    # Calculate statistics for categorical columns
-                    categorical_cols = df.select_dtypes(exclude=[np.number]).columns
-                    for col in categorical_cols:
-                        non_null_values = df[col].dropna()
-                        value_counts = non_null_values.value_counts()
-                        stats = {
-                            "unique_count": len(value_counts),
-                            "unique_values": value_counts.head(10).index.tolist(),  # First 10 unique values
-                            "null_count": int(df[col].isnull().sum()),
-                            "null_percentage": float(df[col].isnull().sum() / len(df) * 100)
-                        }
-                        sheet_data["statistics"]["categorical_columns"][str(col)] = stats
-
                     all_sheets_data[sheet_name] = sheet_data
-                    total_cells += len(df) * len(df.columns)
+                    total_cells += profiler.total_rows * len(headers)
 
                     # Create sheet summary
                     sheet_summaries[sheet_name] = {
-                        "row_count": len(df),
-                        "column_count": len(df.columns),
-                        "numeric_columns": [str(col) for col in numeric_cols],
-                        "categorical_columns": [str(col) for col in categorical_cols]
+                        "row_count": profiler.total_rows,
+                        "column_count": len(headers),
+                        "numeric_columns": numeric_cols,
+                        "categorical_columns": categorical_cols
                     }
 
                 except Exception as e:
                     logger.error(f"Error processing sheet {sheet_name}: {str(e)}")
+                    if table_writer:
+                        table_writer.abort()
                     continue
 
             # Create metadata
@@ -597,9 +641,11 @@ class DocumentProcessor:
                     "total_sheets": len(workbook.sheetnames),
                     "sheet_names": workbook.sheetnames,
                     "total_cells": total_cells,
-                    "sheet_summaries": sheet_summaries
+                    "sheet_summaries": sheet_summaries,
+                    "content_hash": content_hash
                 },
                 "sheets": all_sheets_data,
+                "tables": tables,
                 "content": str({sheet: data["preview_data"] 
                               for sheet, data in all_sheets_data.items()}),
                 "analysis": {
@@ -628,50 +674,132 @@ class DocumentProcessor:
             if 'workbook' in locals():
                 workbook.close()
 
-    async def _process_xml(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
-        """Process XML files"""
+    def _profile_worksheet(self, worksheet, table_writer: Optional[TableWriter] = None) -> TableProfiler:
+        """Single pass over a read-only worksheet, fed to TableProfiler in chunks.
+
+        The first non-empty row is the header; fully empty rows are skipped.
+        Chunks are also written to table_writer when one is given.
+        """
+        profiler = TableProfiler()
+        headers = None
+        buffer = []
+
+        for row in worksheet.iter_rows(values_only=True):
+            if all(value is None for value in row):
+                continue
+            if headers is None:
+                headers = self._make_headers(row)
+                continue
+
+            # Rows can be ragged in read-only mode; fit them to the header width
+            row = tuple(row[:len(headers)]) + (None,) * (len(headers) - len(row))
+            buffer.append(row)
+            if len(buffer) >= settings.CSV_CHUNK_SIZE:
+                self._feed_chunk(profiler, table_writer, pd.DataFrame(buffer, columns=headers))
+                buffer = []
+
+        if buffer:
+            self._feed_chunk(profiler, table_writer, pd.DataFrame(buffer, columns=headers))
+        return profiler
+
+    @staticmethod
+    def _feed_chunk(profiler: TableProfiler, table_writer: Optional[TableWriter], chunk: pd.DataFrame) -> None:
+        with stage("stats", rows=len(chunk)):
+            profiler.update(chunk)
+        if table_writer:
+            with stage("table_cache", rows=len(chunk)):
+                table_writer.write(chunk, profiler.numeric_columns)
+
+    @staticmethod
+    def _content_hash(file_path: str, options: Dict[str, Any] = None) -> str:
+        """Content hash supplied by the caller (upload already hashed it) or computed here"""
+        if (options or {}).get("content_hash"):
+            return options["content_hash"]
+        with stage("hash", bytes_read=os.path.getsize(file_path)):
+            return file_sha256(file_path)
+
+    @staticmethod
+    def _make_headers(row) -> List[str]:
+        headers = []
+        seen = {}
+        for index, value in enumerate(row):
+            name = str(value) if value is not None else f"column_{index + 1}"
+            # Keep duplicate header names distinct, as pandas does
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            headers.append(name)
+        return headers
+
+    async def _process_xml(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process XML files in a single streaming pass"""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            def xml_to_dict(element):
-                result = {}
-                for child in element:
-                    if len(child) == 0:
-                        result[child.tag] = child.text
-                    else:
-                        result[child.tag] = xml_to_dict(child)
-                return result
+            # Text the budget can't hold is spilled (the file is created on first write)
+            budget = current_budget()
+            profiler = XMLProfiler(
+                budget=budget,
+                overflow=budget.spill("xml_text.txt", "XML text past the memory budget spilled")
+            )
+
+            with stage("parse", bytes_read=os.path.getsize(file_path)) as parse:
+                profile = await asyncio.to_thread(profiler.profile, file_path)
+                parse.add(rows=profile["element_count"])
 
-            data = xml_to_dict(root)
-            
             return {
-                "content": str(data),  # Convert to string for vector store
+                "content": profile["content"],  # Text for vector store
+                "chunks": profile["chunks"],
                 "metadata": {
-                    "root_tag": root.tag,
+                    "root_tag": profile["root_tag"],
                     "size": os.path.getsize(file_path),
-                    "filename": os.path.basename(file_path)
+                    "filename": os.path.basename(file_path),
+                    "namespaces": profile["namespaces"],
+                    "element_count": profile["element_count"],
+                    "max_depth": profile["max_depth"],
+                    "text_truncated": profile["text_truncated"]
                 },
-                "structured_data": data
+                "structured_data": {
+                    "schema": profile["schema"],
+                    "records": profile["records"]
+                }
             }
         except Exception as e:
             logger.error(f"Error processing XML: {e}")
             raise
 
-    async def _process_yaml(self, file_path: str, extraction_type: str) -> Dict[str, Any]:
-        """Process YAML files"""
+    async def _process_yaml(self, file_path: str, extraction_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Process YAML files, including multi-document streams"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = yaml.safe_load(file)
-                return {
-                    "content": str(data),  # Convert to string for vector store
-                    "metadata": {
-                        "type": "yaml",
-                        "size": os.path.getsize(file_path),
-                        "filename": os.path.basename(file_path)
-                    },
-                    "structured_data": data
-                }
+            # Documents the budget can't hold are spilled (the file is created on first write)
+            budget = current_budget()
+            profiler = YAMLProfiler(
+                budget=budget,
+                overflow=budget.spill("yaml_text.txt", "YAML documents past the memory budget spilled")
+            )
+
+            with stage("parse", bytes_read=os.path.getsize(file_path)) as parse:
+                profile = await asyncio.to_thread(profiler.profile, file_path)
+                parse.add(rows=len(profile["summaries"]))
+            documents = profile["documents"]
+
+            return {
+                "content": profile["content"],  # Source text for vector store
+                "chunks": profile["chunks"],
+                "metadata": {
+                    "type": "yaml",
+                    "size": os.path.getsize(file_path),
+                    "filename": os.path.basename(file_path),
+                    "loader": profile["loader"],
+                    "document_count": len(profile["summaries"]),
+                    "spilled_documents": profile["spilled_documents"],
+                    "documents": profile["summaries"],
+                    "kinds": profile["kinds"]
+                },
+                "schema": profile["schema"],
+                # A single document keeps its previous shape
+                "structured_data": documents[0] if len(documents) == 1 else documents
+            }
         except Exception as e:
             logger.error(f"Error processing YAML: {e}")
             raise
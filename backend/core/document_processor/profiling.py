@@ -0,0 +1,225 @@
+# backend/core/document_processor/profiling.py
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.document_processor.sketches import StreamingHistogram, TDigest
+
+logger = logging.getLogger(__name__)
+
+def _to_python(value: Any) -> Any:
+    """numpy/pandas scalars -> plain Python so results serialize to JSON/BSON"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+class HyperLogLog:
+    """Fixed-memory distinct-count estimator (2**precision one-byte registers)"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        self.update_hashes(hashes)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        with np.errstate(divide="ignore"):
+            bit_length = np.where(
+                remainder > 0,
+                np.floor(np.log2(remainder.astype(np.float64))) + 1,
+                0
+            )
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+class HeavyHitters:
+    """Bounded top-k frequency tracker.
+
+    Chunk value counts are merged into at most `capacity` counters; when the
+    table overflows, the smallest counters are dropped and the largest dropped
+    count is kept as the error bound on every reported count.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.error = 0
+
+    def update(self, values: pd.Series) -> None:
+        for value, count in values.value_counts().items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        if len(self.counts) > self.capacity:
+            ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+            self.error = max(self.error, ranked[self.capacity][1])
+            self.counts = dict(ranked[:self.capacity])
+
+    def top(self, k: int = 10) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{"value": _to_python(value), "count": count} for value, count in ranked]
+
+class ColumnProfile:
+    """Constant-memory statistics for one column, updated chunk by chunk"""
+
+    def __init__(self, name: str, numeric: bool, top_k_capacity: int = 100):
+        self.name = name
+        self.numeric = numeric
+        self.rows = 0
+        self.null_count = 0
+        self.invalid_count = 0
+        self.distinct = HyperLogLog()
+        self.heavy_hitters = HeavyHitters(top_k_capacity)
+        # Numeric moments (Chan et al. parallel mean/variance)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.digest = TDigest() if numeric else None
+        self.histogram = StreamingHistogram() if numeric else None
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        nulls = series.isna()
+        self.null_count += int(nulls.sum())
+        values = series[~nulls]
+
+        if self.numeric:
+            numbers = pd.to_numeric(values, errors="coerce")
+            invalid = numbers.isna()
+            self.invalid_count += int(invalid.sum())
+            numbers = numbers[~invalid].astype(np.float64)
+            array = numbers.to_numpy()
+            self._update_moments(array)
+            self.digest.update(array)
+            self.histogram.update(array)
+            self.distinct.update(numbers)
+        else:
+            values = values.astype(str)
+            self.distinct.update(values)
+            self.heavy_hitters.update(values)
+
+    def _update_moments(self, numbers: np.ndarray) -> None:
+        n = len(numbers)
+        if n == 0:
+            return
+        chunk_mean = float(numbers.mean())
+        chunk_m2 = float(((numbers - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        chunk_min, chunk_max = float(numbers.min()), float(numbers.max())
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+    def null_percentage(self) -> float:
+        return (self.null_count / self.rows) * 100 if self.rows else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.numeric:
+            variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+            return {
+                "min": self.min,
+                "max": self.max,
+                "count": self.count,
+                "null_count": self.null_count,
+                "invalid_count": self.invalid_count,
+                "mean": self.mean if self.count else None,
+                "variance": variance,
+                "std": math.sqrt(variance),
+                "null_percentage": self.null_percentage(),
+                "unique_values": self.distinct.estimate(),
+                "median": self.digest.quantile(0.5),
+                "quantiles": self.digest.percentiles(),
+                "histogram": self.histogram.to_dict(),
+                "digest": self.digest.to_dict()
+            }
+        top_values = self.heavy_hitters.top(10)
+        return {
+            "unique_values": [item["value"] for item in top_values],
+            "unique_count": self.distinct.estimate(),
+            "top_values": top_values,
+            "top_values_error": self.heavy_hitters.error,
+            "null_count": self.null_count,
+            "null_percentage": self.null_percentage()
+        }
+
+class TableProfiler:
+    """Single-pass profile of a table fed as DataFrame chunks.
+
+    Column kinds (numeric or categorical) are inferred from the first chunk, a
+    real sample of the data; later chunks are coerced to that kind, so a stray
+    string in a numeric column counts as invalid instead of flipping the type.
+    """
+
+    def __init__(self, preview_rows: int = 10, top_k_capacity: int = 100):
+        self.preview_rows = preview_rows
+        self.top_k_capacity = top_k_capacity
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.column_types: Dict[str, str] = {}
+        self.preview: List[Dict[str, Any]] = []
+        self.total_rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if not self.columns:
+            for col in chunk.columns:
+                numeric = pd.api.types.is_numeric_dtype(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col])
+                self.columns[str(col)] = ColumnProfile(str(col), numeric, self.top_k_capacity)
+                self.column_types[str(col)] = str(chunk[col].dtype)
+
+        self.total_rows += len(chunk)
+        if len(self.preview) < self.preview_rows:
+            head = chunk.head(self.preview_rows - len(self.preview))
+            self.preview.extend(
+                {str(key): _to_python(value) for key, value in row.items()}
+                for row in head.to_dict('records')
+            )
+
+        for col in chunk.columns:
+            profile = self.columns.get(str(col))
+            if profile is not None:
+                profile.update(chunk[col])
+
+    @property
+    def numeric_columns(self) -> Dict[str, bool]:
+        return {name: profile.numeric for name, profile in self.columns.items()}
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "numeric_columns": {
+                name: profile.to_dict() for name, profile in self.columns.items() if profile.numeric
+            },
+            "categorical_columns": {
+                name: profile.to_dict() for name, profile in self.columns.items() if not profile.numeric
+            }
+        }
@@ -0,0 +1,392 @@
+# backend/core/document_processor/result.py
+import json
+import logging
+import numbers
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# First byte of a serialized result names the codec
+_MSGPACK = b"M"
+_MSGPACK_ZLIB = b"m"
+_JSON_ZLIB = b"Z"
+_COMPRESS_ABOVE = 1024
+
+@dataclass(slots=True)
+class Block:
+    """A span of ExtractionResult.text (a page, paragraph, heading, section or chunk)"""
+    kind: str
+    char_start: int
+    char_end: int
+    page: Optional[int] = None
+    level: Optional[int] = None
+    label: Optional[str] = None
+
+@dataclass(slots=True)
+class Table:
+    """A table: its columns, the rows kept inline (all rows for DOCX, a preview
+    for CSV/XLSX), the full row count, column statistics and the columnar copy"""
+    name: str
+    columns: List[str] = field(default_factory=list)
+    rows: List[List[Any]] = field(default_factory=list)
+    row_count: int = 0
+    statistics: Dict[str, Any] = field(default_factory=dict)
+    source: Optional[Dict[str, Any]] = None
+
+@dataclass(slots=True)
+class ExtractionResult:
+    """One shape for every file type.
+
+    Text is stored once; pages, paragraphs, sections and chunks are Blocks
+    holding offsets into it. Tables, statistics, entities and format-specific
+    structure (JSON schema, XML records, YAML documents) are kept separately.
+    """
+    file_type: str
+    text: str = ""
+    blocks: List[Block] = field(default_factory=list)
+    tables: List[Table] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    entities: List[Dict[str, Any]] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    structured: Any = None
+
+    def block_text(self, block: Block) -> str:
+        return self.text[block.char_start:block.char_end]
+
+    def blocks_of(self, kind: str) -> List[Block]:
+        return [block for block in self.blocks if block.kind == kind]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Readable form for API responses"""
+        return {
+            "file_type": self.file_type,
+            "text": self.text,
+            "blocks": [
+                {
+                    "kind": b.kind, "char_start": b.char_start, "char_end": b.char_end,
+                    "page": b.page, "level": b.level, "label": b.label
+                }
+                for b in self.blocks
+            ],
+            "tables": [
+                {
+                    "name": t.name, "columns": t.columns, "rows": t.rows, "row_count": t.row_count,
+                    "statistics": t.statistics, "source": t.source
+                }
+                for t in self.tables
+            ],
+            "stats": self.stats,
+            "entities": self.entities,
+            "metadata": self.metadata,
+            "structured": self.structured
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExtractionResult":
+        return cls(
+            file_type=data["file_type"],
+            text=data.get("text", ""),
+            blocks=[Block(**b) for b in data.get("blocks", [])],
+            tables=[Table(**t) for t in data.get("tables", [])],
+            stats=data.get("stats", {}),
+            entities=data.get("entities", []),
+            metadata=data.get("metadata", {}),
+            structured=data.get("structured")
+        )
+
+    def to_bytes(self, include_text: bool = True) -> bytes:
+        """Compact binary form: msgpack when installed (zlib above 1KB),
+        otherwise zlib-compressed JSON. Blocks and tables are packed as tuples.
+
+        include_text=False leaves the text out, for callers that store it
+        next to the bytes anyway; hand it back to from_bytes().
+        """
+        payload = [
+            FORMAT_VERSION,
+            self.file_type,
+            self.text if include_text else "",
+            [[b.kind, b.char_start, b.char_end, b.page, b.level, b.label] for b in self.blocks],
+            [[t.name, t.columns, t.rows, t.row_count, t.statistics, t.source] for t in self.tables],
+            self.stats,
+            self.entities,
+            self.metadata,
+            self.structured
+        ]
+        if msgpack is not None:
+            packed = msgpack.packb(payload, default=_encode, use_bin_type=True)
+            if len(packed) > _COMPRESS_ABOVE:
+                return _MSGPACK_ZLIB + zlib.compress(packed, 1)
+            return _MSGPACK + packed
+        encoded = json.dumps(payload, default=_encode, separators=(",", ":")).encode("utf-8")
+        return _JSON_ZLIB + zlib.compress(encoded, 1)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, text: Optional[str] = None) -> "ExtractionResult":
+        """Decode to_bytes() output; text replaces the packed text when given"""
+        codec, body = data[:1], data[1:]
+        if codec in (_MSGPACK, _MSGPACK_ZLIB):
+            if msgpack is None:
+                raise RuntimeError("msgpack is required to decode this extraction result")
+            if codec == _MSGPACK_ZLIB:
+                body = zlib.decompress(body)
+            payload = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        elif codec == _JSON_ZLIB:
+            payload = json.loads(zlib.decompress(body))
+        else:
+            raise ValueError(f"Unknown extraction result codec: {codec!r}")
+
+        version, file_type, packed_text, blocks, tables, stats, entities, metadata, structured = payload
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported extraction result version: {version}")
+        return cls(
+            file_type=file_type,
+            text=packed_text if text is None else text,
+            blocks=[Block(*b) for b in blocks],
+            tables=[Table(*t) for t in tables],
+            stats=stats,
+            entities=entities,
+            metadata=metadata,
+            structured=structured
+        )
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, Decimal):
+        return float(value)
+    # Other numeric types, e.g. PIL's IFDRational in image dpi/EXIF metadata
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    # Silently stringifying would hide extractors returning the wrong types
+    raise TypeError(f"Cannot serialize {type(value).__name__} in an extraction result")
+
+def build_result(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    """Normalize a DocumentProcessor result dict into an ExtractionResult"""
+    file_type = file_type.lower()
+    builder = _BUILDERS.get(file_type, _from_text)
+    result = builder(file_type, raw)
+    analysis = raw.get("analysis") or {}
+    if not result.entities and isinstance(analysis.get("entities"), list):
+        result.entities = analysis["entities"]
+    return result
+
+def _text_stats(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: analysis[key] for key in ("words", "sentences") if key in analysis}
+
+def _from_text(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    text = raw.get("content") or ""
+    if not isinstance(text, str):
+        text = str(text)
+    return ExtractionResult(
+        file_type=file_type,
+        text=text,
+        blocks=[Block("document", 0, len(text))] if text else [],
+        stats=_text_stats(raw.get("analysis") or {}),
+        metadata=raw.get("metadata", {})
+    )
+
+def _from_pdf(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    text = raw.get("content", "")
+    blocks = [
+        Block("page", page["char_start"], min(page["char_end"], len(text)), page=page["page_number"],
+              label="ocr" if page.get("ocr") else None)
+        for page in raw.get("pages", []) if not page.get("spilled")
+    ]
+    return ExtractionResult(file_type=file_type, text=text, blocks=blocks, metadata=raw.get("metadata", {}))
+
+def _from_image(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    # Rebuild offsets the way blocks_to_text joins OCR blocks
+    parts, blocks, boxes = [], [], []
+    offset = 0
+    for item in raw.get("text_blocks", []):
+        text = (item.get("text") or "").strip()
+        if not text:
+            continue
+        if parts:
+            offset += 1
+        blocks.append(Block("ocr_line", offset, offset + len(text)))
+        boxes.append({"bbox": item.get("bbox"), "confidence": item.get("confidence")})
+        parts.append(text)
+        offset += len(text)
+    return ExtractionResult(
+        file_type=file_type,
+        text=" ".join(parts),
+        blocks=blocks,
+        stats=_text_stats(raw.get("analysis") or {}),
+        metadata=raw.get("metadata", {}),
+        structured={"boxes": boxes}
+    )
+
+def _from_docx(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    text = raw.get("text", "")
+    blocks = []
+    runs = {}
+    for paragraph in raw.get("content", []):
+        start = paragraph.get("char_start", 0)
+        kind = "heading" if paragraph.get("level") else "paragraph"
+        blocks.append(Block(kind, start, start + len(paragraph["text"]),
+                            level=paragraph.get("level"), label=paragraph.get("style")))
+        if "runs" in paragraph:
+            runs[str(paragraph.get("index", len(runs)))] = paragraph["runs"]
+    for section in raw.get("structure", {}).get("sections", []):
+        blocks.append(Block("section", section["char_start"], section["char_end"],
+                            level=section.get("level"), label=section.get("title")))
+
+    tables = [
+        Table(f"table_{index + 1}", columns=rows[0] if rows else [], rows=rows[1:], row_count=max(len(rows) - 1, 0))
+        for index, rows in enumerate(raw.get("tables", []))
+    ]
+    return ExtractionResult(
+        file_type=file_type,
+        text=text,
+        blocks=blocks,
+        tables=tables,
+        stats=_text_stats(raw.get("analysis") or {}),
+        metadata=raw.get("metadata", {}),
+        structured={"runs": runs} if runs else None
+    )
+
+def _render_table(name: Optional[str], columns: List[str], rows: List[List[Any]]) -> str:
+    lines = [name] if name else []
+    lines.append("\t".join(columns))
+    lines.extend("\t".join("" if value is None else str(value) for value in row) for row in rows)
+    return "\n".join(lines)
+
+def _tabular_result(file_type: str, raw: Dict[str, Any], sheets: List[Dict[str, Any]]) -> ExtractionResult:
+    """Preview rows rendered once as tab-separated text, one block per table"""
+    sources = {entry["name"]: entry for entry in raw.get("tables", [])}
+    parts, blocks, tables = [], [], []
+    offset = 0
+    for sheet in sheets:
+        rendered = _render_table(sheet["label"], sheet["columns"], sheet["rows"])
+        if parts:
+            offset += 2
+        blocks.append(Block("table", offset, offset + len(rendered), label=sheet["name"]))
+        parts.append(rendered)
+        offset += len(rendered)
+        tables.append(Table(
+            sheet["name"],
+            columns=sheet["columns"],
+            rows=sheet["rows"],
+            row_count=sheet["row_count"],
+            statistics=sheet["statistics"],
+            source=sources.get(sheet["name"])
+        ))
+    return ExtractionResult(
+        file_type=file_type,
+        text="\n\n".join(parts),
+        blocks=blocks,
+        tables=tables,
+        stats=raw.get("analysis", {}),
+        metadata=raw.get("metadata", {})
+    )
+
+def _from_csv(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    columns = raw.get("metadata", {}).get("columns", [])
+    preview = raw.get("preview", {}).get("first_rows", [])
+    return _tabular_result(file_type, raw, [{
+        "name": "data",
+        "label": None,
+        "columns": columns,
+        "rows": [[row.get(col) for col in columns] for row in preview],
+        "row_count": raw.get("metadata", {}).get("total_rows", 0),
+        "statistics": raw.get("statistics", {})
+    }])
+
+def _from_xlsx(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    sheets = []
+    for name, sheet in raw.get("sheets", {}).items():
+        columns = sheet.get("headers", [])
+        statistics = dict(sheet.get("statistics", {}))
+        row_count = statistics.pop("row_count", 0)
+        statistics.pop("column_count", None)
+        sheets.append({
+            "name": name,
+            "label": f"Sheet: {name}",
+            "columns": columns,
+            "rows": [[row.get(col) for col in columns] for row in sheet.get("preview_data", [])],
+            "row_count": row_count,
+            "statistics": statistics
+        })
+    return _tabular_result(file_type, raw, sheets)
+
+def _from_json(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    analysis = raw.get("analysis", {})
+    lines = [json.dumps(record, default=_encode, ensure_ascii=False) for record in analysis.get("preview_data", [])]
+    blocks, offset = [], 0
+    for line in lines:
+        blocks.append(Block("record", offset, offset + len(line)))
+        offset += len(line) + 1
+    metadata = {key: value for key, value in raw.get("metadata", {}).items() if key != "structure"}
+    return ExtractionResult(
+        file_type=file_type,
+        text="\n".join(lines),
+        blocks=blocks,
+        metadata=metadata,
+        structured={"schema": analysis.get("schema", {}), "sample_size": analysis.get("sample_size")}
+    )
+
+def _chunk_blocks(chunks: List[Dict[str, Any]]) -> List[Block]:
+    return [
+        Block("chunk", chunk["char_start"], chunk["char_end"],
+              label=f"document:{chunk['document_index']}" if "document_index" in chunk else None)
+        for chunk in chunks
+    ]
+
+def _from_xml(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    return ExtractionResult(
+        file_type=file_type,
+        text=raw.get("content", ""),
+        blocks=_chunk_blocks(raw.get("chunks", [])),
+        metadata=raw.get("metadata", {}),
+        structured=raw.get("structured_data")
+    )
+
+def _from_yaml(file_type: str, raw: Dict[str, Any]) -> ExtractionResult:
+    return ExtractionResult(
+        file_type=file_type,
+        text=raw.get("content", ""),
+        blocks=_chunk_blocks(raw.get("chunks", [])),
+        metadata=raw.get("metadata", {}),
+        structured={"schema": raw.get("schema", {}), "documents": raw.get("structured_data")}
+    )
+
+_BUILDERS = {
+    "pdf": _from_pdf,
+    "jpg": _from_image,
+    "jpeg": _from_image,
+    "png": _from_image,
+    "docx": _from_docx,
+    "doc": _from_docx,
+    "txt": _from_text,
+    "csv": _from_csv,
+    "xlsx": _from_xlsx,
+    "xls": _from_xlsx,
+    "json": _from_json,
+    "xml": _from_xml,
+    "yaml": _from_yaml,
+    "yml": _from_yaml
+}
@@ -0,0 +1,170 @@
+# backend/core/document_processor/sketches.py
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+class TDigest:
+    """Mergeable streaming quantile sketch (merging t-digest, k1 scale function).
+
+    Memory is bounded by the compression parameter (roughly compression / 2
+    centroids), regardless of how many values are added.
+    """
+
+    def __init__(self, compression: float = 200):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))])
+        )
+
+    def merge(self, other: "TDigest") -> None:
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights])
+        )
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        cumulative = np.cumsum(weights)
+        q_mid = (cumulative - weights / 2) / total
+        # Neighbours whose midpoints fall in the same unit of k-space merge
+        k = np.floor(self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q_mid - 1, -1, 1)))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q in [0, 1]"""
+        if self.count == 0:
+            return None
+        q = min(max(q, 0.0), 1.0)
+        total = self.weights.sum()
+        mids = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], mids, [total]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, xs, ys))
+
+    def percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[float]]:
+        return {f"p{p:g}": self.quantile(p / 100) for p in percentiles}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(data.get("compression", 200))
+        digest.count = data.get("count", 0)
+        if digest.count:
+            digest.min = data["min"]
+            digest.max = data["max"]
+        digest.means = np.asarray(data.get("means", []), dtype=np.float64)
+        digest.weights = np.asarray(data.get("weights", []), dtype=np.float64)
+        return digest
+
+class StreamingHistogram:
+    """Fixed-bin-count histogram updated chunk by chunk.
+
+    Without explicit edges, the range starts at the first values seen and
+    doubles toward whichever side later values fall outside of, folding the
+    existing counts into the wider bins (exactly, for an even bin count), so
+    sorted columns such as IDs or dates are binned over their full range.
+    Explicit edges stay fixed and out-of-range values go to
+    underflow/overflow counters. Histograms with the same edges can be merged.
+    """
+
+    def __init__(self, bins: int = 20, edges: Optional[List[float]] = None):
+        self.bins = bins
+        self.edges = np.asarray(edges, dtype=np.float64) if edges is not None else None
+        self.fixed = edges is not None
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.edges is None:
+            if low == high:
+                low, high = low - 0.5, high + 0.5
+            self.edges = np.linspace(low, high, self.bins + 1)
+        elif not self.fixed and (low < self.edges[0] or high > self.edges[-1]):
+            self._grow(low, high)
+
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+
+    def _grow(self, low: float, high: float) -> None:
+        """Double the range until it covers [low, high] and rebin the existing counts"""
+        start, end = float(self.edges[0]), float(self.edges[-1])
+        while low < start or high > end:
+            if high > end:
+                end += end - start
+            else:
+                start -= end - start
+        # Each old bin lies inside one new bin, so its midpoint places all its count
+        midpoints = (self.edges[:-1] + self.edges[1:]) / 2
+        self.edges = np.linspace(start, end, self.bins + 1)
+        counts, _ = np.histogram(midpoints, bins=self.edges, weights=self.counts)
+        self.counts = np.rint(counts).astype(np.int64)
+
+    def merge(self, other: "StreamingHistogram") -> None:
+        if other.edges is None:
+            return
+        if self.edges is None:
+            self.edges = other.edges.copy()
+        elif not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "edges": self.edges.tolist() if self.edges is not None else [],
+            "counts": self.counts.tolist(),
+            "underflow": self.underflow,
+            "overflow": self.overflow
+        }
+
+def quantile_from_stats(column_stats: Dict[str, Any], q: float) -> Optional[float]:
+    """Answer a quantile question from stored column statistics, without the data"""
+    digest = column_stats.get("digest")
+    if not digest:
+        return None
+    return TDigest.from_dict(digest).quantile(q)
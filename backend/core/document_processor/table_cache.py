@@ -0,0 +1,259 @@
+# backend/core/document_processor/table_cache.py
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from config.settings import settings
+from core.document_processor.extraction_cache import get_extraction_cache
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+class TableWriter:
+    """Writes DataFrame chunks of one table to a compressed Parquet file.
+
+    The schema is fixed by the first chunk: numeric columns are stored as
+    int64 when the first chunk holds integers and float64 otherwise, and
+    everything else as strings, so later chunks can't drift. A failed write
+    (e.g. fractions turning up in an int64 column) disables the writer
+    instead of failing the extraction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table_name: str,
+        content_hash: str,
+        on_close: Optional[Callable[[str], None]] = None
+    ):
+        self.path = path
+        self.table_name = table_name
+        self.content_hash = content_hash
+        self.on_close = on_close
+        self.rows = 0
+        self.failed = False
+        # Unique per writer: two requests in one process can write the same table
+        self._tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        self._writer = None
+        self._schema = None
+        self._integer_columns: Optional[Dict[str, bool]] = None
+
+    def write(self, chunk: pd.DataFrame, numeric_columns: Dict[str, bool]) -> None:
+        if self.failed:
+            return
+        try:
+            numbers = {
+                str(col): pd.to_numeric(chunk[col], errors="coerce")
+                for col in chunk.columns if numeric_columns.get(str(col))
+            }
+            if self._integer_columns is None:
+                # Integers stay int64: float64 can't hold IDs above 2**53 exactly
+                self._integer_columns = {
+                    name: pd.api.types.is_integer_dtype(series) for name, series in numbers.items()
+                }
+            columns = {}
+            for col in chunk.columns:
+                name = str(col)
+                if name in numbers:
+                    dtype = "Int64" if self._integer_columns.get(name) else "float64"
+                    columns[name] = numbers[name].astype(dtype)
+                else:
+                    columns[name] = chunk[col].astype("string")
+            table = pa.Table.from_pandas(pd.DataFrame(columns), schema=self._schema, preserve_index=False)
+
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(
+                    self._tmp_path, self._schema, compression=settings.TABLE_CACHE_COMPRESSION
+                )
+            self._writer.write_table(table)
+            self.rows += len(chunk)
+        except Exception as e:
+            logger.warning(f"Parquet cache write failed for {self.table_name}: {e}")
+            self.abort()
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Finish the file and return its manifest entry (None if writing failed)"""
+        if self.failed or self._writer is None:
+            self.abort()
+            return None
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        if self.on_close:
+            self.on_close(self.path)
+        return {
+            "name": self.table_name,
+            "path": self.path,
+            "rows": self.rows,
+            "content_hash": self.content_hash,
+            "format": "parquet"
+        }
+
+    def abort(self) -> None:
+        self.failed = True
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+class ParquetTableCache:
+    """Columnar copies of ingested tables, stored as
+    {TABLE_CACHE_DIR}/{content_hash}/{index}_{table}.parquet.
+
+    Files are keyed by content hash, so re-uploads of the same bytes reuse
+    them; DocumentHandler records the paths against the document id and
+    removes them with the last document that has that content. The table
+    index keeps sheets whose names sanitize alike apart. Once the cache
+    holds more than max_bytes, whole content-hash directories are evicted,
+    least recently used first. Use get_table_cache() so a process keeps one
+    size count.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.TABLE_CACHE_DIR
+        self.max_bytes = max_bytes or settings.TABLE_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def available() -> bool:
+        return pq is not None and settings.TABLE_CACHE_ENABLED
+
+    def path(self, content_hash: str, table_name: str, index: int = 0) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", table_name) or "table"
+        return os.path.join(self.cache_dir, content_hash, f"{index}_{safe_name}.parquet")
+
+    def open_writer(self, content_hash: str, table_name: str, index: int = 0) -> Optional[TableWriter]:
+        """Writer for a table, or None when the cache is disabled or already holds it"""
+        if not self.available():
+            return None
+        path = self.path(content_hash, table_name, index)
+        if os.path.exists(path):
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return TableWriter(path, table_name, content_hash, on_close=self._added)
+
+    def existing_entry(self, content_hash: str, table_name: str, index: int = 0) -> Optional[Dict[str, Any]]:
+        """Manifest entry for a table that is already cached"""
+        if not self.available():
+            return None
+        path = self.path(content_hash, table_name, index)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(os.path.dirname(path))  # LRU: reused tables are evicted last
+        except OSError:
+            pass
+        return {
+            "name": table_name,
+            "path": path,
+            "rows": pq.ParquetFile(path).metadata.num_rows,
+            "content_hash": content_hash,
+            "format": "parquet"
+        }
+
+    def remove(self, content_hash: str) -> None:
+        """Delete every cached table of a content hash"""
+        directory = os.path.join(self.cache_dir, content_hash)
+        size = self._directory_size(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+        _forget_extractions(content_hash)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(self._total_bytes - size, 0)
+
+    def _added(self, path: str) -> None:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            else:
+                self._total_bytes += os.path.getsize(path)
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self._evict(keep=os.path.dirname(path))
+
+    def _evict(self, keep: str = None) -> None:
+        """Delete least recently used content-hash directories down to 90% of max_bytes"""
+        directories, total = self._scan()
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, directory in sorted(directories):
+            if total <= target:
+                break
+            if directory == keep:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            _forget_extractions(os.path.basename(directory))
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._total_bytes = total
+        logger.info(f"Table cache evicted {evicted} table sets ({total} bytes remain)")
+
+    def _scan(self):
+        """([(mtime, size, directory)], total size) over the cache directory"""
+        directories = []
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return [], 0
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            directories.append((mtime, self._directory_size(entry.path), entry.path))
+        return directories, sum(size for _, size, _ in directories)
+
+    @staticmethod
+    def _directory_size(directory: str) -> int:
+        total = 0
+        try:
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".parquet"):
+                    try:
+                        total += entry.stat().st_size
+                    except FileNotFoundError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return total
+
+    @staticmethod
+    def read_table(path: str, columns: Optional[List[str]] = None) -> "pa.Table":
+        """Memory-mapped read; only the requested columns are decoded"""
+        if pq is None:
+            raise RuntimeError("pyarrow is required to read cached tables")
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+def _forget_extractions(content_hash: str) -> None:
+    """Cached ExtractionResults of the content point at its tables, so they go too"""
+    if settings.EXTRACTION_CACHE_ENABLED:
+        get_extraction_cache().remove_content(content_hash)
+
+_cache: Optional[ParquetTableCache] = None
+
+def get_table_cache() -> ParquetTableCache:
+    """Process-wide Parquet table cache, created on first use"""
+    global _cache
+    if _cache is None:
+        _cache = ParquetTableCache()
+    return _cache
@@ -0,0 +1,277 @@
+# backend/core/document_processor/xml_profile.py
+import logging
+import random
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from core.document_processor.memory_budget import MemoryBudget, size_of
+
+logger = logging.getLogger(__name__)
+
+# Elements a path's first occurrence may build before it is given up on;
+# bounds the work spent on large one-off elements that never repeat
+_FIRST_MAX_ELEMENTS = 1000
+
+def _local_name(tag: str) -> str:
+    """'{namespace}Tag' -> 'Tag'"""
+    return tag.rsplit('}', 1)[-1] if tag.startswith('{') else tag
+
+class XMLProfiler:
+    """Streaming XML profile built on iterparse, in bounded memory.
+
+    Every element is cleared (and dropped from its parent) as soon as it ends,
+    so only the current root-to-leaf path is held. The profile has:
+      - a tag-path schema ("Invoices/Invoice/Line") with counts, attribute
+        counts and how often the element carries text
+      - a seeded reservoir sample of repeated elements (records), rebuilt as
+        dicts where repeated child tags become lists
+      - text chunks with character offsets, ready for embedding; leaf values
+        are labelled with their tag ("Amount: 100.00")
+    """
+
+    def __init__(
+        self,
+        sample_size: int = None,
+        max_record_paths: int = None,
+        max_paths: int = None,
+        chunk_size: int = None,
+        max_text_chars: int = None,
+        seed: int = None,
+        overflow=None,
+        budget: MemoryBudget = None
+    ):
+        self.sample_size = sample_size or settings.XML_SAMPLE_SIZE
+        self.max_record_paths = max_record_paths or settings.XML_MAX_RECORD_PATHS
+        self.max_paths = max_paths or settings.XML_MAX_PATHS
+        self.chunk_size = chunk_size or settings.XML_CHUNK_SIZE
+        self.max_text_chars = max_text_chars or settings.XML_MAX_TEXT_CHARS
+        self.seed = settings.XML_SAMPLE_SEED if seed is None else seed
+        # Text the budget can't hold goes to overflow (e.g. a SpillFile);
+        # text past max_text_chars is dropped
+        self.budget = budget or MemoryBudget(limit_bytes=0)
+        self.overflow = overflow
+
+    def profile(self, file_path: str) -> Dict[str, Any]:
+        self._random = random.Random(self.seed)
+        self._schema: Dict[str, Dict[str, Any]] = {}
+        self._samples: Dict[str, List[Any]] = {}
+        self._seen: Dict[str, int] = {}
+        # First occurrence of each complex path, kept until it is known to repeat
+        self._first: Dict[str, Any] = {}
+        self._first_budget = 0
+        self._lines: List[str] = []
+        self._chunks: List[Dict[str, Any]] = []
+        self._chunk_lines: List[str] = []
+        self._chunk_chars = 0
+        self._chunk_start = 0
+        self._text_chars = 0
+        self._text_truncated = False
+        self._spilling = False
+
+        namespaces = {}
+        elements: List[ET.Element] = []
+        paths: List[str] = []
+        # Per open element: the dict being built when it is part of a sampled
+        # record or of a path's first occurrence, and whether it is in a record
+        builders: List[Optional[Dict[str, Any]]] = []
+        slots: List[Optional[int]] = []
+        in_record: List[bool] = []
+        root_tag = None
+        element_count = 0
+        max_depth = 0
+
+        for event, item in ET.iterparse(file_path, events=("start", "end", "start-ns")):
+            if event == "start-ns":
+                prefix, uri = item
+                namespaces[prefix or ""] = uri
+                continue
+
+            if event == "start":
+                tag = _local_name(item.tag)
+                if root_tag is None:
+                    root_tag = tag
+                path = f"{paths[-1]}/{tag}" if paths else tag
+                elements.append(item)
+                paths.append(path)
+                max_depth = max(max_depth, len(paths))
+
+                builder, slot = None, None
+                recording = bool(in_record) and in_record[-1]
+                if not recording:
+                    slot = self._sample_slot(path)
+                    recording = slot is not None
+                # Whether a path repeats is only known once it occurs again, so
+                # its first occurrence is built too (the root can't repeat)
+                first = (
+                    len(paths) > 1 and len(self._schema) < self.max_paths
+                    and path not in self._schema and path not in self._samples
+                )
+                building = bool(builders) and builders[-1] is not None
+                if first and not building:
+                    self._first_budget = _FIRST_MAX_ELEMENTS
+                if recording or ((first or building) and self._first_budget > 0):
+                    if not recording:
+                        self._first_budget -= 1
+                    builder = {f"@{_local_name(k)}": v for k, v in item.attrib.items()}
+                builders.append(builder)
+                slots.append(slot)
+                in_record.append(recording)
+                continue
+
+            # event == "end"
+            elem = elements.pop()
+            path = paths.pop()
+            builder = builders.pop()
+            slot = slots.pop()
+            recording = in_record.pop()
+            parent = elements[-1] if elements else None
+            element_count += 1
+
+            tag = _local_name(elem.tag)
+            text = (elem.text or "").strip()
+            is_leaf = len(elem) == 0
+            self._update_schema(path, elem, bool(text), is_leaf)
+
+            if text:
+                self._add_text(f"{tag}: {text}" if is_leaf else text)
+            for child in elem:
+                self._add_text((child.tail or "").strip())
+
+            if builder is not None:
+                value = self._finish_builder(builder, text)
+                if builders and builders[-1] is not None:
+                    self._attach(builders[-1], tag, value)
+                if slot is not None:
+                    samples = self._samples[path]
+                    if slot < len(samples):
+                        samples[slot] = value
+                    else:
+                        samples.append(value)
+                elif (
+                    not recording and not is_leaf and self._first_budget > 0
+                    and self._schema.get(path, {}).get("count") == 1
+                ):
+                    self._first[path] = value
+
+            # Free the subtree; keep only the last child in the parent so its
+            # tail text can still be read when the next sibling (or parent) ends.
+            # The tail may not be parsed yet, and clear() would reset it
+            tail = elem.tail
+            elem.clear()
+            elem.tail = tail
+            if parent is not None:
+                for sibling in parent[:-1]:
+                    self._add_text((sibling.tail or "").strip())
+                del parent[:-1]
+
+        self._flush_chunk()
+
+        return {
+            "root_tag": root_tag,
+            "namespaces": namespaces,
+            "element_count": element_count,
+            "max_depth": max_depth,
+            "schema": self._schema,
+            "records": self._samples,
+            "content": "\n".join(self._lines),
+            "chunks": self._chunks,
+            "text_truncated": self._text_truncated
+        }
+
+    def _sample_slot(self, path: str) -> Optional[int]:
+        """Reservoir slot for this occurrence of a repeated, complex element
+        (None = don't capture). Paths nested in a record path aren't sampled
+        on their own."""
+        info = self._schema.get(path)
+        if info is None or not info["complex"]:
+            return None
+        if path not in self._samples:
+            first = self._first.pop(path, None)
+            if len(self._samples) >= self.max_record_paths:
+                return None
+            if any(path.startswith(f"{record_path}/") for record_path in self._samples):
+                return None
+            # A repeated child (Invoice/Line) can repeat before its parent
+            # (Invoice) does; the outer record supersedes it
+            for record_path in [p for p in self._samples if p.startswith(f"{path}/")]:
+                del self._samples[record_path]
+            self._samples[path] = [first] if first is not None else []
+
+        # The first occurrence ended before the path was known to repeat
+        seen = self._seen.get(path, 1) + 1
+        self._seen[path] = seen
+        samples = self._samples[path]
+        if len(samples) < self.sample_size:
+            return len(samples)
+        index = self._random.randrange(seen)
+        return index if index < self.sample_size else None
+
+    def _update_schema(self, path: str, elem: ET.Element, has_text: bool, is_leaf: bool) -> None:
+        info = self._schema.get(path)
+        if info is None:
+            if len(self._schema) >= self.max_paths:
+                return
+            info = self._schema[path] = {"count": 0, "text_count": 0, "complex": False, "attributes": {}}
+        info["count"] += 1
+        info["text_count"] += int(has_text)
+        info["complex"] = info["complex"] or not is_leaf
+        for name in elem.attrib:
+            name = _local_name(name)
+            info["attributes"][name] = info["attributes"].get(name, 0) + 1
+
+    @staticmethod
+    def _finish_builder(builder: Dict[str, Any], text: str) -> Any:
+        if not builder:
+            return text or None
+        if text:
+            builder["#text"] = text
+        return builder
+
+    @staticmethod
+    def _attach(parent: Dict[str, Any], tag: str, value: Any, max_items: int = 50) -> None:
+        """Add a child value; repeated tags become lists instead of overwriting"""
+        if tag not in parent:
+            parent[tag] = value
+        elif isinstance(parent[tag], list):
+            if len(parent[tag]) < max_items:
+                parent[tag].append(value)
+        else:
+            parent[tag] = [parent[tag], value]
+
+    def _add_text(self, line: str) -> None:
+        if not line or self._text_truncated:
+            return
+        if self._text_chars + len(line) > self.max_text_chars:
+            self._text_truncated = True
+            return
+        self._text_chars += len(line) + 1
+
+        # Each line is held twice (content and chunk text); once the budget
+        # refuses one, the rest of the text goes to overflow so it stays in order
+        if self._spilling or not self.budget.reserve(2 * size_of(line)):
+            self._spilling = True
+            if self.overflow is None:
+                self._text_truncated = True
+            else:
+                self.overflow.write(line + "\n")
+            return
+
+        self._lines.append(line)
+        self._chunk_lines.append(line)
+        self._chunk_chars += len(line) + 1
+        if self._chunk_chars >= self.chunk_size:
+            self._flush_chunk()
+
+    def _flush_chunk(self) -> None:
+        if not self._chunk_lines:
+            return
+        text = "\n".join(self._chunk_lines)
+        self._chunks.append({
+            "text": text,
+            "char_start": self._chunk_start,
+            "char_end": self._chunk_start + len(text)
+        })
+        self._chunk_start += len(text) + 1
+        self._chunk_lines = []
+        self._chunk_chars = 0
@@ -0,0 +1,144 @@
+# backend/core/document_processor/yaml_profile.py
+import logging
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from config.settings import settings
+from core.document_processor.json_profile import SchemaInference, json_type
+from core.document_processor.memory_budget import MemoryBudget, size_of
+
+logger = logging.getLogger(__name__)
+
+# libyaml-backed loader when PyYAML was built against it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def _depth(value: Any, limit: int = 50) -> int:
+    if limit == 0 or not isinstance(value, (dict, list)) or not value:
+        return 0
+    children = value.values() if isinstance(value, dict) else value
+    return 1 + max(_depth(child, limit - 1) for child in children)
+
+class YAMLProfiler:
+    """Multi-document YAML ingestion.
+
+    Walks every document of the stream (what safe_load_all does), but through
+    the composed node so each document's source span is known. That gives
+    per-document summaries and text chunks with offsets into the original
+    file, plus a schema merged across documents. The file is parsed as a
+    stream and each document's source is read as it is reached; once the
+    budget refuses a document, its source and everything after it go to
+    overflow and those documents keep only their summary.
+    """
+
+    def __init__(self, chunk_size: int = None, budget: MemoryBudget = None, overflow=None):
+        self.chunk_size = chunk_size or settings.YAML_CHUNK_SIZE
+        # Source the budget can't hold goes to overflow (e.g. a SpillFile)
+        self.budget = budget or MemoryBudget(limit_bytes=0)
+        self.overflow = overflow
+
+    def profile(self, file_path: str) -> Dict[str, Any]:
+        documents = []
+        summaries = []
+        chunks = []
+        parts: List[str] = []
+        kinds: Dict[str, int] = {}
+        schema = SchemaInference()
+        spilling = False
+        position = 0
+
+        def keep(text: str, data: Any = None) -> bool:
+            # Source is held twice (content and chunk text)
+            nonlocal spilling
+            if spilling or not self.budget.reserve(2 * size_of(text) + size_of(data)):
+                spilling = True
+                if self.overflow is not None:
+                    self.overflow.write(text)
+                return False
+            parts.append(text)
+            return True
+
+        # Marks count characters, so the source is read by a second text reader
+        with open(file_path, 'r', encoding='utf-8') as stream, open(file_path, 'r', encoding='utf-8') as source:
+            loader = SafeLoader(stream)
+            try:
+                while loader.check_node():
+                    node = loader.get_node()
+                    data = loader.construct_document(node) if node is not None else None
+                    index = len(summaries)
+                    schema.add(data)
+
+                    summary = self._summarize(index, data, node)
+                    summaries.append(summary)
+                    if summary.get("kind"):
+                        kinds[summary["kind"]] = kinds.get(summary["kind"], 0) + 1
+
+                    # The text since the previous document, separators included
+                    end = node.end_mark.index if node is not None else position
+                    text = source.read(end - position)
+                    if keep(text, data):
+                        documents.append(data)
+                        if node is not None:
+                            chunks.extend(self._chunk(text, index, node.start_mark.index, end, position))
+                    else:
+                        summary["spilled"] = True
+                    position = end
+            finally:
+                loader.dispose()
+
+            # Trailing comments and whitespace
+            keep(source.read())
+
+        return {
+            "loader": SafeLoader.__name__,
+            "content": "".join(parts),
+            "documents": documents,
+            "summaries": summaries,
+            "chunks": chunks,
+            "kinds": kinds,
+            "schema": schema.to_dict(),
+            "spilled_documents": len(summaries) - len(documents)
+        }
+
+    @staticmethod
+    def _summarize(index: int, data: Any, node: Optional[yaml.Node]) -> Dict[str, Any]:
+        summary = {
+            "index": index,
+            "type": json_type(data),
+            "depth": _depth(data),
+            "line_start": node.start_mark.line + 1 if node is not None else None,
+            "line_end": node.end_mark.line + 1 if node is not None else None
+        }
+        if isinstance(data, dict):
+            summary["key_count"] = len(data)
+            summary["keys"] = [str(key) for key in list(data)[:50]]
+            # Kubernetes-style manifests identify themselves
+            metadata = data.get("metadata")
+            if "kind" in data:
+                summary["kind"] = str(data["kind"])
+                summary["api_version"] = data.get("apiVersion")
+            if isinstance(metadata, dict) and "name" in metadata:
+                summary["name"] = metadata["name"]
+        elif isinstance(data, list):
+            summary["length"] = len(data)
+        return summary
+
+    def _chunk(self, text: str, index: int, start: int, end: int, base: int = 0) -> List[Dict[str, Any]]:
+        """Split one document's source span into chunks on line boundaries;
+        text holds the source from character base onwards"""
+        chunks = []
+        while start < end:
+            stop = min(start + self.chunk_size, end)
+            if stop < end:
+                newline = text.rfind("\n", start - base, stop - base)
+                if newline > start - base:
+                    stop = base + newline + 1
+            if text[start - base:stop - base].strip():
+                chunks.append({
+                    "text": text[start - base:stop - base],
+                    "document_index": index,
+                    "char_start": start,
+                    "char_end": stop
+                })
+            start = stop
+        return chunks
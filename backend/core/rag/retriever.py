@@ -9,6 +9,8 @@ import os
 from dotenv import load_dotenv
 import logging
 import asyncio
+from config.settings import settings
+from core.document_processor.language import LanguageDetector
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -86,7 +88,7 @@ class RAGRetriever:
         )
         self.vector_store = None
 
-    async def process_document(self, document_id: str, content: str) -> None:
+    async def process_document(self, document_id: str, content: str, detect_languages: bool = None) -> None:
         """Process and store document content in vector store"""
         try:
             chunks = self.text_splitter.split_text(content)
@@ -94,27 +96,56 @@ class RAGRetriever:
                 {"content": chunk, "document_id": document_id, "chunk_id": i}
                 for i, chunk in enumerate(chunks)
             ]
+
+            # Optionally tag each chunk with its language for routing multilingual documents
+            if settings.LANGDETECT_PER_CHUNK if detect_languages is None else detect_languages:
+                languages = await asyncio.to_thread(LanguageDetector().detect_chunks, chunks)
+                for item, language in zip(texts_with_metadata, languages):
+                    item["language"] = language
             
             # Initialize or update vector store
             embeddings = await self.embeddings.embed_documents([t["content"] for t in texts_with_metadata])
-            self.vector_store = Chroma.from_embeddings(
-                embeddings=embeddings,
-                texts=[t["content"] for t in texts_with_metadata],
-                metadatas=texts_with_metadata
-            )
+            self.store_embeddings(texts_with_metadata, embeddings)
             
         except Exception as e:
             logger.error(f"Error processing document: {e}")
             raise
 
-    async def get_relevant_chunks(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
-        """Retrieve relevant document chunks for a query"""
+    def store_embeddings(self, texts_with_metadata: List[Dict[str, Any]], embeddings: List[Any]) -> None:
+        """Add already-embedded chunks to the vector store, creating it on first use"""
+        if not texts_with_metadata:
+            return
+        if self.vector_store is None:
+            self.vector_store = Chroma(collection_name="documents", embedding_function=self.embeddings)
+
+        # add_texts would embed the chunks again, so hand the vectors to the
+        # collection directly; ids are per document chunk, so a rerun replaces
+        self.vector_store._collection.upsert(
+            ids=[f"{t['document_id']}:{t['chunk_id']}" for t in texts_with_metadata],
+            embeddings=embeddings,
+            documents=[t["content"] for t in texts_with_metadata],
+            metadatas=texts_with_metadata
+        )
+
+    def has_document(self, document_id: str) -> bool:
+        """Whether a document's chunks are already in the vector store"""
+        if self.vector_store is None:
+            return False
+        found = self.vector_store._collection.get(where={"document_id": document_id}, limit=1)
+        return bool(found["ids"])
+
+    async def get_relevant_chunks(self, query: str, k: int = 3, document_id: str = None) -> List[Dict[str, Any]]:
+        """Retrieve relevant document chunks for a query, optionally from one document"""
         try:
             if not self.vector_store:
                 return []
             
             query_embedding = await self.embeddings.embed_query(query)
-            results = self.vector_store.similarity_search_by_vector(query_embedding, k=k)
+            results = self.vector_store.similarity_search_by_vector(
+                query_embedding,
+                k=k,
+                filter={"document_id": document_id} if document_id else None
+            )
             return [
                 {
                     "content": doc.page_content,
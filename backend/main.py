@@ -6,6 +6,10 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from api.routes.service_routes.database_routes import router as database_router
 from api.routes import chat_routes
 from api.routes.service_routes.legal_routes import router as legal_router
+from config.settings import settings
+from core.document_processor.model_registry import model_registry
+from core.document_processor.executor import get_extraction_executor, shutdown_extraction_executor
+import asyncio
 import os
 from dotenv import load_dotenv
 import logging
@@ -47,6 +51,10 @@ async def shutdown_db_client():
     if hasattr(app, "mongodb_client"):
         app.mongodb_client.close()
 
+@app.on_event("shutdown")
+async def shutdown_extraction_pool():
+    shutdown_extraction_executor(wait=False)
+
 # Include database routes
 app.include_router(
     database_router,
@@ -69,6 +77,20 @@ app.include_router(
 async def root():
     return {"message": "API is running"}
 
+# Warm OCR/NLP models before serving so the first upload doesn't pay the load cost
+@app.on_event("startup")
+async def preload_models():
+    if settings.PRELOAD_MODELS:
+        names = None
+        if settings.EXTRACTION_USE_PROCESS_POOL:
+            # Extraction runs in pool workers; spawn them now so each preloads its own
+            # models, and keep OCR/spaCy out of this process. Chunk language tagging
+            # still runs here, so langdetect is warmed in both.
+            get_extraction_executor().start()
+            names = ["langdetect:seed=0"]
+        status = await asyncio.to_thread(model_registry.preload, names)
+        logger.info(f"Model registry: {status}")
+
 # Add startup event for logging
 @app.on_event("startup")
 async def startup_event():
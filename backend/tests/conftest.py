@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# Tests import modules the way the app does (from config..., from core...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
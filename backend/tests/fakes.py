@@ -0,0 +1,218 @@
+# backend/tests/fakes.py
+"""In-memory stand-ins for the Mongo collections and services the ingestion code talks to"""
+import copy
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+def _get(document: Dict[str, Any], dotted: str) -> Any:
+    value = document
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, option) for option in condition):
+                return False
+            continue
+        value = _get(document, key)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif isinstance(condition, dict) and "$lt" in condition:
+            if value is None or not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def _apply(document: Dict[str, Any], update: Dict[str, Any]) -> None:
+    for operator, fields in update.items():
+        for dotted, value in fields.items():
+            *parents, last = dotted.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[last] = target.get(last, 0) + value if operator == "$inc" else value
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+
+    def sort(self, key: str, direction: int = 1) -> "FakeCursor":
+        self.documents.sort(key=lambda document: _get(document, key), reverse=direction < 0)
+        return self
+
+    def skip(self, count: int) -> "FakeCursor":
+        self.documents = self.documents[count:]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.documents[:length] if length else self.documents
+
+class FakeCollection:
+    def __init__(self):
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: List[Any] = []
+
+    async def insert_one(self, document: Dict[str, Any]) -> SimpleNamespace:
+        self.documents[document["_id"]] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True) -> SimpleNamespace:
+        for document in documents:
+            await self.insert_one(document)
+        return SimpleNamespace(inserted_ids=[document["_id"] for document in documents])
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]) -> None:
+        for document in self.documents.values():
+            if _matches(document, query):
+                _apply(document, update)
+                return
+
+    async def update_many(self, query: Dict[str, Any], update: Dict[str, Any]) -> None:
+        for document in self.documents.values():
+            if _matches(document, query):
+                _apply(document, update)
+
+    async def find_one_and_update(
+        self, query: Dict[str, Any], update: Dict[str, Any], return_document: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Atomic like Mongo's: nothing else runs on the loop between match and update"""
+        for document in self.documents.values():
+            if _matches(document, query):
+                before = copy.deepcopy(document)
+                _apply(document, update)
+                return copy.deepcopy(document) if return_document else before
+        return None
+
+    async def delete_one(self, query: Dict[str, Any]) -> SimpleNamespace:
+        for key, document in list(self.documents.items()):
+            if _matches(document, query):
+                del self.documents[key]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: Dict[str, Any]) -> None:
+        for key, document in list(self.documents.items()):
+            if _matches(document, query):
+                del self.documents[key]
+
+    async def find_one(self, query: Dict[str, Any], projection: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        for document in self.documents.values():
+            if _matches(document, query):
+                return copy.deepcopy(document)
+        return None
+
+    def find(self, query: Dict[str, Any] = None, projection: Dict[str, Any] = None) -> FakeCursor:
+        return FakeCursor([
+            copy.deepcopy(document) for document in self.documents.values()
+            if _matches(document, query or {})
+        ])
+
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        self.indexes.append(keys)
+        return str(keys)
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, FakeCollection())
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+class FakeRetriever:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+        self.stored: List[Dict[str, Any]] = []
+
+    def store_embeddings(self, texts_with_metadata: List[Dict[str, Any]], embeddings: List[Any]) -> None:
+        assert len(texts_with_metadata) == len(embeddings)
+        self.stored.extend(texts_with_metadata)
+
+class FakeChatService:
+    def __init__(self):
+        self.retriever = FakeRetriever()
+
+class FakeStorage:
+    def __init__(self):
+        self.db = FakeDatabase()
+        self.collection = self.db.documents
+        self.chunks = self.db.document_chunks
+
+    async def save_documents(self, documents: List[Dict[str, Any]]) -> None:
+        await self.collection.insert_many(documents, ordered=False)
+
+    async def save_chunks(self, document_id: str, chunks: List[str], offset: int = 0) -> None:
+        await self.chunks.insert_many([
+            {"_id": f"{document_id}:{offset + index}", "document_id": document_id, "index": offset + index, "text": chunk}
+            for index, chunk in enumerate(chunks)
+        ])
+
+    async def get_chunks(self, document_id: str, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        chunks = await self.chunks.find({"document_id": document_id}).sort("index").skip(offset).to_list(limit)
+        return [chunk["text"] for chunk in chunks]
+
+class FakeProcessor:
+    """Returns a canned ExtractionResult (or raises) per file path"""
+
+    def __init__(self, results: Dict[str, Any] = None):
+        self.results = results or {}
+        self.calls: List[str] = []
+
+    def supports(self, file_type: str) -> bool:
+        return file_type.lower() != "exe"
+
+    async def process_result(self, file_path: str, file_type: str, extraction_type: str = "text", options: Dict[str, Any] = None):
+        from core.document_processor.result import ExtractionResult
+
+        self.calls.append(file_path)
+        result = self.results.get(file_path)
+        if isinstance(result, BaseException) or (isinstance(result, type) and issubclass(result, BaseException)):
+            raise result
+        return result if result is not None else ExtractionResult(file_type=file_type, text=f"Text of {file_path}")
+
+class FakeHandler:
+    """The parts of DocumentHandler the ingestion queue and batch ingestor use"""
+
+    def __init__(self, results: Dict[str, Any] = None):
+        self.storage = FakeStorage()
+        self.doc_processor = FakeProcessor(results)
+        self.chat_service = FakeChatService()
+
+    async def find_duplicate(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        document = await self.storage.collection.find_one({"metadata.content_hash": content_hash})
+        if not document:
+            return None
+        return {"id": document["_id"], "status": document["metadata"]["status"]}
+
+    def build_document(self, document_id, file_path, file_type, result, content_hash=None, extra_metadata=None):
+        status = "partial" if result.metadata.get("partial") else "processed"
+        document = {
+            "_id": document_id,
+            "file_path": file_path,
+            "file_type": file_type,
+            "content": {"text": result.text},
+            "metadata": {"status": status, "content_hash": content_hash, **(extra_metadata or {})}
+        }
+        if status == "partial":
+            document["metadata"]["partial"] = result.metadata["partial"]
+        return document, {"id": document_id, "status": status}
+
+    async def store_result(self, document_id, file_path, file_type, result, content_hash=None, extra_metadata=None):
+        document, summary = self.build_document(document_id, file_path, file_type, result, content_hash, extra_metadata)
+        await self.storage.save_documents([document])
+        return summary
@@ -0,0 +1,91 @@
+# backend/tests/test_batch_ingestion.py
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("motor")
+
+from api.services import ingestion_jobs
+from api.services.batch_ingestion import BatchIngestor
+from api.services.ingestion_jobs import IngestionQueue
+from core.document_processor.memory_budget import MemoryBudget
+from core.document_processor.result import ExtractionResult
+from fakes import FakeHandler
+from test_ingestion_jobs import wait_for_jobs
+
+@pytest.fixture
+def upload(tmp_path):
+    def make(name: str, sha256: str = None):
+        path = tmp_path / name
+        path.write_text(name)
+        file_type = name.rsplit(".", 1)[-1]
+        return {"path": str(path), "filename": name, "file_type": file_type, "size": 1, "sha256": sha256 or name}
+    return make
+
+def ingest(handler, *batches, max_queue: int = 4):
+    """Ingest each batch in turn, waiting for its jobs; returns (manifests, jobs by id)"""
+    async def main():
+        queue = IngestionQueue(handler, workers=1, max_queue=max_queue)
+        ingestor = BatchIngestor(handler, queue)
+        manifests, jobs = [], {}
+        try:
+            for files in batches:
+                batch = await ingestor.ingest(files)
+                job_ids = [entry["job_id"] for entry in batch["files"] if entry["status"] == "queued"]
+                for job in await wait_for_jobs(queue, job_ids):
+                    jobs[job["_id"]] = job
+                manifests.append(batch)
+        finally:
+            await queue.stop()
+        return manifests, jobs
+    return asyncio.run(main())
+
+def test_manifest_covers_every_file(upload):
+    files = [upload("a.txt"), upload("bad.txt"), upload("virus.exe"), upload("copy.txt", sha256="a.txt")]
+    handler = FakeHandler({files[1]["path"]: ValueError("corrupt")})
+    [batch], jobs = ingest(handler, files)
+
+    statuses = {entry["filename"]: entry["status"] for entry in batch["files"]}
+    assert statuses == {"a.txt": "queued", "bad.txt": "queued", "virus.exe": "skipped", "copy.txt": "duplicate"}
+    assert batch["counts"] == {"queued": 2, "skipped": 1, "duplicate": 1}
+    # The in-batch copy points at the job and document of its first occurrence
+    first, bad, _, copy = batch["files"]
+    assert (copy["job_id"], copy["document_id"]) == (first["job_id"], first["document_id"])
+    assert jobs[first["job_id"]]["status"] == "completed"
+    assert jobs[bad["job_id"]]["status"] == "failed" and "corrupt" in jobs[bad["job_id"]]["error"]
+    assert handler.doc_processor.calls == [files[0]["path"], files[1]["path"]]
+    # Queued files are removed by their jobs, the rest by the ingestor
+    assert not any(os.path.exists(file["path"]) for file in files)
+
+def test_already_stored_content_is_not_queued(upload):
+    handler = FakeHandler()
+    (first, second), _ = ingest(handler, [upload("a.txt")], [upload("again.txt", sha256="a.txt")])
+
+    assert second["files"][0]["status"] == "duplicate"
+    assert second["files"][0]["document_id"] == first["files"][0]["document_id"]
+    assert len(handler.doc_processor.calls) == 1
+
+def test_batch_larger_than_the_queue_is_accepted(upload):
+    handler = FakeHandler()
+    [batch], jobs = ingest(handler, [upload(f"{index}.txt") for index in range(9)], max_queue=2)
+
+    assert batch["counts"] == {"queued": 9}
+    assert [job["status"] for job in jobs.values()] == ["completed"] * 9
+    stored = handler.storage.collection.documents
+    assert {document["metadata"]["batch_id"] for document in stored.values()} == {batch["batch_id"]}
+
+def test_spilled_text_of_batch_files_is_embedded(upload, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs.settings, "INGESTION_EMBED_ENABLED", True)
+    monkeypatch.setattr(ingestion_jobs.settings, "LANGDETECT_PER_CHUNK", False)
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "spill"))
+    budget.spill("text.txt", "text spilled").write("tail text past the budget\n")
+    budget.close()
+    file = upload("big.txt")
+    handler = FakeHandler({file["path"]: ExtractionResult(file_type="txt", text="head", metadata={"partial": budget.report()})})
+    [batch], jobs = ingest(handler, [file])
+
+    assert jobs[batch["files"][0]["job_id"]]["status"] == "partial"
+    stored = handler.chat_service.retriever.stored
+    assert [item["content"] for item in stored] == ["head", "tail text past the budget\n"]
+    assert not (tmp_path / "spill").exists()
@@ -0,0 +1,59 @@
+# backend/tests/test_document_storage.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("motor")
+
+from api.services.document_storage import DocumentStorage
+from fakes import FakeDatabase
+
+@pytest.fixture
+def storage():
+    storage = DocumentStorage()
+    storage.db = FakeDatabase()
+    storage.collection = storage.db.documents
+    storage.chunks = storage.db.document_chunks
+    return storage
+
+def test_content_hash_index(storage):
+    asyncio.run(storage.ensure_indexes())
+    assert storage.collection.indexes == [[("metadata.content_hash", 1), ("metadata.status", 1)]]
+    assert storage.chunks.indexes == [[("document_id", 1), ("index", 1)]]
+
+def test_find_by_content_hash(storage):
+    async def scenario():
+        document = storage.build_document(
+            {"text": "x"}, "/tmp/a.txt", "txt", {"id": "doc-1", "content_hash": "abc", "status": "processed"}
+        )
+        await storage.save_documents([document])
+        return await storage.find_by_content_hash("abc"), await storage.find_by_content_hash("other")
+
+    found, missing = asyncio.run(scenario())
+    assert found["_id"] == "doc-1"
+    assert missing is None
+
+def test_find_by_content_hash_includes_partial_documents(storage):
+    async def scenario():
+        await storage.save_documents([
+            storage.build_document({"text": "x"}, "/tmp/a.xml", "xml", {"id": "doc-1", "content_hash": "abc", "status": "partial"}),
+            storage.build_document({"text": "y"}, "/tmp/b.xml", "xml", {"id": "doc-2", "content_hash": "def", "status": "failed"})
+        ])
+        return await storage.find_by_content_hash("abc"), await storage.find_by_content_hash("def")
+
+    partial, failed = asyncio.run(scenario())
+    assert partial["_id"] == "doc-1"
+    assert failed is None
+
+def test_delete_document_removes_its_chunks(storage):
+    async def scenario():
+        await storage.save_documents([storage.build_document({"text": "x"}, "/tmp/a.xml", "xml", {"id": "doc-1"})])
+        await storage.save_chunks("doc-1", ["one", "two"])
+        await storage.save_chunks("doc-1", ["three"], offset=2)
+        chunks = await storage.get_chunks("doc-1")
+        return chunks, await storage.delete_document("doc-1"), await storage.delete_document("doc-1")
+
+    chunks, deleted, deleted_again = asyncio.run(scenario())
+    assert chunks == ["one", "two", "three"]
+    assert deleted and not deleted_again
+    assert not storage.chunks.documents
@@ -0,0 +1,113 @@
+# backend/tests/test_docx_reader.py
+import zipfile
+
+from core.document_processor.docx_reader import DocxReader
+from core.document_processor.memory_budget import MemoryBudget
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W}">
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Chapter"><w:name w:val="Chapter"/><w:pPr><w:outlineLvl w:val="0"/></w:pPr></w:style>
+  <w:style w:type="paragraph" w:styleId="Quote"><w:name w:val="Quote"/><w:pPr><w:outlineLvl w:val="9"/></w:pPr></w:style>
+  <w:style w:type="character" w:styleId="Strong"><w:name w:val="Strong"/></w:style>
+</w:styles>"""
+
+CORE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"
+  xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/">
+  <dc:title>Lease</dc:title><dc:creator>Legal</dc:creator><cp:revision>3</cp:revision>
+  <dcterms:created>2024-05-01T10:00:00Z</dcterms:created>
+</cp:coreProperties>"""
+
+def paragraph(text: str, style: str = None, outline: int = None, runs: str = None) -> str:
+    properties = ""
+    if style or outline is not None:
+        properties = "<w:pPr>"
+        properties += f'<w:pStyle w:val="{style}"/>' if style else ""
+        properties += f'<w:outlineLvl w:val="{outline}"/>' if outline is not None else ""
+        properties += "</w:pPr>"
+    return f"<w:p>{properties}{runs or f'<w:r><w:t>{text}</w:t></w:r>'}</w:p>"
+
+def make_docx(path, *blocks: str) -> str:
+    with zipfile.ZipFile(path, "w") as package:
+        package.writestr("word/document.xml", f'<w:document xmlns:w="{W}"><w:body>{"".join(blocks)}</w:body></w:document>')
+        package.writestr("word/styles.xml", STYLES)
+        package.writestr("docProps/core.xml", CORE)
+    return str(path)
+
+TABLE = (
+    "<w:tbl>"
+    "<w:tr><w:tc><w:p><w:r><w:t>Party</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Role</w:t></w:r></w:p></w:tc></w:tr>"
+    "<w:tr><w:tc><w:tcPr><w:gridSpan w:val=\"2\"/></w:tcPr><w:p><w:r><w:t>Both</w:t></w:r></w:p>"
+    "<w:p><w:r><w:t>parties</w:t></w:r></w:p></w:tc></w:tr>"
+    "</w:tbl>"
+)
+
+def test_headings_sections_and_tables(tmp_path):
+    file_path = make_docx(
+        tmp_path / "lease.docx",
+        paragraph("Preamble"),
+        paragraph("Terms", "Heading1"),
+        paragraph("The tenant pays rent."),
+        TABLE,
+        paragraph("Deposit", "Heading2"),
+        paragraph("Two months.", "Quote"),
+        paragraph("Schedule", "Chapter"),
+        paragraph("Not a heading", "Heading1", outline=9)
+    )
+    result = DocxReader().read(file_path)
+
+    texts = [p["text"] for p in result["paragraphs"]]
+    assert result["text"] == "\n".join(texts)
+    assert [(h["text"], h["level"]) for h in result["headings"]] == [("Terms", 1), ("Deposit", 2), ("Schedule", 1)]
+    for heading in result["headings"]:
+        assert result["text"][heading["char_start"]:].startswith(heading["text"])
+
+    # Outline level 9 is body text, on the style or set directly on a paragraph
+    styles = {p["text"]: (p["style"], p.get("level")) for p in result["paragraphs"]}
+    assert styles["Two months."] == ("Quote", None)
+    assert styles["Not a heading"] == ("Heading 1", None)
+    assert styles["Preamble"] == ("Normal", None)
+
+    assert [(s["title"], s["level"]) for s in result["sections"]] == [(None, None), ("Terms", 1), ("Deposit", 2), ("Schedule", 1)]
+    for section in result["sections"]:
+        assert section["char_start"] <= section["char_end"] <= len(result["text"])
+
+    # Merged cells repeat per grid column; cell paragraphs are joined
+    assert result["tables"] == [[["Party", "Role"], ["Both\nparties", "Both\nparties"]]]
+    assert result["core_properties"]["title"] == "Lease" and result["core_properties"]["revision"] == 3
+    assert result["core_properties"]["created"].year == 2024
+
+def test_runs_only_when_asked(tmp_path):
+    runs = (
+        '<w:r><w:rPr><w:b/><w:rFonts w:ascii="Arial"/></w:rPr><w:t xml:space="preserve">Bold </w:t></w:r>'
+        '<w:r><w:rPr><w:i w:val="0"/><w:u w:val="single"/></w:rPr><w:t>plain</w:t><w:tab/></w:r>'
+    )
+    file_path = make_docx(tmp_path / "runs.docx", paragraph(None, runs=runs), TABLE)
+
+    [lean] = DocxReader(include_tables=False).read(file_path)["paragraphs"]
+    assert lean["text"] == "Bold plain\t" and "runs" not in lean
+    assert DocxReader(include_tables=False).read(file_path)["tables"] == []
+
+    [detailed] = DocxReader(include_runs=True).read(file_path)["paragraphs"]
+    assert detailed["runs"] == [
+        {"text": "Bold ", "bold": True, "italic": None, "underline": None, "font": "Arial"},
+        {"text": "plain\t", "bold": None, "italic": False, "underline": True, "font": None}
+    ]
+
+def test_paragraphs_past_the_budget_are_spilled(tmp_path):
+    file_path = make_docx(tmp_path / "long.docx", *(paragraph(f"Paragraph {index}") for index in range(50)), TABLE)
+    budget = MemoryBudget(limit_bytes=2_000, spill_dir=str(tmp_path / "spill"))
+    result = DocxReader(budget=budget).read(file_path)
+    budget.close()
+
+    kept = len(result["paragraphs"])
+    assert 0 < kept < 50
+    report = budget.report()
+    assert report is not None
+    with open(tmp_path / "spill" / "docx_text.txt") as spilled:
+        assert spilled.read().splitlines() == [f"Paragraph {index}" for index in range(kept, 50)]
@@ -0,0 +1,124 @@
+# backend/tests/test_executor.py
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.document_processor.executor import ExtractionError, ExtractionExecutor, ExtractionTimeout
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+def _fail() -> None:
+    raise ValueError("bad input")
+
+def _crash() -> None:
+    os._exit(3)
+
+def _pid() -> int:
+    return os.getpid()
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_timeout_only_fails_its_own_job():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=2, max_queue=0, timeout=30)
+        try:
+            slow = asyncio.create_task(executor.run(_sleep, 30, timeout=1))
+            quick = asyncio.create_task(executor.run(_sleep, 2))
+            with pytest.raises(ExtractionTimeout):
+                await slow
+            assert await quick == 2
+            return executor.get_metrics()
+        finally:
+            executor.shutdown(wait=False)
+
+    metrics = run(scenario())
+    assert metrics["timed_out"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["worker_restarts"] == 1
+
+def test_job_errors_keep_their_type_and_worker():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=1, max_queue=1, timeout=30)
+        try:
+            first = await executor.run(_pid)
+            with pytest.raises(ValueError, match="bad input"):
+                await executor.run(_fail)
+            assert await executor.run(_pid) == first
+        finally:
+            executor.shutdown(wait=False)
+
+    run(scenario())
+
+def test_crashed_worker_is_replaced():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=1, max_queue=1, timeout=30)
+        try:
+            with pytest.raises(ExtractionError, match="crashed"):
+                await executor.run(_crash)
+            assert await executor.run(_sleep, 0) == 0
+        finally:
+            executor.shutdown(wait=False)
+
+    run(scenario())
+
+def test_cancelled_jobs_are_counted_and_free_their_slot():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=1, max_queue=1, timeout=30)
+        try:
+            running = asyncio.create_task(executor.run(_sleep, 30))
+            queued = asyncio.create_task(executor.run(_sleep, 30))
+            await asyncio.sleep(1)
+            running.cancel()
+            queued.cancel()
+            await asyncio.gather(running, queued, return_exceptions=True)
+            assert await executor.run(_sleep, 0) == 0
+            return executor.get_metrics()
+        finally:
+            executor.shutdown(wait=False)
+
+    metrics = run(scenario())
+    assert metrics["cancelled"] == 2
+    assert (metrics["completed"], metrics["failed"], metrics["timed_out"]) == (1, 0, 0)
+    assert metrics["in_flight"] == metrics["queued"] == 0
+    # Only the running job had a worker to replace
+    assert metrics["worker_restarts"] == 1
+
+def test_queue_limit_rejects():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=1, max_queue=0, timeout=30)
+        try:
+            busy = asyncio.create_task(executor.run(_sleep, 1))
+            await asyncio.sleep(0)
+            with pytest.raises(ExtractionError, match="full"):
+                await executor.run(_sleep, 0)
+            await busy
+        finally:
+            executor.shutdown(wait=False)
+
+    run(scenario())
+
+def test_workers_report_their_model_status():
+    async def scenario():
+        executor = ExtractionExecutor(max_workers=2, max_queue=0, timeout=30, preload_models=False)
+        try:
+            executor.start()
+            assert len(executor._idle) == 2
+            await executor.run(_sleep, 0)
+            deadline = time.monotonic() + 30
+            while not all(w["models"] for w in executor.model_status()):
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.1)
+            return executor.model_status()
+        finally:
+            executor.shutdown(wait=False)
+
+    workers = run(scenario())
+    assert len(workers) == 2
+    for worker in workers:
+        assert worker["state"] == "idle"
+        assert worker["models"]["easyocr:en"]["state"] == "cold"
@@ -0,0 +1,75 @@
+# backend/tests/test_extraction_cache.py
+import os
+
+from core.document_processor import extraction_cache
+from core.document_processor.extraction_cache import ExtractionCache
+from core.document_processor.result import ExtractionResult
+
+KEY = ExtractionCache.key
+
+def test_key_is_stable_and_order_independent():
+    assert KEY("abc", "pdf", "text", {"a": 1, "b": 2}) == KEY("abc", "PDF", "text", {"b": 2, "a": 1})
+    assert KEY("abc", "pdf", "text") == KEY("abc", "pdf", "text", {})
+    # The content hash travels in the options too, but is already part of the key
+    assert KEY("abc", "pdf", "text", {"content_hash": "abc"}) == KEY("abc", "pdf", "text")
+
+def test_key_changes_with_every_input(monkeypatch):
+    base = KEY("abc", "pdf", "text", {"ocr_dpi": 300})
+    variants = {
+        KEY("abd", "pdf", "text", {"ocr_dpi": 300}),
+        KEY("abc", "png", "text", {"ocr_dpi": 300}),
+        KEY("abc", "pdf", "full", {"ocr_dpi": 300}),
+        KEY("abc", "pdf", "text", {"ocr_dpi": 200}),
+    }
+    monkeypatch.setattr(extraction_cache, "PROCESSOR_VERSION", "test")
+    variants.add(KEY("abc", "pdf", "text", {"ocr_dpi": 300}))
+    assert base not in variants and len(variants) == 5
+
+def test_round_trip_and_metrics(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=1 << 20)
+    key = KEY("abc", "txt", "text")
+    assert cache.get(key) is None
+
+    cache.put(key, ExtractionResult(file_type="txt", text="hello"))
+    assert cache.get(key).text == "hello"
+
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["writes"]) == (1, 1, 1)
+    assert metrics["hit_rate"] == 0.5
+    assert metrics["bytes"] > 0
+
+def test_unreadable_entries_are_dropped(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    key = KEY("abc", "txt", "text")
+    cache.put(key, ExtractionResult(file_type="txt", text="hello"))
+    path = cache._path(key)
+    with open(path, "wb") as file:
+        file.write(b"garbage")
+
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+    assert cache.get_metrics()["errors"] == 1
+
+def test_oldest_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=8_000)
+    keys = [KEY(str(index), "txt", "text") for index in range(10)]
+    for index, key in enumerate(keys):
+        cache.put(key, ExtractionResult(file_type="txt", text=os.urandom(1500).hex()))
+        # Distinct mtimes, oldest first
+        os.utime(cache._path(key), (index, index))
+
+    assert cache.get_metrics()["bytes"] <= 8_000
+    assert cache.get_metrics()["evictions"] > 0
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
+
+def test_remove_content_drops_every_entry_of_a_hash(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    kept, dropped = KEY("keep", "csv", "text"), [KEY("gone", "csv", "text"), KEY("gone", "csv", "full")]
+    for key in [kept, *dropped]:
+        cache.put(key, ExtractionResult(file_type="csv", text=key))
+
+    cache.remove_content("gone")
+    assert [cache.get(key) for key in dropped] == [None, None]
+    assert cache.get(kept).text == kept
+    assert cache.get_metrics()["bytes"] == os.path.getsize(cache._path(kept))
@@ -0,0 +1,406 @@
+# backend/tests/test_ingestion_jobs.py
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("motor")
+
+from api.services import ingestion_jobs
+from api.services.ingestion_jobs import IngestionQueue, IngestionQueueFull
+from core.document_processor.executor import ExtractionQueueFull
+from core.document_processor.memory_budget import MemoryBudget
+from core.document_processor.result import ExtractionResult
+from fakes import FakeHandler, FakeProcessor
+
+@pytest.fixture
+def upload(tmp_path):
+    def make(name: str = "doc.txt", text: str = "hello") -> str:
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+    return make
+
+async def wait_for_jobs(queue: IngestionQueue, job_ids, timeout: float = 5):
+    async def done():
+        while True:
+            jobs = [await queue.jobs.get(job_id) for job_id in job_ids]
+            if all(job["status"] not in ("queued", "running") for job in jobs):
+                return jobs
+            await asyncio.sleep(0.01)
+    return await asyncio.wait_for(done(), timeout)
+
+def test_chunks_are_tagged_with_their_language(upload, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs.settings, "INGESTION_EMBED_ENABLED", True)
+    monkeypatch.setattr(ingestion_jobs.settings, "LANGDETECT_PER_CHUNK", True)
+    monkeypatch.setattr(ingestion_jobs.settings, "CHUNK_SIZE", 200)
+    monkeypatch.setattr(ingestion_jobs.settings, "CHUNK_OVERLAP", 0)
+    english = "The quick brown fox jumps over the lazy dog while the farmer watches from the field. " * 2
+    french = "Le renard brun rapide saute par-dessus le chien paresseux pendant que le fermier regarde. " * 2
+    path = upload()
+    handler = FakeHandler({path: ExtractionResult(file_type="txt", text=f"{english}\n\n{french}")})
+
+    async def scenario():
+        queue = IngestionQueue(handler, workers=1, max_queue=4)
+        try:
+            job = await queue.submit(path, "txt", "doc.txt")
+            return await wait_for_jobs(queue, [job["_id"]])
+        finally:
+            await queue.stop()
+
+    [job] = asyncio.run(scenario())
+    assert job["status"] == "completed"
+    stored = handler.chat_service.retriever.stored
+    assert [item["language"] for item in stored] == ["en", "fr"]
+
+def test_spilled_text_is_embedded_after_the_extracted_chunks(upload, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs.settings, "INGESTION_EMBED_ENABLED", True)
+    monkeypatch.setattr(ingestion_jobs.settings, "LANGDETECT_PER_CHUNK", False)
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "spill"))
+    budget.spill("text.txt", "text spilled").write("tail text past the budget\n")
+    budget.close()
+    path = upload()
+    handler = FakeHandler({path: ExtractionResult(file_type="txt", text="head", metadata={"partial": budget.report()})})
+
+    async def scenario(queue):
+        job = await queue.submit(path, "txt", "doc.txt")
+        return await wait_for_jobs(queue, [job["_id"]])
+
+    [job] = run_queue(handler, scenario)
+    assert job["status"] == "partial"
+    stored = handler.chat_service.retriever.stored
+    assert [(item["chunk_id"], item["content"]) for item in stored] == [(0, "head"), (1, "tail text past the budget\n")]
+    assert asyncio.run(handler.storage.get_chunks(job["document_id"])) == ["tail text past the budget\n"]
+    assert not (tmp_path / "spill").exists()
+
+def test_spill_is_removed_when_the_job_fails(upload, tmp_path):
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "spill"))
+    budget.spill("text.txt", "text spilled").write("tail\n")
+    budget.close()
+    path = upload()
+    handler = FakeHandler({path: ExtractionResult(file_type="txt", text="head", metadata={"partial": budget.report()})})
+
+    async def failing_save(*args, **kwargs):
+        raise RuntimeError("mongo down")
+
+    handler.storage.save_documents = failing_save
+
+    async def scenario(queue):
+        job = await queue.submit(path, "txt", "doc.txt")
+        return await wait_for_jobs(queue, [job["_id"]])
+
+    [job] = run_queue(handler, scenario)
+    assert job["status"] == "failed"
+    assert not (tmp_path / "spill").exists()
+
+def run_queue(handler, scenario, workers: int = 1, max_queue: int = 4):
+    async def main():
+        queue = IngestionQueue(handler, workers=workers, max_queue=max_queue)
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(main())
+
+def test_job_runs_every_stage(upload):
+    path = upload()
+    handler = FakeHandler()
+
+    async def scenario(queue):
+        job = await queue.submit(path, "txt", "doc.txt", content_hash="abc")
+        return await wait_for_jobs(queue, [job["_id"]])
+
+    [job] = run_queue(handler, scenario)
+    assert job["status"] == "completed"
+    assert {name: stage["status"] for name, stage in job["stages"].items()} == {
+        "extract": "completed", "chunk": "completed", "embed": "skipped", "store": "completed"
+    }
+    stored = handler.storage.collection.documents[job["document_id"]]
+    assert stored["metadata"]["content_hash"] == "abc"
+    assert stored["metadata"]["chunk_count"] == 1
+    assert not os.path.exists(path)
+
+def test_duplicate_content_is_not_processed_again(upload):
+    handler = FakeHandler()
+
+    async def scenario(queue):
+        first = await queue.submit(upload("a.txt"), "txt", "a.txt", content_hash="same")
+        await wait_for_jobs(queue, [first["_id"]])
+        second = await queue.submit(upload("b.txt"), "txt", "b.txt", content_hash="same")
+        return first, (await wait_for_jobs(queue, [second["_id"]]))[0]
+
+    first, second = run_queue(handler, scenario)
+    assert second["duplicate"] and second["document_id"] == first["document_id"]
+    assert len(handler.doc_processor.calls) == 1
+
+def test_failed_extraction_marks_the_job(upload):
+    path = upload()
+    handler = FakeHandler({path: ValueError("unreadable")})
+
+    async def scenario(queue):
+        job = await queue.submit(path, "txt", "doc.txt")
+        return await wait_for_jobs(queue, [job["_id"]])
+
+    [job] = run_queue(handler, scenario)
+    assert job["status"] == "failed" and "unreadable" in job["error"]
+    assert job["stages"]["extract"]["status"] == "failed"
+    assert job["stages"]["store"]["status"] == "pending"
+
+class GatedProcessor(FakeProcessor):
+    """Holds every extraction until the gate opens"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def process_result(self, *args, **kwargs):
+        await self.gate.wait()
+        return await super().process_result(*args, **kwargs)
+
+def test_concurrent_submits_never_overfill_the_queue(upload):
+    handler = FakeHandler()
+    handler.doc_processor = GatedProcessor()
+    create = ingestion_jobs.JobStore.create
+
+    async def slow_create(self, *args, **kwargs):
+        await asyncio.sleep(0.01)
+        return await create(self, *args, **kwargs)
+
+    async def scenario(queue):
+        queue.jobs.create = slow_create.__get__(queue.jobs)
+        outcomes = await asyncio.gather(
+            *(queue.submit(upload(f"{index}.txt"), "txt", f"{index}.txt") for index in range(10)),
+            return_exceptions=True
+        )
+        waiting = sum(len(jobs) for jobs in queue._pending.values())
+        handler.doc_processor.gate.set()
+        accepted = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+        await wait_for_jobs(queue, [job["_id"] for job in accepted])
+        return outcomes, accepted, waiting
+
+    outcomes, accepted, waiting = run_queue(handler, scenario, workers=1, max_queue=3)
+    assert waiting <= 3
+    assert all(isinstance(outcome, (dict, IngestionQueueFull)) for outcome in outcomes)
+    assert 3 <= len(accepted) <= 4
+    # No job is persisted without being queued
+    assert len(handler.storage.db.ingestion_jobs.documents) == len(accepted)
+
+def test_recovery_feeds_more_jobs_than_the_queue_holds(upload):
+    handler = FakeHandler()
+
+    async def scenario(queue):
+        store = ingestion_jobs.JobStore(handler.storage)
+        jobs = [await store.create(upload(f"{index}.txt"), "txt", f"{index}.txt", None) for index in range(7)]
+        await store.update(jobs[0]["_id"], {"status": "running", "attempts": 1})
+        # The previous process shut down cleanly and gave up its leases
+        await store.release()
+        recovered = await queue.recover()
+        return recovered, await wait_for_jobs(queue, [job["_id"] for job in jobs])
+
+    recovered, jobs = run_queue(handler, scenario, workers=1, max_queue=2)
+    assert recovered == 7
+    assert [job["status"] for job in jobs] == ["completed"] * 7
+    assert jobs[0]["attempts"] == 2
+
+def test_recovery_gives_up_on_missing_files_and_retried_jobs(upload):
+    handler = FakeHandler()
+
+    async def scenario(queue):
+        store = ingestion_jobs.JobStore(handler.storage)
+        missing = await store.create("/nonexistent/file.txt", "txt", "file.txt", None)
+        retried = await store.create(upload(), "txt", "doc.txt", None)
+        await store.update(retried["_id"], {"attempts": ingestion_jobs.settings.INGESTION_MAX_ATTEMPTS})
+        await store.release()
+        recovered = await queue.recover()
+        return recovered, await store.get(missing["_id"]), await store.get(retried["_id"])
+
+    recovered, missing, retried = run_queue(handler, scenario)
+    assert recovered == 0
+    assert missing["status"] == retried["status"] == "failed"
+
+def test_only_jobs_with_an_expired_lease_are_recovered(upload):
+    handler = FakeHandler()
+
+    async def scenario(queue):
+        crashed, alive = ingestion_jobs.JobStore(handler.storage), ingestion_jobs.JobStore(handler.storage)
+        stale = await crashed.create(upload("stale.txt"), "txt", "stale.txt", None)
+        await crashed.update(stale["_id"], {"status": "running", "lease_until": datetime.utcnow() - timedelta(seconds=1)})
+        held = await alive.create(upload("held.txt"), "txt", "held.txt", None)
+        await alive.update(held["_id"], {"status": "running"})
+        recovered = await queue.recover()
+        return recovered, await wait_for_jobs(queue, [stale["_id"]]), await alive.get(held["_id"])
+
+    recovered, [stale], held = run_queue(handler, scenario)
+    assert recovered == 1
+    assert stale["status"] == "completed" and stale["owner"] != held["owner"]
+    assert held["status"] == "running" and handler.doc_processor.calls == [stale["file_path"]]
+
+def test_concurrent_recoveries_claim_each_job_once(upload):
+    handler = FakeHandler()
+    paths = [upload(f"{index}.txt") for index in range(6)]
+
+    async def scenario():
+        store = ingestion_jobs.JobStore(handler.storage)
+        jobs = [await store.create(path, "txt", os.path.basename(path), None) for path in paths]
+        await store.release()
+        queues = [IngestionQueue(handler, workers=1), IngestionQueue(handler, workers=1)]
+        try:
+            recovered = await asyncio.gather(*(queue.recover() for queue in queues))
+            await wait_for_jobs(queues[0], [job["_id"] for job in jobs])
+        finally:
+            for queue in queues:
+                await queue.stop()
+        return recovered
+
+    recovered = asyncio.run(scenario())
+    assert sum(recovered) == 6
+    assert sorted(handler.doc_processor.calls) == sorted(paths)
+
+def test_renewed_and_released_leases(upload):
+    handler = FakeHandler()
+
+    async def scenario():
+        store = ingestion_jobs.JobStore(handler.storage)
+        job = await store.create(upload(), "txt", "doc.txt", None)
+        await store.update(job["_id"], {"lease_until": datetime.utcnow() - timedelta(seconds=1)})
+        expired = [found["_id"] for found in await store.find_recoverable()]
+        await store.renew()
+        renewed = await store.find_recoverable()
+        await store.release()
+        return expired, renewed, [found["_id"] for found in await store.find_recoverable()]
+
+    expired, renewed, released = asyncio.run(scenario())
+    assert len(expired) == 1 and renewed == [] and released == expired
+
+def test_work_groups():
+    assert [ingestion_jobs.work_group(t) for t in ("PDF", "png", "xlsx", "csv", "docx", "txt")] == [
+        "ocr", "ocr", "tabular", "tabular", "text", "text"
+    ]
+
+class TrackingProcessor(FakeProcessor):
+    """Records the most extractions of each group running at once"""
+
+    def __init__(self):
+        super().__init__()
+        self.running = {}
+        self.peak = {}
+
+    async def process_result(self, file_path, file_type, *args, **kwargs):
+        group = ingestion_jobs.work_group(file_type)
+        self.running[group] = self.running.get(group, 0) + 1
+        self.peak[group] = max(self.peak.get(group, 0), self.running[group])
+        await asyncio.sleep(0.01)
+        self.running[group] -= 1
+        return await super().process_result(file_path, file_type, *args, **kwargs)
+
+def test_group_limits(upload):
+    handler = FakeHandler()
+    handler.doc_processor = TrackingProcessor()
+
+    async def main():
+        queue = IngestionQueue(handler, workers=4, max_queue=4, group_limits={"ocr": 1, "tabular": 2, "text": 4})
+        try:
+            jobs = [
+                await queue.defer(upload(f"{index}.{file_type}"), file_type, f"{index}.{file_type}")
+                for index in range(6) for file_type in ("pdf", "csv", "txt")
+            ]
+            return await wait_for_jobs(queue, [job["_id"] for job in jobs])
+        finally:
+            await queue.stop()
+
+    jobs = asyncio.run(main())
+    assert [job["status"] for job in jobs] == ["completed"] * 18
+    assert handler.doc_processor.peak["ocr"] == 1
+    assert handler.doc_processor.peak["tabular"] <= 2
+    assert sum(handler.doc_processor.peak.values()) >= 3
+
+def test_saturated_pool_is_retried(upload, monkeypatch):
+    handler = FakeHandler()
+    attempts = []
+    process_result = handler.doc_processor.process_result
+    sleep = asyncio.sleep
+
+    async def flaky(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ExtractionQueueFull("busy")
+        return await process_result(*args, **kwargs)
+
+    async def no_backoff(seconds):
+        await sleep(0)
+
+    handler.doc_processor.process_result = flaky
+    monkeypatch.setattr(ingestion_jobs.asyncio, "sleep", no_backoff)
+
+    async def scenario(queue):
+        job = await queue.submit(upload(), "txt", "doc.txt")
+        return await wait_for_jobs(queue, [job["_id"]])
+
+    [job] = run_queue(handler, scenario)
+    assert job["status"] == "completed"
+    assert len(attempts) == 3
+
+def test_a_saturated_group_does_not_hold_back_others(upload):
+    handler = FakeHandler()
+    csv = upload("data.csv")
+
+    async def main():
+        queue = IngestionQueue(handler, workers=1, max_queue=4, group_limits={"ocr": 1, "tabular": 1, "text": 1})
+        try:
+            jobs = [await queue.defer(upload(f"{index}.pdf"), "pdf", f"{index}.pdf") for index in range(20)]
+            jobs.append(await queue.defer(csv, "csv", "data.csv"))
+            return await wait_for_jobs(queue, [job["_id"] for job in jobs])
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+    # The CSV queued behind 20 PDFs runs second, not last
+    assert handler.doc_processor.calls.index(csv) <= 2
+
+def test_batch_documents_are_inserted_together(upload):
+    handler = FakeHandler()
+    inserts = []
+    save_documents = handler.storage.save_documents
+
+    async def counting_save(documents):
+        inserts.append(len(documents))
+        await save_documents(documents)
+
+    handler.storage.save_documents = counting_save
+
+    async def main():
+        queue = IngestionQueue(handler, workers=2, max_queue=4)
+        queue.inserts = ingestion_jobs.DocumentInserter(handler.storage, size=3, max_wait=0.05)
+        try:
+            jobs = [
+                await queue.defer(upload(f"{index}.txt"), "txt", f"{index}.txt", metadata={"source": "batch"})
+                for index in range(7)
+            ]
+            return await wait_for_jobs(queue, [job["_id"] for job in jobs])
+        finally:
+            await queue.stop()
+
+    jobs = asyncio.run(main())
+    assert [job["status"] for job in jobs] == ["completed"] * 7
+    assert sum(inserts) == 7 and max(inserts) == 3 and len(inserts) < 7
+
+def test_failed_bulk_insert_only_fails_the_named_documents():
+    handler = FakeHandler()
+
+    async def failing_save(documents):
+        error = Exception("duplicate key")
+        error.details = {"writeErrors": [{"op": {"_id": documents[0]["_id"]}}]}
+        raise error
+
+    handler.storage.save_documents = failing_save
+    inserter = ingestion_jobs.DocumentInserter(handler.storage, size=2, max_wait=1)
+
+    async def main():
+        return await asyncio.gather(
+            inserter.save({"_id": "a"}), inserter.save({"_id": "b"}), return_exceptions=True
+        )
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, Exception) and "duplicate key" in str(first)
+    assert second is None
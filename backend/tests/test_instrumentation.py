@@ -0,0 +1,78 @@
+# backend/tests/test_instrumentation.py
+import asyncio
+import re
+import time
+
+from core.document_processor.instrumentation import Histogram, StageMetrics, recording, stage
+
+def test_stages_in_threads_land_in_the_task_recorder():
+    def parse_in_thread():
+        with stage("parse", bytes_read=100, pages=2) as stats:
+            time.sleep(0.02)
+            stats.add(rows=5)
+
+    async def extract(name: str):
+        with recording() as recorder:
+            with stage("total_io"):
+                await asyncio.to_thread(parse_in_thread)
+                await asyncio.to_thread(parse_in_thread)
+            await asyncio.sleep(0.01)
+            return name, recorder.to_dict()
+
+    async def scenario():
+        # Two extractions at once each keep their own recorder
+        return dict(await asyncio.gather(extract("a"), extract("b")))
+
+    timings = asyncio.run(scenario())
+    for name in ("a", "b"):
+        stages = timings[name]["stages"]
+        assert set(stages) == {"total_io", "parse"}
+        parse = stages["parse"]
+        assert (parse["calls"], parse["bytes_read"], parse["pages"], parse["rows"]) == (2, 200, 4, 10)
+        assert parse["wall_seconds"] >= 0.04
+        assert stages["total_io"]["wall_seconds"] >= parse["wall_seconds"]
+        assert parse["peak_rss_bytes"] > 0
+        assert timings[name]["total"]["wall_seconds"] >= stages["total_io"]["wall_seconds"]
+
+def test_stages_outside_a_recording_are_ignored():
+    with stage("parse", rows=3) as stats:
+        stats.add(rows=2)
+    with recording() as recorder:
+        pass
+    with stage("parse", rows=3):
+        pass
+    assert recorder.to_dict()["stages"] == {}
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.to_dict() == {"buckets": {"0.1": 2, "1.0": 3, "+Inf": 4}, "sum": 3.65, "count": 4}
+
+def test_prometheus_output():
+    metrics = StageMetrics()
+    timings = {
+        "stages": {"parse": {"wall_seconds": 0.2, "cpu_seconds": 0.15}},
+        "total": {"wall_seconds": 0.3, "cpu_seconds": 0.2, "peak_rss_bytes": 1_000}
+    }
+    metrics.observe("PDF", timings)
+    metrics.observe("pdf", {**timings, "total": {**timings["total"], "peak_rss_bytes": 5_000}})
+    metrics.observe("csv", None)
+
+    text = metrics.prometheus()
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE document_extraction_stage_wall_seconds histogram" in lines
+    assert "# TYPE document_extraction_stage_cpu_seconds histogram" in lines
+    assert 'document_extraction_stage_wall_seconds_bucket{file_type="pdf",stage="parse",le="0.1"} 0' in lines
+    assert 'document_extraction_stage_wall_seconds_bucket{file_type="pdf",stage="parse",le="0.25"} 2' in lines
+    assert 'document_extraction_stage_wall_seconds_bucket{file_type="pdf",stage="total",le="+Inf"} 2' in lines
+    assert 'document_extraction_stage_wall_seconds_count{file_type="pdf",stage="parse"} 2' in lines
+    assert 'document_extraction_peak_rss_bytes{file_type="pdf"} 5000' in lines
+    # Every sample line is "name{labels} value"
+    sample = re.compile(r'^[a-z_]+\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\} [0-9.e+-]+$')
+    assert all(sample.match(line) for line in lines if not line.startswith("#"))
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {"pdf"}
+    assert snapshot["pdf"]["stages"]["parse"]["cpu_seconds"]["count"] == 2
@@ -0,0 +1,123 @@
+# backend/tests/test_json_profile.py
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("ijson")
+
+from core.document_processor.json_profile import JSONProfiler, ReservoirSample, SchemaInference
+from core.document_processor.memory_budget import MemoryBudget
+
+def write_json(tmp_path, value) -> str:
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(value))
+    return str(path)
+
+def test_top_level_array(tmp_path):
+    records = [{"id": index, "name": f"n{index}", "tags": ["a"]} for index in range(50)]
+    profile = JSONProfiler(sample_size=100, preview_records=3).profile(write_json(tmp_path, records))
+
+    assert profile["records_path"] == "item"
+    assert profile["record_count"] == 50
+    assert profile["record_count_exact"] and not profile["truncated"]
+    assert len(profile["preview"]) == 3
+    assert profile["schema"]["id"]["type"] == "integer"
+    assert profile["schema"]["tags[]"]["type"] == "string"
+
+def test_records_under_top_level_object(tmp_path):
+    data = {"meta": {"version": 1}, "rows": [{"a": 1}, {"a": 2, "b": None}]}
+    profile = JSONProfiler().profile(write_json(tmp_path, data))
+
+    assert profile["records_path"] == "rows.item"
+    assert profile["record_count"] == 2
+    assert profile["schema"]["b"]["optional"]
+    assert not profile["schema"]["a"]["optional"]
+
+def test_single_object_is_one_record(tmp_path):
+    profile = JSONProfiler().profile(write_json(tmp_path, {"a": {"b": "c"}}))
+    assert profile["records_path"] is None
+    assert profile["record_count"] == 1
+    assert profile["schema"]["a.b"]["type"] == "string"
+
+@pytest.mark.parametrize("count_mode, exact", [("scan", True), ("estimate", False)])
+def test_record_budget(tmp_path, count_mode, exact):
+    path = write_json(tmp_path, [{"id": index, "pad": "x" * 200} for index in range(4000)])
+    profile = JSONProfiler(max_records=1000, count_mode=count_mode).profile(path)
+
+    assert profile["truncated"]
+    assert profile["record_count_exact"] is exact
+    if exact:
+        assert profile["record_count"] == 4000
+    else:
+        # Extrapolated from the read position, which runs ahead of the parser
+        assert 1000 < profile["record_count"] <= 4000
+
+def test_reservoir_is_bounded_and_seeded():
+    first, second = ReservoirSample(10, seed=1), ReservoirSample(10, seed=1)
+    for item in range(1000):
+        first.add(item)
+        second.add(item)
+    assert len(first.items) == 10 and first.seen == 1000
+    assert first.items == second.items
+
+def test_schema_mixed_types():
+    schema = SchemaInference()
+    for value in (1, 2, "three"):
+        schema.add({"v": value})
+    field = schema.to_dict()["v"]
+    assert field["types"] == {"integer": 2, "string": 1}
+    assert field["type"] == "integer"
+
+def test_budget_on_a_file_read_in_one_buffer_counts_exactly(tmp_path):
+    path = write_json(tmp_path, [{"id": index} for index in range(300)])
+    profile = JSONProfiler(max_records=100, count_mode="estimate").profile(path)
+    assert profile["truncated"]
+    assert profile["record_count"] == 300
+    assert profile["record_count_exact"]
+
+def test_object_keyed_by_id_streams_its_values(tmp_path):
+    data = {f"user-{index}": {"id": index, "name": "x" * 100} for index in range(5000)}
+    path = write_json(tmp_path, data)
+    profile = JSONProfiler(max_bytes=64 * 1024, preview_records=5, preview_chars=300).profile(path)
+
+    assert profile["keyed_records"] and profile["records_path"] is None
+    assert profile["truncated"]
+    assert profile["bytes_scanned"] < 256 * 1024
+    assert 0 < profile["record_count"] <= 5000
+    assert profile["schema"]["id"]["type"] == "integer"
+    assert sum(len(str(record)) for record in profile["preview"]) <= 300
+
+    counted = JSONProfiler(max_bytes=64 * 1024, count_mode="scan").profile(path)
+    assert counted["record_count"] == 5000 and counted["record_count_exact"]
+
+def test_oversized_single_document_stops_at_the_byte_budget(tmp_path):
+    data = {"version": 1, "payload": {"rows": [{"v": index} for index in range(50000)]}}
+    profile = JSONProfiler(max_bytes=64 * 1024, preview_chars=1000).profile(write_json(tmp_path, data))
+
+    assert not profile["keyed_records"]
+    assert profile["truncated"] and profile["record_count"] == 1
+    assert profile["bytes_scanned"] < len(json.dumps(data))
+    assert profile["schema"]["payload.rows[]"]["type"] == "object"
+    assert len(profile["preview"][0]) <= 1000
+
+def test_preview_and_sample_stay_within_the_memory_budget(tmp_path):
+    records = [{"id": index, "name": "x" * 100} for index in range(100)]
+    budget = MemoryBudget(limit_bytes=2000, spill_dir=str(tmp_path / "spill"))
+    overflow = budget.spill("json_preview.txt", "JSON spilled")
+    profile = JSONProfiler(preview_records=10, budget=budget, overflow=overflow).profile(write_json(tmp_path, records))
+    overflow.close()
+
+    kept = len(profile["preview"])
+    assert 0 < kept < 10 and profile["preview_spilled"] == 10 - kept
+    spilled = (tmp_path / "spill" / "json_preview.txt").read_text().splitlines()
+    assert [json.loads(line)["id"] for line in spilled] == list(range(kept, 10))
+    assert profile["sample_refused"] > 0 and profile["record_count"] == 100
+    assert budget.used_bytes <= 2000
+
+def test_reservoir_releases_replaced_items():
+    budget = MemoryBudget(limit_bytes=0)
+    reservoir = ReservoirSample(2, seed=1, budget=budget)
+    for index in range(50):
+        reservoir.add(f"{index:03d}" * 30)
+    assert budget.used_bytes == sum(sys.getsizeof(item) for item in reservoir.items)
@@ -0,0 +1,45 @@
+# backend/tests/test_language.py
+import pytest
+
+pytest.importorskip("langdetect")
+
+from core.document_processor.language import LanguageDetector
+from core.document_processor.model_registry import model_registry
+
+ENGLISH = "The tenant agrees to pay the monthly rent on the first day of each month without delay. "
+FRENCH = "Le locataire accepte de payer le loyer mensuel le premier jour de chaque mois sans retard. "
+GERMAN = "Der Mieter verpflichtet sich, die monatliche Miete am ersten Tag jedes Monats zu zahlen. "
+
+def test_windows_are_bounded_and_start_on_words():
+    detector = LanguageDetector(samples=5, sample_chars=200, seed=0)
+    text = " ".join(f"word{index}" for index in range(5_000))
+
+    windows = detector._windows(text)
+    starts = [text.index(window) for window in windows]
+    assert len(windows) == 5 and starts[0] == 0
+    assert all(0 < len(window) <= 200 for window in windows)
+    # Spread over the whole text, each later window starting on a word
+    assert starts == sorted(starts) and starts[-1] > len(text) - 250
+    assert all(text[start - 1] == " " for start in starts[1:])
+
+    # Short texts are read whole; medium ones in as many windows as they fill
+    assert detector._windows("short text") == ["short text"]
+    assert len(detector._windows(ENGLISH * 8)) == -(-len(ENGLISH * 8) // 200)
+
+def test_detection_is_deterministic_across_reloads():
+    text = (ENGLISH * 30) + (FRENCH * 12)
+    detector = LanguageDetector(samples=8, sample_chars=300, seed=0)
+    first = detector.detect(text)
+
+    # A fresh factory with the same seed gives the same distribution
+    model_registry.unload("langdetect:seed=0")
+    assert LanguageDetector(samples=8, sample_chars=300, seed=0).detect(text) == first
+    assert first["language"] == "en" and "fr" in first["distribution"]
+    assert first["samples"] == 8
+    assert sum(first["distribution"].values()) == pytest.approx(1.0, abs=0.01)
+
+def test_detect_chunks():
+    detector = LanguageDetector(sample_chars=300, seed=0)
+    chunks = [ENGLISH * 3, FRENCH * 3, GERMAN * 3, "1234 5678 !!!", "   "]
+    assert detector.detect_chunks(chunks) == ["en", "fr", "de", "unknown", "unknown"]
+    assert detector.detect("   ") == {"language": "unknown", "distribution": {}, "samples": 1}
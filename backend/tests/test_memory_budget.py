@@ -0,0 +1,93 @@
+# backend/tests/test_memory_budget.py
+import json
+import os
+import time
+
+from core.document_processor import memory_budget
+from core.document_processor.memory_budget import (
+    MemoryBudget,
+    budgeting,
+    current_budget,
+    read_spill,
+    remove_spill,
+    size_of,
+    sweep_spill_dir
+)
+
+def test_size_of_counts_container_contents():
+    text = "x" * 1000
+    assert size_of(text) > 1000
+    assert size_of([text, text]) > 2 * size_of(text)
+    assert size_of({"a": text}) > size_of(text)
+
+def test_reserve_stops_at_the_limit(tmp_path):
+    budget = MemoryBudget(limit_bytes=100, spill_dir=str(tmp_path))
+    assert budget.reserve(60)
+    assert not budget.reserve(60)
+    assert budget.used_bytes == 60 and budget.remaining == 40
+
+def test_zero_limit_is_unlimited(tmp_path):
+    budget = MemoryBudget(limit_bytes=0, spill_dir=str(tmp_path))
+    assert budget.reserve(10 ** 12)
+    assert budget.remaining is None
+
+def test_report_lists_only_written_spills(tmp_path):
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "job"))
+    assert budget.report() is None
+
+    budget.spill("unused.txt", "never written")
+    spill = budget.spill("text.txt", "text spilled")
+    spill.write("héllo\n")
+    budget.close()
+
+    report = budget.report()
+    assert report["spill_dir"] == str(tmp_path / "job")
+    assert report["reasons"] == ["text spilled"]
+    assert report["spill_files"] == [{"name": "text.txt", "path": spill.path, "bytes": len("héllo\n".encode("utf-8"))}]
+
+def test_budgeting_sets_the_current_budget():
+    outside = current_budget()
+    assert outside.limit_bytes == 0
+
+    with budgeting(limit_bytes=123) as budget:
+        assert current_budget() is budget
+        assert budget.limit_bytes == 123
+    assert current_budget() is not budget
+
+def spilled(tmp_path, files):
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "job"))
+    for name, text in files:
+        budget.spill(name, name).write(text)
+    budget.close()
+    return budget.report()
+
+def test_read_spill_streams_text_and_tables(tmp_path):
+    table = [["a", "b"], ["1", 2]]
+    partial = spilled(tmp_path, [("text.txt", "abcdefghij"), ("docx_tables.jsonl", json.dumps(table) + "\n")])
+
+    windows = list(read_spill(partial, window_chars=4))
+    assert windows == ["abcd", "efgh", "ij", "a\tb\n1\t2\n\n"]
+
+def test_remove_spill_deletes_the_spill_dir(tmp_path):
+    partial = spilled(tmp_path, [("text.txt", "abc")])
+    remove_spill(partial)
+    assert not os.path.exists(partial["spill_dir"])
+    # Already removed, or nothing spilled: both fine
+    remove_spill(partial)
+    remove_spill(None)
+    assert list(read_spill(partial)) == []
+
+def test_sweep_removes_only_expired_spill_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_budget.settings, "SPILL_DIR", str(tmp_path))
+    old, new = tmp_path / "old", tmp_path / "new"
+    old.mkdir()
+    new.mkdir()
+    hour_ago = time.time() - 3600
+    os.utime(old, (hour_ago, hour_ago))
+
+    assert sweep_spill_dir(ttl_seconds=60) == 1
+    assert not old.exists() and new.exists()
+
+def test_sweep_without_spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_budget.settings, "SPILL_DIR", str(tmp_path / "missing"))
+    assert sweep_spill_dir() == 0
@@ -0,0 +1,52 @@
+# backend/tests/test_nlp.py
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from core.document_processor import nlp as nlp_module
+from core.document_processor.nlp import TextAnalyzer, iter_text_chunks
+
+PARAGRAPHS = [
+    f"Acme Corp signed lease {index} with Globex in Berlin. The deposit is due in Paris next month."
+    for index in range(40)
+]
+TEXT = "\n\n".join(PARAGRAPHS)
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Blank English pipeline; an entity ruler stands in for a trained NER"""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "ORG", "pattern": [{"LOWER": "acme"}, {"LOWER": "corp"}]},
+        {"label": "ORG", "pattern": "Globex"},
+        {"label": "GPE", "pattern": "Berlin"},
+        {"label": "GPE", "pattern": "Paris"}
+    ])
+    monkeypatch.setattr(nlp_module, "get_spacy_pipeline", lambda model_name, components: nlp)
+    return nlp
+
+def test_chunks_cover_the_text_in_order():
+    chunks = list(iter_text_chunks(TEXT, 500))
+    assert len(chunks) > 1 and all(len(chunk) <= 500 for chunk, _ in chunks)
+    assert "".join(chunk for chunk, _ in chunks) == TEXT
+    assert all(TEXT[offset:offset + len(chunk)] == chunk for chunk, offset in chunks)
+
+def test_chunked_analysis_matches_one_doc(pipeline):
+    whole = pipeline(TEXT)
+    expected = [
+        {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+        for ent in whole.ents
+    ]
+
+    result = TextAnalyzer(chunk_size=500, batch_size=4).analyze(TEXT)
+    assert result["entities"] == expected
+    assert all(TEXT[ent["start"]:ent["end"]] == ent["text"] for ent in result["entities"])
+    assert result["sentences"] == sum(1 for _ in whole.sents)
+    assert result["words"] == sum(1 for token in whole if not token.is_punct and not token.is_space)
+
+def test_only_requested_analyses(pipeline):
+    assert set(TextAnalyzer(chunk_size=500).analyze(TEXT, ["entities"])) == {"words", "entities"}
+    assert TextAnalyzer().analyze(TEXT, []) == {}
+    assert TextAnalyzer().analyze("   ") == {}
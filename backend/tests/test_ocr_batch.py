@@ -0,0 +1,97 @@
+# backend/tests/test_ocr_batch.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytesseract")
+
+from core.document_processor import executor, ocr
+from core.document_processor.ocr import OCRBatchQueue
+
+@pytest.fixture
+def batches(monkeypatch):
+    calls = []
+
+    def fake_ocr_prepared(prepared, reader=None, mode=None):
+        calls.append((len(prepared), mode))
+        return [[{"text": item["name"], "mode": mode}] for item in prepared]
+
+    monkeypatch.setattr(ocr, "ocr_prepared", fake_ocr_prepared)
+    return calls
+
+def test_concurrent_images_share_a_batch(batches):
+    async def scenario():
+        queue = OCRBatchQueue(batch_size=8, max_wait=0.05)
+        return await asyncio.gather(*(queue.ocr({"name": str(index)}) for index in range(3)))
+
+    results = asyncio.run(scenario())
+    assert [blocks[0]["text"] for blocks in results] == ["0", "1", "2"]
+    assert batches == [(3, None)]
+
+def test_full_batch_flushes_without_waiting(batches):
+    async def scenario():
+        queue = OCRBatchQueue(batch_size=2, max_wait=60)
+        return await asyncio.wait_for(
+            asyncio.gather(queue.ocr({"name": "a"}), queue.ocr({"name": "b"})), timeout=5
+        )
+
+    asyncio.run(scenario())
+    assert batches == [(2, None)]
+
+def test_modes_are_batched_separately(batches):
+    async def scenario():
+        queue = OCRBatchQueue(batch_size=8, max_wait=0.01)
+        return await asyncio.gather(queue.ocr({"name": "a"}, "tesseract"), queue.ocr({"name": "b"}, "easyocr"))
+
+    results = asyncio.run(scenario())
+    assert [blocks[0]["mode"] for blocks in results] == ["tesseract", "easyocr"]
+    assert sorted(batches) == [(1, "easyocr"), (1, "tesseract")]
+
+def test_pool_workers_do_not_wait(batches, monkeypatch):
+    monkeypatch.setattr(executor, "_in_worker", True)
+    queue = OCRBatchQueue(batch_size=8)
+    assert queue.max_wait == 0
+
+    async def scenario():
+        return await asyncio.wait_for(queue.ocr({"name": "a"}), timeout=5)
+
+    assert asyncio.run(scenario())[0]["text"] == "a"
+    assert batches == [(1, None)]
+
+def test_batches_run_on_the_executor(batches):
+    class FakeExecutor:
+        def __init__(self):
+            self.jobs = []
+
+        async def run(self, fn, *args, timeout=None):
+            self.jobs.append(len(args[0]))
+            return fn(*args)
+
+    fake = FakeExecutor()
+
+    async def scenario():
+        queue = OCRBatchQueue(batch_size=8, max_wait=0.05, executor=fake)
+        return await asyncio.gather(*(queue.ocr({"name": str(index)}) for index in range(3)))
+
+    results = asyncio.run(scenario())
+    assert [blocks[0]["text"] for blocks in results] == ["0", "1", "2"]
+    assert fake.jobs == [3]
+
+def test_cancelled_batch_cancels_its_callers(batches):
+    class StuckExecutor:
+        async def run(self, fn, *args, timeout=None):
+            await asyncio.Event().wait()
+
+    async def scenario():
+        queue = OCRBatchQueue(batch_size=2, max_wait=60, executor=StuckExecutor())
+        callers = [asyncio.ensure_future(queue.ocr({"name": name})) for name in "ab"]
+        await asyncio.sleep(0.01)
+        # The running batch is held by the queue until it finishes
+        [task] = queue._tasks
+        task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=5)
+        return results, queue._tasks
+
+    results, tasks = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert not tasks
@@ -0,0 +1,45 @@
+# backend/tests/test_ocr_cache.py
+import os
+
+import pytest
+
+pytest.importorskip("pytesseract")
+
+from core.document_processor import ocr
+from core.document_processor.ocr import OCRPageCache, get_ocr_page_cache
+
+def _entries(path) -> int:
+    return len([name for name in os.listdir(path) if name.endswith(".json")])
+
+def test_round_trip(tmp_path):
+    cache = OCRPageCache(str(tmp_path), max_entries=10)
+    assert cache.get("missing") is None
+    cache.set("page", {"text": "hello"})
+    assert cache.get("page") == {"text": "hello"}
+
+def test_max_entries_is_enforced(tmp_path):
+    cache = OCRPageCache(str(tmp_path), max_entries=20)
+    for index in range(100):
+        cache.set(f"page-{index}", {"text": str(index)})
+        assert _entries(tmp_path) <= 20
+
+def test_existing_entries_count_towards_the_limit(tmp_path):
+    OCRPageCache(str(tmp_path), max_entries=1000).set("seed", {"text": ""})
+    for index in range(30):
+        with open(tmp_path / f"old-{index}.json", "w") as file:
+            file.write("{}")
+    cache = OCRPageCache(str(tmp_path), max_entries=20)
+    cache.set("new", {"text": "new"})
+    assert _entries(tmp_path) <= 20
+    assert cache.get("new") == {"text": "new"}
+
+def test_rewrites_do_not_count_twice(tmp_path):
+    cache = OCRPageCache(str(tmp_path), max_entries=5)
+    for _ in range(50):
+        cache.set("same", {"text": "x"})
+    assert _entries(tmp_path) == 1
+
+def test_process_wide_instance(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr.settings, "OCR_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ocr, "_page_cache", None)
+    assert get_ocr_page_cache() is get_ocr_page_cache()
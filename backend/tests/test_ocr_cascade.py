@@ -0,0 +1,92 @@
+# backend/tests/test_ocr_cascade.py
+import pytest
+
+pytest.importorskip("pytesseract")
+
+from PIL import Image
+
+from core.document_processor import ocr
+from core.document_processor.ocr import bbox_iou, ocr_images
+
+def word(text: str, confidence: float, x: int, y: int, width: int = 40, height: int = 10):
+    return {"text": text, "confidence": confidence, "bbox": {"x": x, "y": y, "width": width, "height": height}, "source": "tesseract"}
+
+def line(*words):
+    x0 = min(w["bbox"]["x"] for w in words)
+    y0 = min(w["bbox"]["y"] for w in words)
+    x1 = max(w["bbox"]["x"] + w["bbox"]["width"] for w in words)
+    y1 = max(w["bbox"]["y"] + w["bbox"]["height"] for w in words)
+    return {
+        "words": list(words),
+        "bbox": {"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0},
+        "confidence": sum(w["confidence"] for w in words) / len(words)
+    }
+
+def easy(text: str, confidence: float, x0: float, y0: float, x1: float, y1: float):
+    return {"text": text, "confidence": confidence, "bbox": {"points": [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]}, "source": "easyocr"}
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Stub both engines; Tesseract lines and EasyOCR blocks are looked up by image width"""
+    monkeypatch.setattr(ocr.settings, "OCR_CONFIDENCE_THRESHOLD", 60)
+    monkeypatch.setattr(ocr.settings, "OCR_MIN_CONFIDENCE", 50)
+    monkeypatch.setattr(ocr.settings, "OCR_MERGE_IOU", 0.3)
+    stub = {"lines": {}, "easy": {}, "whole": [], "regions": []}
+
+    def readtext_batch(images, reader=None):
+        stub["whole"].append([image.width for image in images])
+        return [stub["easy"].get(image.width, []) for image in images]
+
+    def recognize_regions(requests, reader=None):
+        stub["regions"].append([(image.width, [region["confidence"] for region in regions]) for image, regions in requests])
+        return [stub["easy"].get(image.width, []) for image, _ in requests]
+
+    monkeypatch.setattr(ocr, "_tesseract_lines", lambda image: stub["lines"].get(image.width, []))
+    monkeypatch.setattr(ocr, "easyocr_readtext_batch", readtext_batch)
+    monkeypatch.setattr(ocr, "easyocr_recognize_regions", recognize_regions)
+    return stub
+
+def test_bbox_iou():
+    box = word("a", 90, 0, 0, 10, 10)
+    assert bbox_iou(box, box) == 1.0
+    assert bbox_iou(box, word("b", 90, 20, 0, 10, 10)) == 0.0
+    # Half of each box overlaps the other, across both bbox formats
+    assert bbox_iou(box, easy("c", 90, 5, 0, 15, 10)) == pytest.approx(50 / 150)
+
+def test_easyocr_only_reads_what_tesseract_is_unsure_of(engines):
+    sure, unsure_line, failed = Image.new("RGB", (100, 50)), Image.new("RGB", (200, 50)), Image.new("RGB", (300, 50))
+    engines["lines"] = {
+        100: [line(word("all", 95, 0, 0), word("clear", 90, 50, 0))],
+        200: [line(word("fine", 95, 0, 0)), line(word("blurry", 40, 0, 20)), line(word("good", 99, 0, 40))],
+        300: [line(word("noise", 20, 0, 0))]
+    }
+    engines["easy"] = {200: [easy("sharp", 80, 0, 20, 40, 30)], 300: [easy("whole page", 85, 0, 0, 300, 50)]}
+
+    results = ocr_images([sure, unsure_line, failed], mode="cascade")
+
+    # Only the failed image is read whole; only the unsure line of the other is re-read
+    assert engines["whole"] == [[300]]
+    assert engines["regions"] == [[(200, [40])]]
+    assert [block["text"] for block in results[0]] == ["all", "clear"]
+    assert [block["text"] for block in results[1]] == ["fine", "sharp", "good"]
+    assert [block["text"] for block in results[2]] == ["whole page"]
+
+def test_overlapping_lines_keep_the_more_confident_engine(engines):
+    image = Image.new("RGB", (120, 80))
+    engines["lines"] = {120: [
+        line(word("fuzzy", 55, 0, 0), word("bits", 45, 50, 0)),
+        line(word("kept", 58, 0, 20))
+    ]}
+    engines["easy"] = {120: [
+        # Overlaps the first line and is more confident: replaces it
+        easy("clean", 90, 0, 0, 45, 10), easy("text", 88, 50, 0, 90, 10),
+        # Overlaps the second line but is less sure than Tesseract
+        easy("kapt", 30, 0, 20, 40, 30),
+        # Overlaps no line: added after the lines
+        easy("margin", 70, 0, 60, 40, 70)
+    ]}
+
+    [blocks] = ocr_images([image], mode="cascade")
+    assert [(block["text"], block["source"]) for block in blocks] == [
+        ("clean", "easyocr"), ("text", "easyocr"), ("kept", "tesseract"), ("margin", "easyocr")
+    ]
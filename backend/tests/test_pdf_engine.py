@@ -0,0 +1,103 @@
+# backend/tests/test_pdf_engine.py
+import asyncio
+import io
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("pytesseract")
+
+from PIL import Image
+
+from core.document_processor import ocr, pdf_engine
+from core.document_processor.executor import ExtractionExecutor
+from core.document_processor.ocr import OCRPageCache
+from core.document_processor.pdf_engine import PDFEngine, _extract_page_range
+
+def make_pdf(path, pages: int, scanned=()) -> str:
+    """A PDF with one line of text per page; pages in scanned hold only an image"""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=300, height=200)
+        if number in scanned:
+            image = io.BytesIO()
+            Image.new("RGB", (120, 60), (255, 255, 255)).save(image, format="PNG")
+            page.insert_image(fitz.Rect(20, 20, 140, 80), stream=image.getvalue())
+        else:
+            page.insert_text((20, 40), f"Page {number + 1} says hello")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+def collect(engine: PDFEngine, file_path: str):
+    return asyncio.run(engine.extract_pages(file_path))
+
+def test_page_ranges():
+    engine = PDFEngine(pages_per_range=4, parallel_min_pages=10)
+    assert engine.page_ranges(10) == [(0, 4), (4, 8), (8, 10)]
+    assert engine.page_ranges(0) == []
+
+    # With a pool, small PDFs go as one range and large ones are split
+    pooled = PDFEngine(executor=object(), pages_per_range=4, parallel_min_pages=10)
+    assert pooled.page_ranges(9) == [(0, 9)]
+    assert pooled.page_ranges(10) == [(0, 4), (4, 8), (8, 10)]
+
+def test_pages_carry_their_offsets_in_the_document_text(tmp_path):
+    file_path = make_pdf(tmp_path / "doc.pdf", 5)
+    pages = collect(PDFEngine(pages_per_range=2, ocr_dpi=0), file_path)
+
+    text = "".join(page["text"] for page in pages)
+    assert [page["page_number"] for page in pages] == [1, 2, 3, 4, 5]
+    assert pages[0]["char_start"] == 0 and pages[-1]["char_end"] == len(text)
+    for page in pages:
+        assert text[page["char_start"]:page["char_end"]] == page["text"]
+        assert f"Page {page['page_number']} says hello" in page["text"]
+
+def test_ranges_fan_out_over_the_pool(tmp_path):
+    file_path = make_pdf(tmp_path / "doc.pdf", 7)
+
+    class RecordingExecutor(ExtractionExecutor):
+        def __init__(self):
+            super().__init__(max_workers=2, max_queue=0, timeout=60, preload_models=False)
+            self.ranges = []
+
+        async def run(self, fn, *args, **kwargs):
+            self.ranges.append(args[1:3])
+            return await super().run(fn, *args, **kwargs)
+
+    async def scenario():
+        executor = RecordingExecutor()
+        try:
+            engine = PDFEngine(executor=executor, pages_per_range=3, parallel_min_pages=1, ocr_dpi=0)
+            return await engine.extract_pages(file_path), executor.ranges
+        finally:
+            executor.shutdown(wait=False)
+
+    pages, ranges = asyncio.run(scenario())
+    assert ranges == [(0, 3), (3, 6), (6, 7)]
+    # Same pages and offsets as reading the ranges in a thread
+    assert pages == collect(PDFEngine(pages_per_range=3, ocr_dpi=0), file_path)
+
+def test_scanned_pages_fall_back_to_ocr(tmp_path, monkeypatch):
+    file_path = make_pdf(tmp_path / "scan.pdf", 3, scanned={1})
+    calls = []
+
+    def fake_ocr_prepared(prepared, reader=None, mode=None):
+        calls.append(len(prepared))
+        return [[{"text": "scanned words", "confidence": 0.9}] for _ in prepared]
+
+    monkeypatch.setattr(pdf_engine, "ocr_prepared", fake_ocr_prepared)
+    monkeypatch.setattr(ocr, "_page_cache", OCRPageCache(cache_dir=str(tmp_path / "cache")))
+
+    first = _extract_page_range(file_path, 0, 3, ocr_dpi=72)
+    assert [page["ocr"] for page in first] == [False, True, False]
+    assert first[1]["text"] == "scanned words\n" and first[1]["ocr_cached"] is False
+    assert "Page 1 says hello" in first[0]["text"]
+
+    # The same page is served from the OCR page cache the second time
+    second = _extract_page_range(file_path, 0, 3, ocr_dpi=72)
+    assert second[1]["text"] == "scanned words\n" and second[1]["ocr_cached"] is True
+    assert calls == [1]
+
+    # Without an OCR DPI scanned pages keep their (empty) text layer
+    assert not any(page["ocr"] for page in _extract_page_range(file_path, 0, 3))
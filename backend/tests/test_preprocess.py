@@ -0,0 +1,75 @@
+# backend/tests/test_preprocess.py
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from core.document_processor.preprocess import ImagePreprocessor, _binarize, _estimate_skew
+
+def preprocessor(**options) -> ImagePreprocessor:
+    defaults = dict(target_dpi=300, max_side=4000, grayscale=False, binarize=False, deskew=False, tile_size=4000, tile_overlap=0)
+    return ImagePreprocessor(**{**defaults, **options})
+
+def lines_image(width: int = 600, height: int = 400) -> Image.Image:
+    """Dark horizontal bars on white, like lines of text"""
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(40, height - 20, 30):
+        draw.rectangle((40, y, width - 40, y + 8), fill=0)
+    return image
+
+def test_downscale_to_target_dpi_and_max_side():
+    scan = Image.new("RGB", (3000, 1000), "white")
+    prepared = preprocessor().prepare(scan, source_dpi=600)
+    assert prepared["scale"] == 0.5 and prepared["info"]["processed_size"] == (1500, 500)
+
+    # The longest side is capped even without a DPI
+    prepared = preprocessor(max_side=1000).prepare(scan)
+    assert prepared["info"]["processed_size"] == (1000, 333)
+
+    # Never upscaled
+    prepared = preprocessor().prepare(Image.new("RGB", (200, 100)), source_dpi=72)
+    assert prepared["scale"] == 1.0 and prepared["info"]["processed_size"] == (200, 100)
+
+def test_grayscale_only_when_asked():
+    image = Image.new("RGB", (50, 50), (200, 30, 30))
+    assert preprocessor().prepare(image)["tiles"][0]["image"].mode == "RGB"
+    gray = preprocessor(grayscale=True).prepare(image)["tiles"][0]["image"]
+    assert gray.mode == "L" and "binarize" not in preprocessor(grayscale=True).prepare(image)["info"]["timings"]
+
+def test_otsu_splits_a_bimodal_image():
+    rng = np.random.default_rng(7)
+    dark = rng.normal(50, 8, size=(60, 100))
+    light = rng.normal(190, 8, size=(60, 100))
+    pixels = np.clip(np.vstack([dark, light]), 0, 255).astype(np.uint8)
+
+    binary = np.asarray(_binarize(Image.fromarray(pixels)))
+    assert set(np.unique(binary)) == {0, 255}
+    assert (binary[:60] == 0).all() and (binary[60:] == 255).all()
+
+@pytest.mark.parametrize("angle", [3.0, -2.0])
+def test_deskew_finds_the_rotation(angle):
+    skewed = lines_image().rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    assert _estimate_skew(skewed) == pytest.approx(-angle, abs=0.5)
+
+    prepared = preprocessor(deskew=True).prepare(skewed.convert("RGB"))
+    assert prepared["info"]["deskew_angle"] == pytest.approx(-angle, abs=0.5)
+    # A straight page is left alone
+    assert preprocessor(deskew=True).prepare(lines_image().convert("RGB"))["info"]["deskew_angle"] == 0.0
+
+def test_tile_cores_cover_the_image_once():
+    image = Image.new("L", (250, 130), 255)
+    tiles = preprocessor(tile_size=100, tile_overlap=20).prepare(image)["tiles"]
+
+    assert [(tile["x"], tile["y"]) for tile in tiles] == [(0, 0), (80, 0), (160, 0), (0, 80), (80, 80), (160, 80)]
+    assert all(max(tile["image"].size) <= 100 for tile in tiles)
+    coverage = np.zeros((130, 250), dtype=int)
+    for tile in tiles:
+        x0, y0, x1, y1 = tile["core"]
+        # The core lies inside the tile's own crop
+        assert tile["x"] <= x0 and x1 <= tile["x"] + tile["image"].width
+        coverage[y0:y1, x0:x1] += 1
+    assert (coverage == 1).all()
+
+    # Images no bigger than a tile stay whole
+    [whole] = preprocessor(tile_size=300).prepare(image)["tiles"]
+    assert whole["core"] == (0, 0, 250, 130) and whole["image"].size == (250, 130)
@@ -0,0 +1,143 @@
+# backend/tests/test_profiling.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.document_processor.profiling import ColumnProfile, HeavyHitters, HyperLogLog, TableProfiler
+
+def seeded_table(rows: int = 20_000, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amount = rng.lognormal(3, 1, rows).round(2)
+    amount[rng.choice(rows, 500, replace=False)] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": amount,
+        "region": rng.choice(["north", "south", "east", "west"], rows, p=[0.4, 0.3, 0.2, 0.1]),
+        # Zipf-distributed product codes: a few heavy hitters and a long tail
+        "product": [f"p{value}" for value in rng.zipf(1.6, rows)]
+    })
+
+def profile(frame: pd.DataFrame, chunk_rows: int, **options) -> TableProfiler:
+    profiler = TableProfiler(**options)
+    for start in range(0, len(frame), chunk_rows):
+        profiler.update(frame.iloc[start:start + chunk_rows])
+    return profiler
+
+def test_hyperloglog_estimate_is_close():
+    values = pd.Series(np.random.default_rng(0).integers(0, 40_000, 100_000))
+    sketch = HyperLogLog()
+    sketch.update(values)
+    assert sketch.estimate() == pytest.approx(values.nunique(), rel=0.05)
+
+    # Small cardinalities are counted almost exactly
+    small = HyperLogLog()
+    small.update(pd.Series([f"v{index % 50}" for index in range(10_000)]))
+    assert abs(small.estimate() - 50) <= 1
+
+def test_hyperloglog_merge_equals_one_pass():
+    values = pd.Series(np.random.default_rng(1).integers(0, 1_000_000, 50_000))
+    left, right, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(values[:20_000])
+    right.update(values[20_000:])
+    whole.update(values)
+    left.merge(right)
+    assert (left.registers == whole.registers).all()
+
+def test_heavy_hitters_find_the_top_values():
+    values = pd.Series([f"p{value}" for value in np.random.default_rng(2).zipf(1.6, 50_000)])
+    hitters = HeavyHitters(capacity=50)
+    for start in range(0, len(values), 2_000):
+        hitters.update(values[start:start + 2_000])
+
+    exact = values.value_counts()
+    top = hitters.top(5)
+    assert [item["value"] for item in top] == list(exact.index[:5])
+    for item in top:
+        # Counts are under-reported by at most the error bound
+        assert exact[item["value"]] - hitters.error <= item["count"] <= exact[item["value"]]
+
+def test_chunked_moments_match_numpy():
+    values = np.random.default_rng(4).normal(250, 40, 30_001)
+    column = ColumnProfile("x", numeric=True)
+    # Uneven chunks, including an empty one
+    for chunk in (values[:1], values[1:1], values[1:777], values[777:20_000], values[20_000:]):
+        column.update(pd.Series(chunk))
+
+    stats = column.to_dict()
+    assert stats["count"] == len(values)
+    assert stats["mean"] == pytest.approx(values.mean(), rel=1e-12)
+    assert stats["variance"] == pytest.approx(values.var(ddof=1), rel=1e-9)
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+
+def test_table_profile_matches_pandas(tmp_path):
+    frame = seeded_table()
+    path = tmp_path / "table.csv"
+    frame.to_csv(path, index=False)
+
+    # Read back in chunks, as the CSV extractor does
+    profiler = TableProfiler()
+    for chunk in pd.read_csv(path, chunksize=3_000):
+        profiler.update(chunk)
+    stats = profiler.statistics()
+    numeric, categorical = stats["numeric_columns"], stats["categorical_columns"]
+
+    assert profiler.total_rows == len(frame)
+    assert set(numeric) == {"id", "amount"} and set(categorical) == {"region", "product"}
+    assert profiler.preview == frame.head(10).replace({np.nan: None}).to_dict("records")
+
+    amount = frame["amount"]
+    assert numeric["amount"]["null_count"] == amount.isna().sum()
+    assert numeric["amount"]["count"] == amount.count()
+    assert numeric["amount"]["mean"] == pytest.approx(amount.mean(), rel=1e-9)
+    assert numeric["amount"]["std"] == pytest.approx(amount.std(), rel=1e-9)
+    assert numeric["amount"]["median"] == pytest.approx(amount.median(), rel=0.02)
+    assert numeric["amount"]["unique_values"] == pytest.approx(amount.nunique(), rel=0.05)
+
+    region = categorical["region"]
+    assert region["unique_count"] == 4
+    assert region["top_values"] == [
+        {"value": value, "count": int(count)} for value, count in frame["region"].value_counts().items()
+    ]
+    assert categorical["product"]["unique_count"] == pytest.approx(frame["product"].nunique(), rel=0.05)
+
+def test_column_kinds_come_from_the_first_chunk():
+    first = pd.DataFrame({"price": [1.5, 2.5, None]})
+    later = pd.DataFrame({"price": ["3.5", "n/a", "4"]})
+    profiler = TableProfiler()
+    profiler.update(first)
+    profiler.update(later)
+
+    price = profiler.statistics()["numeric_columns"]["price"]
+    assert (price["count"], price["null_count"], price["invalid_count"]) == (4, 1, 1)
+    assert price["mean"] == pytest.approx((1.5 + 2.5 + 3.5 + 4) / 4)
+
+def test_worksheet_profile_matches_a_one_pass_profile(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    openpyxl = pytest.importorskip("openpyxl")
+    from core.document_processor import processor
+    from core.document_processor.processor import DocumentProcessor
+
+    frame = seeded_table(rows=2_500)
+    path = tmp_path / "table.xlsx"
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("data")
+    sheet.append([])
+    sheet.append(list(frame.columns))
+    for row in frame.itertuples(index=False):
+        sheet.append([None if isinstance(value, float) and np.isnan(value) else value for value in row])
+    workbook.save(path)
+
+    monkeypatch.setattr(processor.settings, "CSV_CHUNK_SIZE", 400)
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        chunked = DocumentProcessor(use_process_pool=False)._profile_worksheet(workbook["data"])
+    finally:
+        workbook.close()
+
+    expected = profile(frame, len(frame)).statistics()
+    stats = chunked.statistics()
+    assert chunked.total_rows == len(frame)
+    assert stats["categorical_columns"]["region"]["top_values"] == expected["categorical_columns"]["region"]["top_values"]
+    for name in ("count", "null_count", "min", "max"):
+        assert stats["numeric_columns"]["amount"][name] == expected["numeric_columns"]["amount"][name]
+    assert stats["numeric_columns"]["amount"]["mean"] == pytest.approx(expected["numeric_columns"]["amount"]["mean"])
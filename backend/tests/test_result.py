@@ -0,0 +1,74 @@
+# backend/tests/test_result.py
+from datetime import date, datetime, time
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from core.document_processor import result as result_module
+from core.document_processor.result import Block, ExtractionResult, Table
+
+def sample() -> ExtractionResult:
+    text = "Title\n\nBody text " * 200
+    return ExtractionResult(
+        file_type="docx",
+        text=text,
+        blocks=[Block("heading", 0, 5, level=1), Block("paragraph", 7, 16)],
+        tables=[Table("Sheet1", ["a", "b"], [[1, 2.5]], row_count=1, statistics={"mean": np.float64(1.5)})],
+        stats={"words": np.int64(400)},
+        metadata={"processed": datetime(2024, 1, 2, 3, 4, 5), "day": date(2024, 1, 2), "at": time(9, 30)},
+        structured={"tags": ("a", "b"), "amount": Decimal("1.25"), "values": np.arange(3)}
+    )
+
+@pytest.mark.parametrize("use_msgpack", [True, False])
+def test_round_trip(monkeypatch, use_msgpack):
+    if not use_msgpack:
+        monkeypatch.setattr(result_module, "msgpack", None)
+    elif result_module.msgpack is None:
+        pytest.skip("msgpack is not installed")
+
+    original = sample()
+    restored = ExtractionResult.from_bytes(original.to_bytes())
+
+    assert restored.text == original.text
+    assert restored.blocks == original.blocks
+    assert restored.tables[0].rows == [[1, 2.5]]
+    assert restored.tables[0].statistics == {"mean": 1.5}
+    assert restored.metadata == {"processed": "2024-01-02T03:04:05", "day": "2024-01-02", "at": "09:30:00"}
+    assert restored.structured == {"tags": ["a", "b"], "amount": 1.25, "values": [0, 1, 2]}
+    assert restored.block_text(restored.blocks[0]) == "Title"
+
+def test_text_can_be_stored_separately():
+    original = sample()
+    without_text = original.to_bytes(include_text=False)
+
+    assert len(without_text) < len(original.to_bytes())
+    assert ExtractionResult.from_bytes(without_text).text == ""
+    assert ExtractionResult.from_bytes(without_text, text=original.text).text == original.text
+
+@pytest.mark.parametrize("use_msgpack", [True, False])
+def test_numeric_types_are_converted(monkeypatch, use_msgpack):
+    TiffImagePlugin = pytest.importorskip("PIL.TiffImagePlugin")
+    if not use_msgpack:
+        monkeypatch.setattr(result_module, "msgpack", None)
+    elif result_module.msgpack is None:
+        pytest.skip("msgpack is not installed")
+
+    # Image dpi as PIL reports it for TIFF/EXIF metadata
+    dpi = (TiffImagePlugin.IFDRational(300, 1), TiffImagePlugin.IFDRational(1201, 4))
+    original = ExtractionResult(file_type="png", metadata={"dpi": dpi, "ratio": Fraction(1, 4)})
+    restored = ExtractionResult.from_bytes(original.to_bytes())
+    assert restored.metadata == {"dpi": [300.0, 300.25], "ratio": 0.25}
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError, match="object"):
+        ExtractionResult(file_type="txt", metadata={"bad": object()}).to_bytes()
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        ExtractionResult.from_bytes(b"?payload")
+
+def test_dict_round_trip():
+    original = ExtractionResult(file_type="txt", text="abc", blocks=[Block("chunk", 0, 3)])
+    assert ExtractionResult.from_dict(original.to_dict()) == original
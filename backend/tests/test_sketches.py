@@ -0,0 +1,85 @@
+# backend/tests/test_sketches.py
+import numpy as np
+import pytest
+
+from core.document_processor.sketches import StreamingHistogram, TDigest, quantile_from_stats
+
+def test_tdigest_quantiles_are_close():
+    values = np.random.default_rng(0).normal(100, 15, 200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 50):
+        digest.update(chunk)
+
+    assert digest.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.5)
+    assert digest.quantile(0) == values.min()
+    assert digest.quantile(1) == values.max()
+
+def test_tdigest_memory_is_bounded():
+    digest = TDigest(compression=100)
+    digest.update(np.arange(1_000_000))
+    assert len(digest.means) <= 100
+
+def test_tdigest_merge_matches_single_pass():
+    values = np.random.default_rng(1).exponential(10, 50_000)
+    left, right, whole = TDigest(), TDigest(), TDigest()
+    left.update(values[:20_000])
+    right.update(values[20_000:])
+    whole.update(values)
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert left.quantile(0.9) == pytest.approx(whole.quantile(0.9), rel=0.01)
+
+def test_tdigest_ignores_non_finite_and_round_trips():
+    digest = TDigest()
+    digest.update(np.array([1.0, np.nan, np.inf, 3.0]))
+    assert digest.count == 2
+
+    restored = TDigest.from_dict(digest.to_dict())
+    assert restored.quantile(0.5) == digest.quantile(0.5)
+    assert quantile_from_stats({"digest": digest.to_dict()}, 0.5) == digest.quantile(0.5)
+    assert quantile_from_stats({}, 0.5) is None
+    assert TDigest().quantile(0.5) is None
+
+def test_histogram_counts_and_out_of_range():
+    histogram = StreamingHistogram(bins=4, edges=[0.0, 1.0, 2.0, 3.0, 4.0])
+    histogram.update(np.array([0.0, 1.0, 2.0, 3.0, 4.0]))
+    histogram.update(np.array([-1.0, 5.0, 2.5]))
+
+    data = histogram.to_dict()
+    assert data["edges"] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert sum(data["counts"]) == 6
+    assert (data["underflow"], data["overflow"]) == (1, 1)
+
+def test_histogram_range_grows_with_sorted_input():
+    values = np.arange(100_000, dtype=np.float64)
+    histogram = StreamingHistogram(bins=20)
+    for chunk in np.array_split(values, 10):
+        histogram.update(chunk)
+
+    data = histogram.to_dict()
+    assert (data["underflow"], data["overflow"]) == (0, 0)
+    assert sum(data["counts"]) == len(values)
+    assert data["edges"][0] == 0 and data["edges"][-1] >= values.max()
+    assert np.array_equal(histogram.counts, np.histogram(values, bins=histogram.edges)[0])
+
+def test_histogram_range_grows_downwards():
+    histogram = StreamingHistogram(bins=4)
+    histogram.update(np.array([10.0, 14.0]))
+    histogram.update(np.array([3.0]))
+
+    assert histogram.edges[0] <= 3.0
+    assert histogram.counts.sum() == 3
+    assert histogram.underflow == 0
+
+def test_histogram_merge_requires_same_edges():
+    left, right = StreamingHistogram(bins=2, edges=[0, 1, 2]), StreamingHistogram(bins=2, edges=[0, 1, 2])
+    left.update(np.array([0.5]))
+    right.update(np.array([1.5]))
+    left.merge(right)
+    assert left.counts.tolist() == [1, 1]
+
+    with pytest.raises(ValueError):
+        left.merge(StreamingHistogram(bins=2, edges=[0, 5, 10]))
@@ -0,0 +1,82 @@
+# backend/tests/test_spilled_text.py
+import asyncio
+import os
+
+import pytest
+
+from api.services import spilled_text
+from api.services.spilled_text import read_spilled_text, store_spilled_text
+from core.document_processor import chunking, memory_budget
+from core.document_processor.chunking import chunk_spilled, chunk_text
+from core.document_processor.memory_budget import MemoryBudget
+from fakes import FakeStorage
+
+TEXT = "".join(f"Record {index} has some words in it.\n" for index in range(400))
+
+def spill(tmp_path, text: str = TEXT):
+    budget = MemoryBudget(limit_bytes=1, spill_dir=str(tmp_path / "job"))
+    budget.spill("text.txt", "text spilled").write(text)
+    budget.close()
+    return budget.report()
+
+def test_spilled_chunks_match_chunking_the_whole_text(tmp_path, monkeypatch):
+    partial = spill(tmp_path)
+    # Small windows, so chunks have to carry over window edges
+    monkeypatch.setattr(chunking, "read_spill", lambda partial: memory_budget.read_spill(partial, window_chars=1500))
+
+    expected = [TEXT[block.char_start:block.char_end] for block in chunk_text(TEXT, [], 300, 50)]
+    assert list(chunk_spilled(partial, 300, 50)) == expected
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(spilled_text.settings, "CHUNK_SIZE", 300)
+    monkeypatch.setattr(spilled_text.settings, "CHUNK_OVERLAP", 0)
+
+def test_spilled_text_is_stored_and_removed(tmp_path, small_chunks):
+    partial = spill(tmp_path)
+    storage = FakeStorage()
+    batches = []
+
+    async def on_chunks(offset, chunks):
+        batches.append((offset, len(chunks)))
+
+    async def scenario():
+        await storage.collection.insert_one({"_id": "doc-1", "metadata": {"status": "partial", "partial": partial}})
+        count = await store_spilled_text(storage, "doc-1", partial, on_chunks=on_chunks, batch_size=10)
+        return count, await storage.get_chunks("doc-1")
+
+    count, chunks = asyncio.run(scenario())
+    assert chunks == [TEXT[block.char_start:block.char_end] for block in chunk_text(TEXT, [], 300, 0)]
+    assert count == len(chunks)
+    assert batches[0] == (0, 10) and sum(size for _, size in batches) == count
+    assert storage.collection.documents["doc-1"]["metadata"]["partial"]["spilled_chunks"] == count
+    assert not os.path.exists(partial["spill_dir"])
+
+def test_spill_is_removed_when_storing_fails(tmp_path, small_chunks):
+    partial = spill(tmp_path)
+    storage = FakeStorage()
+
+    async def failing_save(document_id, chunks, offset=0):
+        raise RuntimeError("disk full")
+
+    storage.save_chunks = failing_save
+    with pytest.raises(RuntimeError):
+        asyncio.run(store_spilled_text(storage, "doc-1", partial))
+    assert not os.path.exists(partial["spill_dir"])
+
+def test_nothing_spilled():
+    assert asyncio.run(store_spilled_text(FakeStorage(), "doc-1", None)) == 0
+
+def test_spilled_text_is_read_back_without_overlaps(tmp_path, monkeypatch):
+    monkeypatch.setattr(spilled_text.settings, "CHUNK_SIZE", 300)
+    monkeypatch.setattr(spilled_text.settings, "CHUNK_OVERLAP", 50)
+    storage = FakeStorage()
+
+    async def scenario():
+        await storage.collection.insert_one({"_id": "doc-1", "metadata": {}})
+        await store_spilled_text(storage, "doc-1", spill(tmp_path))
+        return await read_spilled_text(storage, "doc-1", max_chars=len(TEXT)), await read_spilled_text(storage, "doc-1", max_chars=1000)
+
+    (pieces, truncated), (capped, capped_truncated) = asyncio.run(scenario())
+    assert "".join(pieces) == TEXT and not truncated
+    assert "".join(capped) == TEXT[:1000] and capped_truncated
@@ -0,0 +1,94 @@
+# backend/tests/test_table_cache.py
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from core.document_processor import table_cache
+from core.document_processor.extraction_cache import ExtractionCache
+from core.document_processor.result import ExtractionResult
+from core.document_processor.table_cache import ParquetTableCache
+
+def _write(cache, content_hash, name, frame, index=0):
+    writer = cache.open_writer(content_hash, name, index)
+    writer.write(frame, {str(col): pd.api.types.is_numeric_dtype(frame[col]) for col in frame.columns})
+    return writer.close()
+
+def test_sheets_that_sanitize_alike_get_their_own_files(tmp_path):
+    cache = ParquetTableCache(str(tmp_path))
+    first = _write(cache, "abc", "Sheet 1", pd.DataFrame({"a": [1]}), 0)
+    assert cache.existing_entry("abc", "Sheet_1", 1) is None
+    second = _write(cache, "abc", "Sheet_1", pd.DataFrame({"a": [2, 3]}), 1)
+
+    assert first["path"] != second["path"]
+    assert ParquetTableCache.read_table(second["path"]).num_rows == 2
+
+def test_integers_keep_full_precision(tmp_path):
+    cache = ParquetTableCache(str(tmp_path))
+    big = 2 ** 53 + 1
+    writer = cache.open_writer("abc", "data")
+    writer.write(pd.DataFrame({"id": [big, 1], "x": [0.5, 1.5]}), {"id": True, "x": True})
+    writer.write(pd.DataFrame({"id": [None, 2], "x": [2.5, None]}), {"id": True, "x": True})
+    table = ParquetTableCache.read_table(writer.close()["path"])
+
+    assert str(table.schema.field("id").type) == "int64"
+    assert table.column("id").to_pylist() == [big, 1, None, 2]
+    assert table.column("x").to_pylist() == [0.5, 1.5, 2.5, None]
+
+def test_concurrent_writers_of_one_table_do_not_collide(tmp_path):
+    cache = ParquetTableCache(str(tmp_path))
+    first, second = cache.open_writer("abc", "data"), cache.open_writer("abc", "data")
+    numeric = {"a": True}
+    first.write(pd.DataFrame({"a": [1, 2]}), numeric)
+    second.write(pd.DataFrame({"a": [1, 2]}), numeric)
+    first.write(pd.DataFrame({"a": [3]}), numeric)
+    second.write(pd.DataFrame({"a": [3]}), numeric)
+
+    assert first.close()["path"] == second.close()["path"]
+    assert ParquetTableCache.read_table(cache.path("abc", "data")).column("a").to_pylist() == [1, 2, 3]
+    assert not [name for name in os.listdir(os.path.dirname(cache.path("abc", "data"))) if name.endswith(".tmp")]
+
+def test_least_recently_used_tables_are_evicted(tmp_path):
+    frame = pd.DataFrame({"text": [f"row {index}" for index in range(2000)]})
+    probe = ParquetTableCache(str(tmp_path / "probe"))
+    size = os.path.getsize(_write(probe, "probe", "data", frame)["path"])
+
+    cache = ParquetTableCache(str(tmp_path / "cache"), max_bytes=int(size * 2.5))
+    for index, content_hash in enumerate(["old", "used", "new"]):
+        _write(cache, content_hash, "data", frame)
+        os.utime(tmp_path / "cache" / content_hash, (index, index))
+    assert cache.existing_entry("used", "data") is not None
+    _write(cache, "newest", "data", frame)
+
+    remaining = sorted(os.listdir(tmp_path / "cache"))
+    assert "old" not in remaining
+    assert "used" in remaining and "newest" in remaining
+
+def test_remove_deletes_a_content_hash(tmp_path):
+    cache = ParquetTableCache(str(tmp_path))
+    _write(cache, "abc", "data", pd.DataFrame({"a": [1]}))
+    cache.remove("abc")
+    assert not os.path.exists(tmp_path / "abc")
+    assert cache.existing_entry("abc", "data") is None
+
+def test_removed_and_evicted_tables_drop_their_cached_extractions(tmp_path, monkeypatch):
+    extractions = ExtractionCache(str(tmp_path / "extractions"))
+    monkeypatch.setattr(table_cache.settings, "EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(table_cache, "get_extraction_cache", lambda: extractions)
+    keys = {content_hash: ExtractionCache.key(content_hash, "csv", "text") for content_hash in ("abc", "old", "new")}
+    for key in keys.values():
+        extractions.put(key, ExtractionResult(file_type="csv"))
+
+    frame = pd.DataFrame({"text": [f"row {index}" for index in range(2000)]})
+    size = os.path.getsize(_write(ParquetTableCache(str(tmp_path / "probe")), "probe", "data", frame)["path"])
+    cache = ParquetTableCache(str(tmp_path / "tables"), max_bytes=int(size * 1.5))
+    _write(cache, "abc", "data", frame)
+    cache.remove("abc")
+    _write(cache, "old", "data", frame)
+    os.utime(tmp_path / "tables" / "old", (0, 0))
+    _write(cache, "new", "data", frame)
+
+    assert extractions.get(keys["abc"]) is None and extractions.get(keys["old"]) is None
+    assert extractions.get(keys["new"]) is not None
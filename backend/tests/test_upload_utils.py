@@ -0,0 +1,46 @@
+# backend/tests/test_upload_utils.py
+import hashlib
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from api.utils.upload_utils import UploadTooLarge, extract_archive
+
+def make_archive(tmp_path, members):
+    path = tmp_path / "batch.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+def test_members_are_extracted_and_hashed(tmp_path):
+    archive = make_archive(tmp_path, {
+        "a.txt": b"alpha", "nested/b.CSV": b"x,y\n1,2\n", "../evil.txt": b"evil",
+        "__MACOSX/._a.txt": b"", ".hidden": b"", "dir/": b""
+    })
+    files = extract_archive(archive, str(tmp_path / "out"))
+
+    assert sorted(file["filename"] for file in files) == ["a.txt", "b.CSV", "evil.txt"]
+    for file in files:
+        assert os.path.dirname(file["path"]) == str(tmp_path / "out")
+        with open(file["path"], "rb") as data:
+            content = data.read()
+        assert file["sha256"] == hashlib.sha256(content).hexdigest()
+        assert file["size"] == len(content)
+    assert {file["file_type"] for file in files} == {"txt", "csv"}
+
+@pytest.mark.parametrize("max_files", [0, 1])
+def test_file_limit_is_enforced_including_zero(tmp_path, max_files):
+    archive = make_archive(tmp_path, {"a.txt": b"a", "b.txt": b"b"})
+    with pytest.raises(UploadTooLarge):
+        extract_archive(archive, str(tmp_path / "out"), max_files=max_files)
+    assert os.listdir(tmp_path / "out") == []
+
+def test_size_limit_is_enforced(tmp_path):
+    archive = make_archive(tmp_path, {"small.txt": b"ok", "big.txt": b"x" * 100})
+    with pytest.raises(UploadTooLarge):
+        extract_archive(archive, str(tmp_path / "out"), max_bytes=50)
+    assert os.listdir(tmp_path / "out") == []
@@ -0,0 +1,90 @@
+# backend/tests/test_xml_profile.py
+from core.document_processor.memory_budget import MemoryBudget
+from core.document_processor.xml_profile import XMLProfiler
+
+INVOICES = """<?xml version="1.0"?>
+<Invoices xmlns:x="urn:example">
+  <Invoice id="1"><Customer>Acme</Customer><Line><Amount>10</Amount></Line></Invoice>
+  <Invoice id="2"><Customer>Globex</Customer><Line><Amount>20</Amount></Line><Line><Amount>30</Amount></Line></Invoice>
+  <Invoice id="3"><Customer>Initech</Customer><Line><Amount>40</Amount></Line></Invoice>
+</Invoices>
+"""
+
+def profile(tmp_path, xml: str, **kwargs):
+    path = tmp_path / "doc.xml"
+    path.write_text(xml)
+    return XMLProfiler(**kwargs).profile(str(path))
+
+def test_schema_and_counts(tmp_path):
+    result = profile(tmp_path, INVOICES)
+
+    assert result["root_tag"] == "Invoices"
+    assert result["namespaces"] == {"x": "urn:example"}
+    assert result["schema"]["Invoices/Invoice"]["count"] == 3
+    assert result["schema"]["Invoices/Invoice"]["attributes"] == {"id": 3}
+    assert result["schema"]["Invoices/Invoice/Line/Amount"]["count"] == 4
+    assert result["max_depth"] == 4
+
+def test_every_record_is_sampled_including_the_first(tmp_path):
+    result = profile(tmp_path, INVOICES, sample_size=10)
+
+    # The outer record supersedes the repeated Line path
+    assert list(result["records"]) == ["Invoices/Invoice"]
+    records = result["records"]["Invoices/Invoice"]
+    assert [record["@id"] for record in records] == ["1", "2", "3"]
+    assert records[0] == {"@id": "1", "Customer": "Acme", "Line": {"Amount": "10"}}
+    assert records[1]["Line"] == [{"Amount": "20"}, {"Amount": "30"}]
+
+def test_sample_is_bounded(tmp_path):
+    rows = "".join(f"<Row><V>{index}</V></Row>" for index in range(500))
+    result = profile(tmp_path, f"<Root>{rows}</Root>", sample_size=7)
+    assert len(result["records"]["Root/Row"]) == 7
+
+def test_first_record_of_a_nested_record_path(tmp_path):
+    xml = "<Root><Meta><Name>m</Name></Meta><Data><Row><V>1</V></Row><Row><V>2</V></Row></Data></Root>"
+    result = profile(tmp_path, xml, sample_size=10)
+    assert result["records"] == {"Root/Data/Row": [{"V": "1"}, {"V": "2"}]}
+
+def test_mixed_content_keeps_tail_text(tmp_path):
+    xml = "<Doc><P>Intro <B>bold</B> middle <I>italic</I> end.</P><P>Second</P></Doc>"
+    content = profile(tmp_path, xml)["content"]
+
+    for text in ("Intro", "B: bold", "middle", "I: italic", "end.", "P: Second"):
+        assert text in content
+
+def test_chunks_index_into_content(tmp_path):
+    rows = "".join(f"<Row><Text>line number {index}</Text></Row>" for index in range(200))
+    result = profile(tmp_path, f"<Root>{rows}</Root>", chunk_size=500)
+
+    assert len(result["chunks"]) > 1
+    for chunk in result["chunks"]:
+        assert result["content"][chunk["char_start"]:chunk["char_end"]] == chunk["text"]
+
+class Overflow:
+    def __init__(self):
+        self.lines = []
+
+    def write(self, text):
+        self.lines.append(text)
+
+def test_text_past_the_char_limit_is_dropped(tmp_path):
+    overflow = Overflow()
+    rows = "".join(f"<Row>{index:04d}</Row>" for index in range(100))
+    result = profile(tmp_path, f"<Root>{rows}</Root>", max_text_chars=100, overflow=overflow)
+
+    assert result["text_truncated"]
+    assert len(result["content"]) <= 100
+    assert overflow.lines == []
+
+def test_text_past_the_budget_overflows_in_order(tmp_path):
+    overflow = Overflow()
+    budget = MemoryBudget(limit_bytes=2_000)
+    rows = "".join(f"<Row>{index:04d}</Row>" for index in range(100))
+    result = profile(tmp_path, f"<Root>{rows}</Root>", overflow=overflow, budget=budget)
+
+    kept = result["content"].splitlines()
+    assert not result["text_truncated"]
+    assert 0 < len(kept) < 100
+    assert budget.used_bytes <= 2_000
+    # Everything is either in memory or in the overflow, in document order
+    assert kept + [line.rstrip("\n") for line in overflow.lines] == [f"Row: {index:04d}" for index in range(100)]
@@ -0,0 +1,68 @@
+# backend/tests/test_yaml_profile.py
+from core.document_processor.memory_budget import MemoryBudget
+from core.document_processor.yaml_profile import YAMLProfiler
+
+MANIFESTS = """apiVersion: v1
+kind: Service
+metadata:
+  name: web
+spec:
+  ports: [80]
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web
+  labels: {tier: frontend}
+---
+kind: Service
+metadata:
+  name: café
+"""
+
+def profile(tmp_path, text: str, **kwargs):
+    path = tmp_path / "doc.yaml"
+    path.write_text(text, encoding="utf-8")
+    return YAMLProfiler(**kwargs).profile(str(path))
+
+def test_every_document_is_loaded(tmp_path):
+    result = profile(tmp_path, MANIFESTS)
+
+    assert len(result["documents"]) == 3
+    assert result["kinds"] == {"Service": 2, "Deployment": 1}
+    assert [summary["name"] for summary in result["summaries"]] == ["web", "web", "café"]
+    assert result["summaries"][0]["line_start"] == 1
+    assert result["summaries"][1]["line_start"] == 8
+
+def test_schema_is_merged_across_documents(tmp_path):
+    schema = profile(tmp_path, MANIFESTS)["schema"]
+    assert schema["kind"]["present"] == 3
+    assert schema["apiVersion"]["optional"]
+    assert schema["metadata.labels.tier"]["present"] == 1
+
+def test_chunks_index_into_the_source(tmp_path):
+    result = profile(tmp_path, MANIFESTS, chunk_size=40)
+
+    assert {chunk["document_index"] for chunk in result["chunks"]} == {0, 1, 2}
+    for chunk in result["chunks"]:
+        assert result["content"][chunk["char_start"]:chunk["char_end"]] == chunk["text"]
+        assert len(chunk["text"]) <= 40
+    assert result["chunks"][-1]["text"].rstrip().endswith("café")
+
+def test_empty_documents(tmp_path):
+    result = profile(tmp_path, "a: 1\n---\n---\nb: 2\n")
+    assert result["documents"] == [{"a": 1}, None, {"b": 2}]
+    assert result["summaries"][1]["type"] == "null"
+
+def test_documents_past_the_budget_are_spilled(tmp_path):
+    budget = MemoryBudget(limit_bytes=1500, spill_dir=str(tmp_path / "spill"))
+    overflow = budget.spill("yaml_text.txt", "YAML spilled")
+    result = profile(tmp_path, MANIFESTS, budget=budget, overflow=overflow)
+    overflow.close()
+
+    assert len(result["documents"]) == 1 and result["spilled_documents"] == 2
+    assert [summary.get("spilled", False) for summary in result["summaries"]] == [False, True, True]
+    assert result["kinds"] == {"Service": 2, "Deployment": 1}
+    assert {chunk["document_index"] for chunk in result["chunks"]} == {0}
+    spilled = (tmp_path / "spill" / "yaml_text.txt").read_text(encoding="utf-8")
+    assert result["content"] + spilled == MANIFESTS